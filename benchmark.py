@@ -0,0 +1,696 @@
+import argparse
+import csv
+import errno
+import glob
+import importlib
+import json
+import math
+import multiprocessing
+import multiprocessing.connection
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import deque
+from functools import partial
+
+from cache_resultados import PASTA_CACHE, CacheResultados, chave
+from filas import fila_efetiva
+from grafo import para_ponto_fixo
+from grafo_binario import caminho_binario, ler_cabecalho, load_graph
+from saida import FORMATOS, caminho_resultado, save_distances
+
+# ----------------------------
+# Bancada única de medição
+# ----------------------------
+# Para cada grafo e algoritmo registrado, mede em separado as fases
+#   carga       load_graph (cache binário com mmap; 1ª vez converte o CSV)
+#   construcao  preparo específico do algoritmo (ex.: pesos em ponto fixo)
+#   solucao     aquecimento + repetições a partir de fontes sorteadas
+#   escrita     distâncias da fonte 0 (CSV ou binário, ver saida.py; um
+#               arquivo idêntico ao que já existe não é regravado)
+# e o pico de memória alocada pelo algoritmo (tracemalloc, numa execução
+# extra fora da medição de tempo). Com --contadores, uma execução extra da
+# cópia instrumentada do algoritmo (instrumentacao.py) grava relaxações,
+# operações de fila, rodadas etc. ao lado dos tempos; com --perfil, outra
+# execução extra roda sob cProfile (e amostragem de pilhas) e grava os
+# perfis em results_perfil/ (ver perfil.py). Com --cache, distâncias e
+# tempos de cada (grafo, algoritmo, fonte) já medidos com o mesmo código e
+# os mesmos parâmetros vêm de cache/resultados/ sem resolver de novo (ver
+# cache_resultados.py). Tudo vai para um único JSON.
+
+
+class Algoritmo:
+    """
+    Entrada do registro. alvo = "modulo:funcao" (importado só quando usado,
+    para os runners poderem importar este módulo sem import circular);
+    kwargs vão para a função; inteiro = precisa dos pesos em ponto fixo;
+    a escrita grava <pasta>/<nome>_<grafo>, um arquivo por algoritmo (as
+    variantes que dividem a pasta não sobrescrevem umas às outras);
+    contado = "modulo:funcao" da cópia instrumentada, que recebe
+    (graph, source, contadores) e os mesmos kwargs.
+    """
+
+    __slots__ = ("nome", "alvo", "kwargs", "inteiro", "pasta", "contado")
+
+    def __init__(self, nome, alvo, pasta, inteiro=False, contado=None, **kwargs):
+        self.nome = nome
+        self.alvo = alvo
+        self.kwargs = kwargs
+        self.inteiro = inteiro
+        self.pasta = pasta
+        self.contado = contado
+
+    def funcao(self, instrumentada=False):
+        modulo, nome = (self.contado if instrumentada else self.alvo).split(":")
+        f = getattr(importlib.import_module(modulo), nome)
+        return partial(f, **self.kwargs) if self.kwargs else f
+
+
+REGISTRO = {}
+
+
+def registrar(nome, alvo, pasta, inteiro=False, contado=None, **kwargs):
+    """Acrescenta um algoritmo ao registro; a função recebe (graph, source)."""
+    REGISTRO[nome] = Algoritmo(nome, alvo, pasta, inteiro, contado, **kwargs)
+
+
+registrar("dijkstra", "run_dijkstra_results:dijkstra", "results_dijkstra",
+          contado="instrumentacao:dijkstra")
+for _fila in ("binario", "pairing", "radix", "dial"):
+    registrar(f"dijkstra_{_fila}", "run_dijkstra_results:dijkstra_fila", "results_dijkstra",
+              inteiro=_fila in ("radix", "dial"), contado="instrumentacao:dijkstra_fila", fila=_fila)
+registrar("bellman_classico", "run_bellman_results:bellman_ford", "results_bellman",
+          contado="instrumentacao:bellman_ford")
+registrar("bellman_vetorizado", "run_bellman_results:bellman_ford_vetorizado", "results_bellman",
+          contado="instrumentacao:bellman_ford_vetorizado")
+registrar("spfa", "run_bellman_results:spfa", "results_bellman", contado="instrumentacao:spfa")
+registrar("bmssp_duan", "bmssp_duan:bmssp_duan", "results_BMSSP", contado="instrumentacao:bmssp_duan")
+registrar("bmssp_heuristica", "run_BMSSP_results:bmssp", "results_BMSSP", contado="instrumentacao:bmssp")
+for _fila in ("binario", "pairing", "radix"):
+    registrar(f"bmssp_heuristica_{_fila}", "run_BMSSP_results:bmssp", "results_BMSSP",
+              inteiro=_fila == "radix", contado="instrumentacao:bmssp", fila=_fila)
+registrar("delta", "run_delta_results:delta_em_processos", "results_delta",
+          contado="instrumentacao:delta_stepping", processos=1)
+registrar("delta_paralelo", "run_delta_results:delta_em_processos", "results_delta",
+          contado="instrumentacao:delta_stepping", processos=os.cpu_count() or 1)
+
+
+# ----------------------------
+# Estatísticas
+# ----------------------------
+def percentil(valores, p):
+    """Percentil p (0-100) por posição mais próxima numa lista já ordenada."""
+    if not valores:
+        return 0.0
+    k = max(0, math.ceil(p / 100 * len(valores)) - 1)
+    return valores[k]
+
+
+def resumo(amostras):
+    ordenadas = sorted(amostras)
+    return {
+        "min": ordenadas[0],
+        "mediana": statistics.median(ordenadas),
+        "p95": percentil(ordenadas, 95),
+        "media": statistics.fmean(ordenadas),
+        "desvio": statistics.stdev(ordenadas) if len(ordenadas) > 1 else 0.0,
+        "amostras": amostras,
+    }
+
+
+def sortear_fontes(n, k, seed):
+    """A fonte 0 (a dos CSVs de resultado) mais k-1 fontes sorteadas com a seed."""
+    outras = random.Random(seed).sample(range(1, n), min(k - 1, n - 1)) if n > 1 else []
+    return [0] + outras
+
+
+# ----------------------------
+# Medição
+# ----------------------------
+def _extras(resolver, alg, graph, fator, fonte, dist, memoria, contadores, perfil, fase=None):
+    """
+    Execuções extras numa fonte, fora da medição: pico de memória, contadores
+    da versão instrumentada (conferidos contra dist) e perfil. graph já vem
+    convertido (fator do ponto fixo); fase(nome) avisa o início de cada uma.
+    """
+    pico = None
+    if memoria:
+        if fase is not None:
+            fase("memoria")
+        tracemalloc.start()
+        resolver(graph, fonte)
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    contagem = None
+    if contadores and alg.contado is not None:
+        from instrumentacao import Contadores, divergencias, observar, observavel
+
+        if fase is not None:
+            fase("contadores")
+        c = Contadores()
+        d = alg.funcao(instrumentada=True)(graph, fonte, c)
+        if fator != 1:
+            d = [x / fator for x in d]
+        contagem = c.como_dict()
+        # a cópia instrumentada tem de fazer exatamente o mesmo trabalho: as
+        # mesmas distâncias e os contadores visíveis na engine medida iguais
+        diverge = {}
+        if observavel(alg):
+            modulo = importlib.import_module(alg.alvo.split(":")[0])
+            diverge = divergencias(c.contagens, observar(modulo, resolver, graph, fonte))
+        contagem["confere"] = list(d) == list(dist) and not diverge
+        if diverge:
+            contagem["divergencias"] = diverge
+
+    resumo_perfil = None
+    if perfil is not None:
+        from perfil import perfilar
+
+        if fase is not None:
+            fase("perfil")
+        resumo_perfil = perfilar(resolver, graph, fonte, perfil["base"], perfil["amostragem"],
+                                 perfil["intervalo"], perfil["top"])
+    return {"memoria_pico_bytes": pico, "contadores": contagem, "perfil": resumo_perfil}
+
+
+def medir_extras(graph, alg, fonte, escala=None, memoria=True, contadores=False, perfil=None, fase=None):
+    """As execuções extras de _extras como uma etapa à parte (tarefa própria no pool)."""
+    resolver = alg.funcao()
+    fator = 1
+    if alg.inteiro:
+        graph, fator = para_ponto_fixo(graph, escala)
+    dist = None
+    if contadores and alg.contado is not None:
+        dist = resolver(graph, fonte)
+        if fator != 1:
+            dist = [x / fator for x in dist]
+    return _extras(resolver, alg, graph, fator, fonte, dist, memoria, contadores, perfil, fase)
+
+
+def medir(graph, alg, fontes, repeticoes=5, aquecimento=1, escala=None, memoria=True, contadores=False,
+          perfil=None, cache=None, sha1_grafo=None, fase=None):
+    """
+    Mede um algoritmo num grafo já carregado. Retorna (registro, dist da
+    fonte fontes[0]) com os tempos de construcao e solucao, o pico de
+    memória, com contadores=True os contadores da versão instrumentada e,
+    com perfil (opções de _perfil_de), o resumo do perfil da solução.
+    Com cache (cache_resultados.CacheResultados) e o sha1 do grafo, as
+    fontes já medidas vêm do cache e as novas são gravadas nele.
+    fase(nome) é chamada no início de cada etapa ("aquecimento", "solucao",
+    ...), para o pool dar a cada uma o seu prazo.
+    """
+    resolver = alg.funcao()
+
+    inicio = time.perf_counter()
+    fator = 1
+    if alg.inteiro:
+        graph, fator = para_ponto_fixo(graph, escala)
+    t_construcao = time.perf_counter() - inicio
+
+    if cache is not None:
+        parametros = {"escala": escala if alg.inteiro else None, "repeticoes": repeticoes,
+                      "aquecimento": aquecimento, "memoria": memoria}
+
+    amostras = []
+    dist = None
+    pico = None
+    aquecido = False
+    acertos = 0
+    for i, s in enumerate(fontes):
+        k = chave(sha1_grafo, alg, s, parametros) if cache is not None else None
+        entrada = cache.obter(k) if cache is not None else None
+        if entrada is not None:
+            d, meta = entrada
+            acertos += 1
+            amostras.extend(meta["amostras"])
+            if i == 0:
+                dist, pico = d, meta["pico"]
+            continue
+
+        if not aquecido:
+            if fase is not None:
+                fase("aquecimento")
+            for _ in range(aquecimento):
+                resolver(graph, fontes[0])
+            aquecido = True
+        if fase is not None:
+            fase("solucao")
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            d = resolver(graph, s)
+            tempos.append(time.perf_counter() - inicio)
+        amostras.extend(tempos)
+        if fator != 1 and (i == 0 or cache is not None):
+            d = [x / fator for x in d]
+
+        pico_fonte = None
+        if i == 0:
+            dist = d
+            if memoria:
+                tracemalloc.start()
+                resolver(graph, fontes[0])
+                pico = pico_fonte = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        if cache is not None:
+            cache.guardar(k, d, {"amostras": tempos, "pico": pico_fonte})
+
+    # o pico já foi medido acima (e vai junto para o cache)
+    extras = _extras(resolver, alg, graph, fator, fontes[0], dist, False, contadores, perfil, fase)
+
+    registro = {
+        "algoritmo": alg.nome,
+        "fontes": fontes,
+        "repeticoes": repeticoes,
+        "aquecimento": aquecimento,
+        "construcao": t_construcao,
+        "solucao": resumo(amostras),
+        "memoria_pico_bytes": pico,
+        "contadores": extras["contadores"],
+        "perfil": extras["perfil"],
+    }
+    if "fila" in alg.kwargs:
+        # a fila que rodou de fato (a Dial cede à radix com pesos grandes)
+        registro["fila"] = fila_efetiva(alg.kwargs["fila"], graph.n, max(graph.weights, default=0))
+    if cache is not None:
+        registro["cache_acertos"] = acertos
+    return registro, dist
+
+
+def _imprimir(registro):
+    base_name, nome = registro["arquivo"], registro["algoritmo"]
+    sol = registro["solucao"]
+    if sol is None:
+        print(f"  - {base_name} [{nome}]: {registro['status']} em todas as fontes")
+        return
+    pico = registro["memoria_pico_bytes"]
+    falhas = registro.get("falhas")
+    print(f"  - {base_name} [{nome}]: mediana={sol['mediana']:.6f}s "
+          f"min={sol['min']:.6f}s p95={sol['p95']:.6f}s desvio={sol['desvio']:.6f}s "
+          f"({len(sol['amostras'])} amostras)"
+          + (f", pico={pico / 1024:.0f} KiB" if pico is not None else "")
+          + (f", fila {registro['fila']} no lugar de {REGISTRO[nome].kwargs['fila']}"
+             if registro.get("fila", REGISTRO[nome].kwargs.get("fila")) != REGISTRO[nome].kwargs.get("fila") else "")
+          + (f", {len(falhas)} falha(s): "
+             + "; ".join(f"fonte {f['fonte']}{' (extras)' if f.get('etapa') else ''} {f['status']}"
+                         + (f" ({f['detalhe']})" if f.get("detalhe") else "") for f in falhas)
+             if falhas else "")
+          + (f", cache: {registro['cache_acertos']}/{len(registro['fontes'])} fontes"
+             if registro.get("cache_acertos") is not None else ""))
+    contagem = registro.get("contadores")
+    if contagem:
+        principais = [f"{k}={v}" for k, v in contagem.items() if isinstance(v, int) and not isinstance(v, bool)]
+        print("      contadores: " + " ".join(principais)
+              + ("" if contagem["confere"] else " [ATENÇÃO: versão instrumentada divergiu"
+                 + "".join(f"; {k}: cópia {a}, engine {b}" for k, (a, b) in contagem.get("divergencias", {}).items())
+                 + "]"))
+    perfil = registro.get("perfil")
+    if perfil:
+        print(f"      perfil ({', '.join(perfil['arquivos'])}), maior tempo acumulado:")
+        for linha in perfil["top"]:
+            print(f"        {linha['tempo_acumulado']:9.4f}s acum {linha['tempo_proprio']:9.4f}s próprio "
+                  f"{linha['chamadas']:>9} chamadas  {linha['funcao']}")
+
+
+def _abrir_cache(cache):
+    return CacheResultados(**cache) if cache is not None else None
+
+
+def _sha1_grafo(path):
+    """Hash do conteúdo do grafo, já calculado pelo cache binário de load_graph."""
+    return ler_cabecalho(caminho_binario(path))["sha1"]
+
+
+def _perfil_de(perfil, alg, base_name):
+    """Opções de perfil de um (algoritmo, grafo): acrescenta o caminho base dos arquivos."""
+    if perfil is None:
+        return None
+    return dict(perfil, base=os.path.join(perfil["pasta"], f"{alg.nome}_{os.path.splitext(base_name)[0]}"))
+
+
+def _escrever(alg, base_name, dist, formato):
+    out_path = caminho_resultado(os.path.join(alg.pasta, f"{alg.nome}_{base_name}"), formato)
+    inicio = time.perf_counter()
+    save_distances(out_path, dist, formato)
+    return time.perf_counter() - inicio
+
+
+def rodar(files, nomes, repeticoes=5, aquecimento=1, n_fontes=1, seed=42, escala=None,
+          escrever="csv", memoria=True, processos=1, timeout=None, memoria_mb=None, contadores=False,
+          perfil=None, cache=None):
+    """
+    Roda os algoritmos 'nomes' em todos os grafos de 'files' e retorna a
+    lista de registros (um por grafo e algoritmo), já com carga e escrita.
+    Com processos > 1, timeout ou memoria_mb, cada (grafo, algoritmo, fonte)
+    vira uma tarefa isolada num processo próprio (ver _rodar_em_pool).
+    escrever = formato dos arquivos de distâncias (saida.FORMATOS) ou None.
+    perfil = None ou {"pasta", "amostragem", "intervalo", "top"} (ver perfil.py).
+    cache = None ou {"pasta", "limite_bytes"} (ver cache_resultados.py).
+    """
+    if processos > 1 or timeout is not None or memoria_mb is not None:
+        return _rodar_em_pool(files, nomes, repeticoes, aquecimento, n_fontes, seed, escala,
+                              escrever, memoria, processos, timeout, memoria_mb, contadores, perfil, cache)
+
+    cache_res = _abrir_cache(cache)
+    registros = []
+    for path in files:
+        base_name = os.path.basename(path)
+        inicio = time.perf_counter()
+        graph = load_graph(path)
+        t_carga = time.perf_counter() - inicio
+        if graph.n == 0:
+            print(f"[AVISO] Grafo vazio em {base_name}, ignorando.")
+            continue
+
+        fontes = sortear_fontes(graph.n, n_fontes, seed)
+        for nome in nomes:
+            alg = REGISTRO[nome]
+            registro, dist = medir(graph, alg, fontes, repeticoes, aquecimento, escala, memoria, contadores,
+                                   _perfil_de(perfil, alg, base_name), cache_res, _sha1_grafo(path))
+            t_escrita = _escrever(alg, base_name, dist, escrever) if escrever else None
+            registro = {"arquivo": base_name, "n": graph.n, "m": graph.m, "carga": t_carga,
+                        "status": "ok", **registro, "escrita": t_escrita}
+            registros.append(registro)
+            _imprimir(registro)
+    return registros
+
+
+# ----------------------------
+# Execução em processos isolados
+# ----------------------------
+# Cada tarefa (grafo, algoritmo, fonte) roda num processo filho próprio,
+# que pode ser encerrado ao estourar o prazo sem afetar os demais; o limite
+# de memória é aplicado com setrlimit(RLIMIT_AS) no filho. Todas as fontes
+# passam pelo mesmo aquecimento; as execuções extras da fonte principal
+# (pico de memória, contadores, perfil) são uma tarefa à parte. O filho
+# avisa o início de cada etapa (aquecimento, solução, memória, ...) e cada
+# uma tem o seu prazo de --timeout: o prazo da solução cobre só as
+# execuções cronometradas. As tarefas saem
+# dos maiores grafos para os menores (melhor empacotamento), mas os
+# registros são montados na ordem fixa grafos x algoritmos x fontes, então o
+# arquivo de resultados não depende da ordem em que as tarefas terminam.
+def _limitar_memoria(memoria_mb):
+    import resource
+
+    atual = 0
+    try:
+        with open("/proc/self/statm") as f:
+            atual = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    # o filho herda o espaço de endereçamento do pai (interpretador, módulos,
+    # mmaps): o limite vale para o que o algoritmo alocar além disso
+    limite = atual + int(memoria_mb * (1 << 20))
+    resource.setrlimit(resource.RLIMIT_AS, (limite, limite))
+
+
+def _tarefa(conn, path, nome, fontes, indice, opcoes):
+    """
+    Corpo do processo filho: mede a fonte fontes[indice] (ou, com indice
+    None, as execuções extras da fonte principal) e devolve
+    (status, registro, t_escrita), depois de um ("fase", etapa, None) por etapa.
+    """
+    repeticoes, aquecimento, escala, escrever, memoria, memoria_mb, contadores, perfil, cache = opcoes
+
+    def fase(etapa):
+        conn.send(("fase", etapa, None))
+
+    try:
+        graph = load_graph(path)
+        if memoria_mb is not None:
+            _limitar_memoria(memoria_mb)
+        alg = REGISTRO[nome]
+        base_name = os.path.basename(path)
+        if indice is None:
+            extras = medir_extras(graph, alg, fontes[0], escala, memoria, contadores,
+                                  _perfil_de(perfil, alg, base_name), fase)
+            conn.send(("ok", extras, None))
+            return
+        registro, dist = medir(graph, alg, [fontes[indice]], repeticoes, aquecimento, escala, False, False,
+                               None, _abrir_cache(cache), _sha1_grafo(path), fase)
+        t_escrita = None
+        if indice == 0 and escrever:
+            t_escrita = _escrever(alg, base_name, dist, escrever)
+        conn.send(("ok", registro, t_escrita))
+    except MemoryError:
+        conn.send(("memoria", None, None))
+    except OSError as e:
+        conn.send(("memoria" if e.errno == errno.ENOMEM else "erro", repr(e), None))
+    except Exception as e:
+        conn.send(("erro", repr(e), None))
+    finally:
+        conn.close()
+
+
+def _rodar_em_pool(files, nomes, repeticoes, aquecimento, n_fontes, seed, escala,
+                   escrever, memoria, processos, timeout, memoria_mb, contadores, perfil, cache):
+    grafos = []
+    for path in files:
+        inicio = time.perf_counter()
+        graph = load_graph(path)  # converte para o cache binário uma vez, antes dos filhos
+        t_carga = time.perf_counter() - inicio
+        if graph.n == 0:
+            print(f"[AVISO] Grafo vazio em {os.path.basename(path)}, ignorando.")
+            continue
+        grafos.append((path, graph.n, graph.m, t_carga, sortear_fontes(graph.n, n_fontes, seed)))
+
+    # indice None = execuções extras da fonte principal, com prazo próprio
+    indices = [None] if memoria or contadores or perfil is not None else []
+    tarefas = [(path, nome, fontes, i, m)
+               for path, _, m, _, fontes in grafos for nome in nomes for i in list(range(len(fontes))) + indices]
+    # maiores primeiro; sort estável mantém a ordem fixa entre tarefas de mesmo tamanho
+    tarefas.sort(key=lambda t: -t[4])
+    opcoes = (repeticoes, aquecimento, escala, escrever, memoria, memoria_mb, contadores, perfil, cache)
+
+    ctx = multiprocessing.get_context()
+    pendentes = deque(tarefas)
+    ativos = {}
+    resultados = {}
+    while pendentes or ativos:
+        while pendentes and len(ativos) < max(1, processos):
+            path, nome, fontes, i, _ = pendentes.popleft()
+            receber, enviar = ctx.Pipe(duplex=False)
+            # não daemon: o delta_paralelo abre o seu próprio pool dentro da tarefa
+            proc = ctx.Process(target=_tarefa, args=(enviar, path, nome, fontes, i, opcoes))
+            proc.start()
+            enviar.close()
+            prazo = time.monotonic() + timeout if timeout is not None else None
+            ativos[receber] = ((path, nome, i), proc, prazo, "carga")
+
+        prazos = [prazo for _, _, prazo, _ in ativos.values() if prazo is not None]
+        espera = max(0.0, min(prazos) - time.monotonic()) if prazos else None
+        prontos = multiprocessing.connection.wait(list(ativos), espera)
+
+        for conn in prontos:
+            chave, proc, prazo, etapa = ativos[conn]
+            try:
+                mensagem = conn.recv()
+            except EOFError:
+                # o filho morreu sem responder (ex.: morto pelo sistema por memória)
+                mensagem = ("erro", "processo encerrado sem resposta", None)
+            if mensagem[0] == "fase":
+                # nova etapa, novo prazo
+                prazo = time.monotonic() + timeout if timeout is not None else None
+                ativos[conn] = (chave, proc, prazo, mensagem[1])
+                continue
+            del ativos[conn]
+            resultados[chave] = mensagem
+            conn.close()
+            proc.join()
+
+        agora = time.monotonic()
+        for conn in [c for c, (_, _, prazo, _) in ativos.items() if prazo is not None and prazo <= agora]:
+            chave, proc, _, etapa = ativos.pop(conn)
+            proc.terminate()
+            proc.join()
+            conn.close()
+            resultados[chave] = ("timeout", f"etapa {etapa}", None)
+
+    registros = []
+    for path, n, m, t_carga, fontes in grafos:
+        for nome in nomes:
+            registro = _agregar(nome, fontes, [resultados[(path, nome, i)] for i in range(len(fontes))],
+                                resultados.get((path, nome, None)))
+            registro = {"arquivo": os.path.basename(path), "n": n, "m": m, "carga": t_carga, **registro}
+            registros.append(registro)
+            _imprimir(registro)
+    return registros
+
+
+def _agregar(nome, fontes, partes, extras=None):
+    """
+    Junta os resultados por fonte de um (grafo, algoritmo) num registro só;
+    extras = resultado da tarefa das execuções extras (ou None se não houve).
+    """
+    amostras = []
+    falhas = []
+    principal = partes[0][1] if partes[0][0] == "ok" else None
+    for s, (status, registro, _) in zip(fontes, partes):
+        if status == "ok":
+            amostras.extend(registro["solucao"]["amostras"])
+        else:
+            falhas.append({"fonte": s, "status": status,
+                           **({"detalhe": registro} if registro is not None else {})})
+    dados_extras = {}
+    if extras is not None:
+        if extras[0] == "ok":
+            dados_extras = extras[1]
+        else:
+            falhas.append({"fonte": fontes[0], "etapa": "extras", "status": extras[0],
+                           **({"detalhe": extras[1]} if extras[1] is not None else {})})
+    status = "ok" if not falhas else falhas[0]["status"]
+    return {
+        "status": status,
+        "algoritmo": nome,
+        "fontes": fontes,
+        "repeticoes": principal["repeticoes"] if principal else None,
+        "aquecimento": principal["aquecimento"] if principal else None,
+        "construcao": principal["construcao"] if principal else None,
+        "solucao": resumo(amostras) if amostras else None,
+        "memoria_pico_bytes": dados_extras.get("memoria_pico_bytes"),
+        "contadores": dados_extras.get("contadores"),
+        "perfil": dados_extras.get("perfil"),
+        **({"fila": principal["fila"]} if principal and "fila" in principal else {}),
+        **({"cache_acertos": sum(r["cache_acertos"] for st, r, _ in partes if st == "ok")}
+           if principal and "cache_acertos" in principal else {}),
+        "escrita": partes[0][2],
+        "falhas": falhas,
+    }
+
+
+def salvar_json(path_out, registros, args):
+    """Grava os registros e os metadados da execução num único JSON."""
+    os.makedirs(os.path.dirname(path_out) or ".", exist_ok=True)
+    meta = {
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "argumentos": vars(args),
+    }
+    with open(path_out, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "resultados": registros}, f, indent=1)
+
+
+def salvar_tempos_csv(path_out, registros):
+    """
+    Tempos no formato antigo dos runners (arquivo,n_vertices,n_arestas,
+    tempo_segundos), com a mediana da solução; lido por comparar_tempos.py.
+    """
+    os.makedirs(os.path.dirname(path_out) or ".", exist_ok=True)
+    with open(path_out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["arquivo", "n_vertices", "n_arestas", "tempo_segundos"])
+        for r in registros:
+            if r["solucao"] is None:
+                # nenhuma fonte terminou (timeout/memória/erro): fica fora da comparação
+                continue
+            writer.writerow([r["arquivo"], r["n"], r["m"], f"{r['solucao']['mediana']:.6f}"])
+
+
+def argumentos_medicao(parser):
+    """Opções de medição comuns à bancada e aos runners."""
+    parser.add_argument("--repeticoes", type=int, default=5, help="medições por fonte")
+    parser.add_argument("--aquecimento", type=int, default=1, help="execuções descartadas antes de medir")
+    parser.add_argument("--fontes", type=int, default=1,
+                        help="número de fontes: a 0 mais fontes sorteadas com --seed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sem-memoria", action="store_true", help="não mede o pico com tracemalloc")
+    parser.add_argument("--sem-escrita", action="store_true", help="não grava os arquivos de distâncias")
+    parser.add_argument("--formato", choices=FORMATOS, default="csv",
+                        help="formato dos arquivos de distâncias (binários: ver saida.py)")
+    parser.add_argument("--processos", type=int, default=1,
+                        help="tarefas (grafo, algoritmo, fonte) simultâneas, cada uma num processo")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="prazo em segundos por tarefa; estourou, a tarefa é encerrada e "
+                             "registrada como timeout")
+    parser.add_argument("--memoria-mb", type=float, default=None,
+                        help="limite de memória por tarefa (MiB além do que o processo já usa)")
+    parser.add_argument("--contadores", action="store_true",
+                        help="roda a versão instrumentada uma vez (fora da medição) e grava "
+                             "relaxações, operações de fila, rodadas etc. no registro")
+    parser.add_argument("--perfil", "--profile", action="store_true",
+                        help="perfila a solução de cada grafo com cProfile numa execução extra "
+                             "(results_perfil/<algoritmo>_<grafo>.prof) e mostra as funções com "
+                             "maior tempo acumulado")
+    parser.add_argument("--amostragem", action="store_true",
+                        help="com --perfil, também amostra as pilhas e grava .folded (flame graph)")
+    parser.add_argument("--intervalo-amostragem", type=float, default=1.0, help="ms entre amostras")
+    parser.add_argument("--perfil-top", type=int, default=15, help="funções no resumo do perfil")
+    parser.add_argument("--perfil-pasta", default="results_perfil")
+    parser.add_argument("--cache", action="store_true",
+                        help="reaproveita distâncias e tempos já medidos de cache/resultados/ "
+                             "(mesmo grafo, código do algoritmo, fonte e parâmetros)")
+    parser.add_argument("--cache-mb", type=float, default=1024,
+                        help="tamanho máximo do cache de resultados; passou, saem as entradas menos usadas")
+    parser.add_argument("--cache-pasta", default=PASTA_CACHE)
+
+
+def opcoes_perfil(args):
+    """Opções de perfil de rodar() a partir dos argumentos de argumentos_medicao."""
+    if not args.perfil:
+        return None
+    return {"pasta": args.perfil_pasta, "amostragem": args.amostragem,
+            "intervalo": args.intervalo_amostragem / 1000, "top": args.perfil_top}
+
+
+def opcoes_cache(args):
+    """Opções de cache de rodar() a partir dos argumentos de argumentos_medicao."""
+    if not args.cache:
+        return None
+    return {"pasta": args.cache_pasta, "limite_bytes": int(args.cache_mb * (1 << 20))}
+
+
+def rodar_runner(nome, folder_out, tempos_name, args, escala=None, folder_in="graphs"):
+    """main() comum dos run_*_results.py: um algoritmo em todos os grafos de graphs/."""
+    files = sorted(glob.glob(os.path.join(folder_in, "*.csv")))
+    if not files:
+        print(f"Nenhum CSV encontrado em '{folder_in}'.")
+        return
+
+    print(f"Processando grafos com {nome}...")
+    registros = rodar(files, [nome], args.repeticoes, args.aquecimento, args.fontes, args.seed,
+                      escala, None if args.sem_escrita else args.formato, not args.sem_memoria,
+                      args.processos, args.timeout, args.memoria_mb, args.contadores, opcoes_perfil(args),
+                      opcoes_cache(args))
+    tempos_path = os.path.join(folder_out, tempos_name)
+    salvar_tempos_csv(tempos_path, registros)
+    print("Concluído. Resultados em:", folder_out)
+    print("Tempos em:", tempos_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bancada de medição dos algoritmos de caminho mínimo.")
+    parser.add_argument("--algoritmos", default="dijkstra,bellman_vetorizado,bmssp_duan",
+                        help=f"lista separada por vírgula; disponíveis: {','.join(REGISTRO)}")
+    parser.add_argument("--grafos", nargs="*", default=None, help="arquivos de grafo (padrão: graphs/*.csv)")
+    parser.add_argument("--escala", type=int, default=None,
+                        help="escala do ponto fixo dos algoritmos com pesos inteiros")
+    parser.add_argument("--saida", default=os.path.join("results_benchmark", "benchmark.json"))
+    argumentos_medicao(parser)
+    args = parser.parse_args()
+
+    nomes = [a for a in args.algoritmos.split(",") if a]
+    desconhecidos = [a for a in nomes if a not in REGISTRO]
+    if desconhecidos:
+        parser.error(f"algoritmos desconhecidos: {', '.join(desconhecidos)}")
+
+    files = args.grafos or sorted(glob.glob(os.path.join("graphs", "*.csv")))
+    if not files:
+        print("Nenhum grafo encontrado.")
+        return
+
+    registros = rodar(files, nomes, args.repeticoes, args.aquecimento, args.fontes, args.seed,
+                      args.escala, None if args.sem_escrita else args.formato, not args.sem_memoria,
+                      args.processos, args.timeout, args.memoria_mb, args.contadores, opcoes_perfil(args),
+                      opcoes_cache(args))
+    salvar_json(args.saida, registros, args)
+    print("Resultados em:", args.saida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+from bisect import bisect_left
+from collections import deque
+
+INF = float("inf")
+
+# ----------------------------
+# Estrutura de ordenação parcial em blocos
+# ----------------------------
+# Estrutura D do Lemma 3.3 de Duan et al. ("Breaking the Sorting Barrier
+# for Directed Single-Source Shortest Paths"), usada pelo BMSSP para guardar
+# a fronteira sem ordená-la por completo. Guarda pares (chave, valor), no
+# máximo um valor por chave (o menor), em duas sequências de blocos:
+#   D0: blocos inseridos por batch_prepend (valores menores que tudo em D)
+#   D1: blocos inseridos por insert, cada um com um limite superior;
+#       os limites ficam ordenados e são buscados por bisect.
+# Dentro de um bloco nada é ordenado; entre blocos consecutivos da mesma
+# sequência, todo valor do primeiro é <= todo valor do segundo.
+# Entradas desatualizadas (chave que recebeu valor menor, ou já extraída)
+# ficam nos blocos e são descartadas quando o bloco é lido.
+
+
+class BlocosParciais:
+    """
+    Operações (M = tamanho máximo do lote devolvido por pull):
+      insert(chave, valor)   - insere ou diminui o valor de uma chave
+      batch_prepend(pares)   - insere um lote cujos valores são menores que
+                               qualquer valor presente na estrutura
+      pull()                 - remove as ~M chaves de menor valor e devolve
+                               (x, chaves), com max(valores) < x <= min(restante)
+    """
+
+    def __init__(self, M, B):
+        self.M = max(1, int(M))
+        self.B = B
+        self.valor = {}           # chave -> menor valor vigente
+        self.d0 = deque()         # blocos de batch_prepend, do menor para o maior
+        self.limites = [B]        # limites superiores dos blocos de D1
+        self.blocos = [[]]        # blocos de D1 (listas de (valor, chave))
+
+    def __len__(self):
+        return len(self.valor)
+
+    def __bool__(self):
+        return bool(self.valor)
+
+    # ----------------------------
+    # auxiliares
+    # ----------------------------
+    def _vivos(self, bloco):
+        """Filtra entradas desatualizadas e chaves repetidas de um bloco."""
+        valor = self.valor
+        vistos = set()
+        out = []
+        for val, chave in bloco:
+            if chave not in vistos and valor.get(chave) == val:
+                vistos.add(chave)
+                out.append((val, chave))
+        return out
+
+    def _dividir(self, j):
+        """Divide o bloco j de D1 pela mediana quando ele passa de M entradas."""
+        bloco = self._vivos(self.blocos[j])
+        if len(bloco) <= self.M:
+            self.blocos[j] = bloco
+            return
+        bloco.sort()
+        meio = len(bloco) // 2
+        self.blocos[j] = bloco[meio:]
+        self.blocos.insert(j, bloco[:meio])
+        self.limites.insert(j, bloco[meio - 1][0])
+
+    # ----------------------------
+    # operações
+    # ----------------------------
+    def insert(self, chave, val):
+        atual = self.valor.get(chave)
+        if atual is not None and atual <= val:
+            return
+        self.valor[chave] = val
+
+        j = bisect_left(self.limites, val)
+        if j == len(self.limites):
+            # D1 ficou sem o bloco final (esvaziado por pull): recria com limite B
+            self.limites.append(max(self.B, val))
+            self.blocos.append([])
+        self.blocos[j].append((val, chave))
+        if len(self.blocos[j]) > self.M:
+            self._dividir(j)
+
+    def batch_prepend(self, pares):
+        valor = self.valor
+        lote = {}
+        for chave, val in pares:
+            if val < lote.get(chave, INF) and val < valor.get(chave, INF):
+                lote[chave] = val
+        if not lote:
+            return
+        for chave, val in lote.items():
+            valor[chave] = val
+
+        entradas = [(val, chave) for chave, val in lote.items()]
+        if len(entradas) <= self.M:
+            self.d0.appendleft(entradas)
+            return
+        # lote grande: blocos de até M/2 entradas, em ordem crescente
+        entradas.sort()
+        passo = max(1, self.M // 2)
+        for i in range(len(entradas) - (len(entradas) - 1) % passo - 1, -1, -passo):
+            self.d0.appendleft(entradas[i:i + passo])
+
+    def _coletar_d0(self, alvo, corte=None):
+        """Remove blocos da frente de D0 até juntar 'alvo' entradas vivas
+        (ou, com 'corte', enquanto o bloco da frente tiver valor <= corte)."""
+        out = []
+        while self.d0:
+            if corte is None and len(out) >= alvo:
+                break
+            bloco = self._vivos(self.d0[0])
+            if corte is not None and (not bloco or min(bloco)[0] > corte):
+                if not bloco:
+                    self.d0.popleft()
+                    continue
+                self.d0[0] = bloco
+                break
+            self.d0.popleft()
+            out.extend(bloco)
+        return out
+
+    def _coletar_d1(self, alvo, corte=None):
+        """Mesma ideia de _coletar_d0 para os blocos de D1. Devolve também o
+        limite do último bloco removido (para devolver as sobras)."""
+        out = []
+        limite = None
+        while self.blocos:
+            if corte is None and len(out) >= alvo:
+                break
+            bloco = self._vivos(self.blocos[0])
+            if corte is not None and (not bloco or min(bloco)[0] > corte):
+                if not bloco:
+                    limite = self.limites.pop(0)
+                    self.blocos.pop(0)
+                    continue
+                self.blocos[0] = bloco
+                break
+            limite = self.limites.pop(0)
+            self.blocos.pop(0)
+            out.extend(bloco)
+        return out, limite
+
+    def _minimo(self):
+        """Menor valor vivo na estrutura (INF se vazia)."""
+        m = INF
+        for seq in (self.d0, self.blocos):
+            for bloco in seq:
+                vivos = self._vivos(bloco)
+                if vivos:
+                    m = min(m, min(vivos)[0])
+                    break
+        return m
+
+    def pull(self):
+        """
+        Remove e devolve (x, chaves): as chaves de menor valor (pelo menos M,
+        ou todas se houver até M) e um limite x que separa estritamente os
+        valores devolvidos dos que ficaram (x = B se a estrutura esvaziou).
+        Valores empatados com o M-ésimo menor são devolvidos juntos, para que
+        a separação continue estrita mesmo com distâncias repetidas.
+        """
+        M = self.M
+        if len(self.valor) <= M:
+            chaves = list(self.valor)
+            self.valor.clear()
+            self.d0.clear()
+            self.limites = [self.B]
+            self.blocos = [[]]
+            return self.B, chaves
+
+        col0 = self._coletar_d0(M)
+        col1, limite1 = self._coletar_d1(M)
+        todos = sorted(col0 + col1)
+        corte = todos[min(M, len(todos)) - 1][0]
+
+        # empates com o corte que ficaram nos próximos blocos
+        col0.extend(self._coletar_d0(M, corte))
+        extra1, lim_extra = self._coletar_d1(M, corte)
+        col1.extend(extra1)
+        if lim_extra is not None:
+            limite1 = lim_extra
+
+        chaves = {}
+        sobra0 = []
+        sobra1 = []
+        for col, sobra in ((col0, sobra0), (col1, sobra1)):
+            for val, chave in col:
+                if val <= corte:
+                    chaves[chave] = None
+                else:
+                    sobra.append((val, chave))
+        for chave in chaves:
+            del self.valor[chave]
+
+        # devolve as sobras para a frente de cada sequência
+        if sobra0:
+            self.d0.appendleft(sobra0)
+        if sobra1:
+            self.limites.insert(0, limite1)
+            self.blocos.insert(0, sobra1)
+
+        return min(self._minimo(), self.B), list(chaves)
@@ -0,0 +1,217 @@
+import glob
+import heapq
+import math
+import os
+import sys
+import time
+
+from bloco_parcial import BlocosParciais
+from grafo_binario import load_graph
+from run_dijkstra_results import dijkstra
+
+INF = float("inf")
+
+# ----------------------------
+# BMSSP recursivo (Duan, Mao, Mao, Shu, Yin 2025)
+# ----------------------------
+# Implementação do algoritmo "Bounded Multi-Source Shortest Path" do artigo
+# "Breaking the Sorting Barrier for Directed Single-Source Shortest Paths":
+#   - FindPivots: k passos de Bellman-Ford a partir de S, que devolvem os
+#     pivôs P (raízes de árvores com >= k vértices) e o conjunto W visitado;
+#   - BaseCase: Dijkstra a partir de S que para depois de ~k vértices;
+#   - BMSSP(l, B, S): recursão em l níveis usando a estrutura de blocos
+#     parciais (bloco_parcial.BlocosParciais) como fronteira.
+# Parâmetros: k = floor(log^{1/3} n), t = floor(log^{2/3} n), nível inicial
+# ceil(log n / t). As relaxações usam "<=" como no artigo; empates de
+# distância são tratados devolvendo a classe de empate inteira no pull e
+# no caso base, para que os limites B' continuem estritos.
+
+
+def parametros(n):
+    """Retorna (k, t, nível inicial) para um grafo com n vértices."""
+    lg = math.log2(max(n, 2))
+    k = max(1, int(lg ** (1 / 3)))
+    t = max(1, int(lg ** (2 / 3)))
+    nivel = max(1, math.ceil(lg / t))
+    return k, t, nivel
+
+
+def bmssp_duan(graph, source=0):
+    """
+    SSSP a partir de source com o BMSSP recursivo.
+    Supõe pesos não negativos.
+    Retorna lista dist[0..n-1] com as distâncias mínimas.
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    k, t, nivel = parametros(graph.n)
+
+    d = [INF] * graph.n
+    d[source] = 0.0
+
+    def find_pivots(B, S):
+        W = set(S)
+        camada = S
+        for _ in range(k):
+            prox = set()
+            for u in camada:
+                du = d[u]
+                for i in range(offsets[u], offsets[u + 1]):
+                    v = targets[i]
+                    nd = du + weights[i]
+                    if nd <= d[v]:
+                        d[v] = nd
+                        if nd < B:
+                            prox.add(v)
+            W |= prox
+            camada = prox
+            if len(W) > k * len(S):
+                return list(S), W
+
+        # floresta F das arestas justas dentro de W (um pai por vértice)
+        pai = {}
+        for u in W:
+            du = d[u]
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if v != u and v in W and v not in pai and du + weights[i] == d[v]:
+                    pai[v] = u
+
+        raiz_de = {}
+        tamanho = {}
+        for v in W:
+            caminho = []
+            x = v
+            # o limite de passos protege contra ciclos de peso zero
+            while x in pai and x not in raiz_de and len(caminho) <= len(W):
+                caminho.append(x)
+                x = pai[x]
+            r = raiz_de.get(x, x)
+            for y in caminho:
+                raiz_de[y] = r
+            raiz_de[x] = r
+            tamanho[r] = tamanho.get(r, 0) + 1
+
+        P = [x for x in S if raiz_de.get(x) == x and tamanho[x] >= k]
+        return P, W
+
+    def base_case(B, S):
+        # Dijkstra a partir de S até completar k + |S| vértices; a classe de
+        # empate do último vértice é completada, e B' é o próximo valor do heap
+        heap = [(d[x], x) for x in S]
+        heapq.heapify(heap)
+        no_heap = set(S)
+        U = []
+        feitos = set()
+        limite = k + len(S)
+        ultimo = -INF
+        while heap:
+            du, u = heap[0]
+            if u in feitos or du > d[u]:
+                heapq.heappop(heap)
+                continue
+            if len(U) >= limite and du > ultimo:
+                return du, U
+            heapq.heappop(heap)
+            feitos.add(u)
+            U.append(u)
+            ultimo = du
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                nd = du + weights[i]
+                if nd <= d[v] and nd < B and v not in feitos:
+                    if nd < d[v] or v not in no_heap:
+                        d[v] = nd
+                        no_heap.add(v)
+                        heapq.heappush(heap, (nd, v))
+        return B, U
+
+    def bmssp(l, B, S):
+        if l == 0:
+            return base_case(B, S)
+
+        P, W = find_pivots(B, S)
+
+        D = BlocosParciais(2 ** ((l - 1) * t), B)
+        for x in P:
+            D.insert(x, d[x])
+
+        U = set()
+        B_ult = min((d[x] for x in P), default=B)
+        limite = k * 2 ** (l * t)
+        while len(U) < limite and D:
+            Bi, Si = D.pull()
+            B_ult, Ui = bmssp(l - 1, Bi, Si)
+            U.update(Ui)
+
+            K = []
+            for u in Ui:
+                du = d[u]
+                for i in range(offsets[u], offsets[u + 1]):
+                    v = targets[i]
+                    nd = du + weights[i]
+                    if nd <= d[v]:
+                        d[v] = nd
+                        if Bi <= nd < B:
+                            D.insert(v, nd)
+                        elif B_ult <= nd < Bi:
+                            K.append((v, nd))
+            for x in Si:
+                if B_ult <= d[x] < Bi:
+                    K.append((x, d[x]))
+            D.batch_prepend(K)
+
+        B_novo = min(B_ult, B)
+        U.update(x for x in W if d[x] < B_novo)
+        return B_novo, U
+
+    limite_recursao = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limite_recursao, 100 + 10 * nivel))
+    try:
+        bmssp(nivel, INF, [source])
+    finally:
+        sys.setrecursionlimit(limite_recursao)
+    return d
+
+
+def main():
+    # confere o BMSSP recursivo contra o Dijkstra em todos os grafos da pasta
+    folder_in = sys.argv[1] if len(sys.argv) > 1 else "graphs"
+    files = sorted(glob.glob(os.path.join(folder_in, "*.csv")))
+
+    if not files:
+        print(f"Nenhum CSV encontrado em '{folder_in}'.")
+        return
+
+    erros = 0
+    print("Conferindo BMSSP recursivo contra Dijkstra...")
+    for path in files:
+        graph = load_graph(path)
+        if graph.n == 0:
+            continue
+        k, t, nivel = parametros(graph.n)
+
+        inicio = time.perf_counter()
+        dist = bmssp_duan(graph, source=0)
+        t_bm = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        ref = dijkstra(graph, source=0)
+        t_dj = time.perf_counter() - inicio
+
+        difs = sum(1 for a, b in zip(dist, ref)
+                   if a != b and not math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9))
+        erros += difs > 0
+        status = "OK" if difs == 0 else f"ERRO ({difs} vértices divergentes)"
+        print(f"  - {os.path.basename(path)}: k={k}, t={t}, l={nivel}, "
+              f"bmssp={t_bm:.6f}s, dijkstra={t_dj:.6f}s -> {status}")
+
+    if erros:
+        print(f"{erros} grafo(s) com divergência.")
+        sys.exit(1)
+    print("Todas as distâncias conferem com o Dijkstra.")
+
+
+if __name__ == "__main__":
+    main()
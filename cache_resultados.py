@@ -0,0 +1,245 @@
+import argparse
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import struct
+import sys
+from array import array
+
+# ----------------------------
+# Cache de resultados endereçado por conteúdo
+# ----------------------------
+# Memoriza a fase de solução da bancada: cada entrada guarda as distâncias
+# e os tempos medidos de (grafo, algoritmo, fonte) e é endereçada pelo sha1
+# de
+#   - hash do conteúdo do grafo (o sha1 do CSV guardado no cache binário),
+#   - nome do algoritmo e sua versão (sha1 do código-fonte do módulo e de
+#     todos os módulos do projeto que ele importa, direta ou indiretamente,
+#     mais grafo.py, de onde vêm o CSR e o ponto fixo dos engines inteiros),
+#   - fonte e parâmetros (kwargs, escala, repetições, aquecimento, medição
+#     de memória, versão do Python).
+# Qualquer mudança no grafo ou no código do algoritmo muda a chave, então
+# entradas velhas nunca são lidas: só saem pelo despejo. Fica em
+# cache/resultados/ (cache/*.json são as respostas do Overpass do osmnx).
+#
+# Arquivo <chave>.res:
+#   cabeçalho  "<8sqq20s": magic, n, bytes do meta, sha1(meta + dist)
+#   meta       JSON (tempos, pico de memória, ...)
+#   dist       n float64 little-endian
+# Na leitura o sha1 é conferido; entrada corrompida é apagada e conta como
+# falta. O despejo é por tamanho: passando do limite, saem as entradas
+# usadas há mais tempo (mtime, atualizado a cada acerto).
+
+PASTA_CACHE = os.path.join("cache", "resultados")
+LIMITE_BYTES = 1 << 30
+MAGIC = b"RESDIST1"
+FORMATO_CABECALHO = "<8sqq20s"
+TAM_CABECALHO = struct.calcsize(FORMATO_CABECALHO)
+
+PASTA_PROJETO = os.path.dirname(os.path.abspath(__file__))
+# a bancada não entra na versão: os runners a importam só pela linha de comando
+FORA_DA_VERSAO = {"benchmark", "cache_resultados"}
+
+_versoes = {}
+
+
+def dependencias(modulo):
+    """
+    modulo e os módulos do projeto que ele importa (em qualquer ponto do
+    código, inclusive imports dentro de funções), transitivamente. Retorna
+    [(nome, caminho)] em ordem de nome.
+    """
+    vistos = {}
+    pilha = [modulo]
+    while pilha:
+        nome = pilha.pop()
+        if nome in vistos or nome in FORA_DA_VERSAO:
+            continue
+        spec = importlib.util.find_spec(nome)
+        if spec is None or not spec.has_location or os.path.dirname(os.path.abspath(spec.origin)) != PASTA_PROJETO:
+            continue
+        vistos[nome] = spec.origin
+        with open(spec.origin, "rb") as f:
+            arvore = ast.parse(f.read(), spec.origin)
+        for no in ast.walk(arvore):
+            if isinstance(no, ast.Import):
+                pilha.extend(a.name.split(".")[0] for a in no.names)
+            elif isinstance(no, ast.ImportFrom) and no.level == 0 and no.module:
+                pilha.append(no.module.split(".")[0])
+    return sorted(vistos.items())
+
+
+def versao_algoritmo(alg):
+    """sha1 do código-fonte do módulo que implementa alg (Algoritmo do registro) e das suas dependências."""
+    modulo = alg.alvo.split(":")[0]
+    if modulo not in _versoes:
+        h = hashlib.sha1()
+        for nome, path in sorted(dict(dependencias(modulo) + dependencias("grafo")).items()):
+            with open(path, "rb") as f:
+                h.update(nome.encode("utf-8") + b"\0" + hashlib.sha1(f.read()).digest())
+        _versoes[modulo] = h.hexdigest()
+    return _versoes[modulo]
+
+
+def chave(sha1_grafo, alg, fonte, parametros):
+    """Chave hexadecimal de (grafo, algoritmo, versão, fonte, parâmetros)."""
+    partes = [sha1_grafo.hex(), alg.nome, versao_algoritmo(alg), fonte,
+              alg.kwargs, parametros, sys.version.split()[0]]
+    return hashlib.sha1(json.dumps(partes, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class CacheResultados:
+    def __init__(self, pasta=PASTA_CACHE, limite_bytes=LIMITE_BYTES):
+        self.pasta = pasta
+        self.limite_bytes = limite_bytes
+        self.acertos = 0
+        self.faltas = 0
+        self.corrompidas = 0
+        self.despejadas = 0
+        self._total = None  # bytes no disco, calculado na primeira gravação
+
+    def _caminho(self, k):
+        return os.path.join(self.pasta, k + ".res")
+
+    def _ler(self, path):
+        """(dist, meta) de um arquivo de entrada; ValueError se estiver corrompido."""
+        with open(path, "rb") as f:
+            dados = f.read()
+        if len(dados) < TAM_CABECALHO:
+            raise ValueError("arquivo truncado")
+        magic, n, tam_meta, sha1 = struct.unpack_from(FORMATO_CABECALHO, dados)
+        corpo = memoryview(dados)[TAM_CABECALHO:]
+        if magic != MAGIC or len(corpo) != tam_meta + 8 * n or hashlib.sha1(corpo).digest() != sha1:
+            raise ValueError("conteúdo não confere")
+        meta = json.loads(bytes(corpo[:tam_meta]))
+        dist = array("d", bytes(corpo[tam_meta:]))
+        if sys.byteorder != "little":
+            dist.byteswap()
+        return dist, meta
+
+    def obter(self, k):
+        """(dist, meta) da entrada k ou None (falta)."""
+        path = self._caminho(k)
+        try:
+            dist, meta = self._ler(path)
+        except FileNotFoundError:
+            self.faltas += 1
+            return None
+        except (OSError, ValueError):
+            self.corrompidas += 1
+            self.faltas += 1
+            self._apagar(path)
+            return None
+        try:
+            os.utime(path)  # marca como usada agora (ordem do despejo)
+        except OSError:
+            pass
+        self.acertos += 1
+        return dist, meta
+
+    def guardar(self, k, dist, meta):
+        dados = array("d", dist)
+        if sys.byteorder != "little":
+            dados.byteswap()
+        corpo = json.dumps(meta).encode("utf-8")
+        tam_meta = len(corpo)
+        corpo += dados.tobytes()
+        cab = struct.pack(FORMATO_CABECALHO, MAGIC, len(dados), tam_meta, hashlib.sha1(corpo).digest())
+        os.makedirs(self.pasta, exist_ok=True)
+        path = self._caminho(k)
+        # nome temporário por processo: os filhos da bancada gravam em paralelo
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(cab)
+            f.write(corpo)
+        os.replace(tmp, path)
+        if self._total is None:
+            self._total = sum(tam for _, tam, _ in self.entradas())
+        else:
+            self._total += len(cab) + len(corpo)
+        if self._total > self.limite_bytes:
+            self._despejar()
+
+    def entradas(self):
+        """Lista (caminho, bytes, mtime) das entradas no disco."""
+        lista = []
+        try:
+            it = os.scandir(self.pasta)
+        except FileNotFoundError:
+            return lista
+        with it:
+            for e in it:
+                if e.name.endswith(".res"):
+                    try:
+                        st = e.stat()
+                    except FileNotFoundError:
+                        continue
+                    lista.append((e.path, st.st_size, st.st_mtime_ns))
+        return lista
+
+    def _apagar(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _despejar(self):
+        entradas = sorted(self.entradas(), key=lambda e: e[2])
+        total = sum(tam for _, tam, _ in entradas)
+        for path, tam, _ in entradas:
+            if total <= self.limite_bytes:
+                break
+            self._apagar(path)
+            total -= tam
+            self.despejadas += 1
+        self._total = total
+
+    def verificar(self):
+        """Confere o sha1 de todas as entradas, apagando as corrompidas. Retorna (boas, corrompidas)."""
+        boas = ruins = 0
+        for path, _, _ in self.entradas():
+            try:
+                self._ler(path)
+                boas += 1
+            except (OSError, ValueError):
+                self._apagar(path)
+                ruins += 1
+        return boas, ruins
+
+    def limpar(self):
+        for path, _, _ in self.entradas():
+            self._apagar(path)
+
+    def estatisticas(self):
+        return {"acertos": self.acertos, "faltas": self.faltas,
+                "corrompidas": self.corrompidas, "despejadas": self.despejadas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspeciona o cache de resultados da bancada.")
+    parser.add_argument("--pasta", default=PASTA_CACHE)
+    parser.add_argument("--verificar", action="store_true", help="confere a integridade de todas as entradas")
+    parser.add_argument("--limpar", action="store_true", help="apaga todas as entradas")
+    parser.add_argument("--limite-mb", type=float, default=None,
+                        help="despeja as entradas menos usadas até caber no limite")
+    args = parser.parse_args()
+
+    cache = CacheResultados(args.pasta)
+    if args.limpar:
+        cache.limpar()
+    if args.verificar:
+        boas, ruins = cache.verificar()
+        print(f"{boas} entradas íntegras, {ruins} corrompidas (apagadas).")
+    if args.limite_mb is not None:
+        cache.limite_bytes = int(args.limite_mb * (1 << 20))
+        cache._despejar()
+        print(f"{cache.despejadas} entradas despejadas.")
+    entradas = cache.entradas()
+    total = sum(tam for _, tam, _ in entradas)
+    print(f"{len(entradas)} entradas, {total / (1 << 20):.1f} MiB em {args.pasta}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import argparse
+import glob
+import os
+import time
+from multiprocessing import Pool
+
+try:
+    import numpy as np
+except ImportError:  # junção toda vetorizada: sem numpy, não roda
+    np = None
+
+from gera_grafo_gigante import TAM_BLOCO
+from grafo import caminho_coordenadas, caminho_ids_osm, load_graph_from_csv
+from importa_osm import gravar_grafo
+
+# ----------------------------
+# Grafo da cidade inteira a partir dos bairros
+# ----------------------------
+# Cada graphs/rio_<bairro>.csv tem numeração local; o que liga os bairros
+# é o id OSM de cada vértice, gravado ao lado do grafo em graphs/ids/ (por
+# gera_grafos_osm_rio.graph_to_csv ou importa_osm). A junção:
+#   1. lê os bairros em paralelo (um processo por arquivo) e traduz cada
+#      aresta para (osm_u, osm_v, w);
+#   2. junta tudo, tirando as arestas repetidas nas fronteiras (a mesma
+#      aresta em dois bairros; se os pesos diferirem, fica o menor, como
+#      em graph_to_csv);
+#   3. passa os nós pelo mapa global (graphs/ids/mapa_global.csv), uma
+#      tabela persistente id OSM -> id global só de acréscimo: um nó
+#      recebe id na primeira vez que aparece e nunca mais muda; nós novos
+#      entram no fim, em ordem de id OSM;
+#   4. renumera densamente (0..n-1) na ordem do id global. Enquanto o grafo
+#      da cidade cobrir todo o mapa, o id denso é o próprio id global.
+# A costura só existe se os bairros vizinhos tiverem nós em comum: as
+# arestas que cruzam a divisa precisam estar nos dois lados. É o que faz o
+# truncate_by_edge=True de gera_grafos_osm_rio; recortes cortados na
+# divisa (como extratos adjacentes passados ao importa_osm, que cortam a
+# via no primeiro nó ausente) deixam os bairros soltos. Por isso a junção
+# conta as componentes (fracamente) conexas do resultado e avisa dos
+# bairros que não têm nenhum nó em comum com os outros.
+# A saída tem o mesmo formato dos bairros (CSV, coords/, ids/ e .csrg), e
+# entra no glob graphs/rio_*.csv da bancada como mais um grafo.
+
+PATH_CIDADE = os.path.join("graphs", "rio_cidade.csv")
+PATH_MAPA = os.path.join("graphs", "ids", "mapa_global.csv")
+
+
+class MapaOsm:
+    """Tabela persistente id OSM -> id global (a posição na tabela), só de acréscimo."""
+
+    def __init__(self, path=PATH_MAPA):
+        self.path = path
+        self.osm = np.zeros(0, dtype=np.int64)
+        self.novos = 0
+        if os.path.exists(path):
+            dados = np.loadtxt(path, delimiter=",", skiprows=1, dtype=np.int64, ndmin=2)
+            if len(dados) and not np.array_equal(dados[:, 0], np.arange(len(dados))):
+                raise ValueError(f"{path}: ids globais fora de ordem")
+            self.osm = dados[:, 1].copy() if len(dados) else self.osm
+        self._indexar()
+
+    def _indexar(self):
+        self._ordem = np.argsort(self.osm, kind="stable")
+        self._ordenados = self.osm[self._ordem]
+
+    def __len__(self):
+        return len(self.osm)
+
+    def buscar(self, ids_osm):
+        """Ids globais de ids_osm (-1 para os que não estão na tabela)."""
+        if len(self.osm) == 0:
+            return np.full(len(ids_osm), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self._ordenados, ids_osm), len(self.osm) - 1)
+        return np.where(self._ordenados[pos] == ids_osm, self._ordem[pos], -1)
+
+    def registrar(self, ids_osm):
+        """Ids globais de ids_osm, acrescentando à tabela os que ainda não estão nela."""
+        globais = self.buscar(ids_osm)
+        faltam = np.unique(ids_osm[globais < 0])
+        if len(faltam):
+            self.osm = np.concatenate([self.osm, faltam])
+            self.novos += len(faltam)
+            self._indexar()
+            globais = self.buscar(ids_osm)
+        return globais
+
+    def salvar(self):
+        """Grava a tabela (arquivo temporário + os.replace), se mudou."""
+        if not self.novos:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("vertex,osm_id\n")
+            for i in range(0, len(self.osm), TAM_BLOCO):
+                bloco = self.osm[i:i + TAM_BLOCO].tolist()
+                intercalado = [None] * (2 * len(bloco))
+                intercalado[0::2] = range(i, i + len(bloco))
+                intercalado[1::2] = bloco
+                f.write(("%d,%d\n" * len(bloco)) % tuple(intercalado))
+        os.replace(tmp, self.path)
+        self.novos = 0
+
+
+def ler_bairro(path):
+    """Arestas de um grafo de bairro em ids OSM, mais os ids e coordenadas dos seus vértices."""
+    path_ids = caminho_ids_osm(path)
+    if not os.path.exists(path_ids):
+        return {"arquivo": path, "erro": f"sem ids OSM ({path_ids}); "
+                                         "regenere com gera_grafos_osm_rio.py ou importa_osm.py"}
+    tabela = np.loadtxt(path_ids, delimiter=",", skiprows=1, dtype=np.int64, ndmin=2)
+    ids = np.full(int(tabela[:, 0].max()) + 1 if len(tabela) else 0, -1, dtype=np.int64)
+    ids[tabela[:, 0]] = tabela[:, 1]
+
+    graph = load_graph_from_csv(path)
+    if graph.n > len(ids) or (graph.n and (ids[:graph.n] < 0).any()):
+        return {"arquivo": path, "erro": f"vértices sem id OSM em {path_ids}"}
+    u = np.array(graph.sources(), dtype=np.int64)
+    v = np.array(graph.targets, dtype=np.int64)
+
+    lat = lon = None
+    path_coords = caminho_coordenadas(path)
+    if os.path.exists(path_coords):
+        coords = np.loadtxt(path_coords, delimiter=",", skiprows=1, ndmin=2)
+        lat = np.full(len(ids), np.nan)
+        lon = np.full(len(ids), np.nan)
+        vert = coords[:, 0].astype(np.int64)
+        lat[vert] = coords[:, 1]
+        lon[vert] = coords[:, 2]
+    presentes = ids >= 0
+    return {"arquivo": path, "n": graph.n, "m": graph.m,
+            "osm_u": ids[u], "osm_v": ids[v], "w": np.array(graph.weights, dtype=np.float64),
+            "ids": ids[presentes],
+            "lat": lat[presentes] if lat is not None else None,
+            "lon": lon[presentes] if lon is not None else None}
+
+
+def componentes_fracas(n, u, v):
+    """
+    Rótulo da componente fracamente conexa de cada vértice (o menor vértice
+    dela), por ligação de raízes e salto de ponteiros, vetorizado.
+    """
+    rotulo = np.arange(n)
+    while True:
+        ru, rv = rotulo[u], rotulo[v]
+        menor = np.minimum(ru, rv)
+        novo = rotulo.copy()
+        np.minimum.at(novo, ru, menor)
+        np.minimum.at(novo, rv, menor)
+        while True:
+            saltado = novo[novo]
+            if np.array_equal(saltado, novo):
+                break
+            novo = saltado
+        if np.array_equal(novo, rotulo):
+            return rotulo
+        rotulo = novo
+
+
+def juntar(bairros, mapa):
+    """
+    Junta os bairros lidos por ler_bairro num grafo só. Retorna
+    (u, v, w, ids_osm, lat, lon, estatísticas), com vértices densos na
+    ordem do id global do mapa (lat/lon None se nenhum bairro tiver coordenadas).
+    """
+    osm_u = np.concatenate([b["osm_u"] for b in bairros])
+    osm_v = np.concatenate([b["osm_v"] for b in bairros])
+    w = np.concatenate([b["w"] for b in bairros])
+
+    # arestas repetidas (fronteiras): fica a menor
+    ordem = np.lexsort((w, osm_v, osm_u))
+    osm_u, osm_v, w = osm_u[ordem], osm_v[ordem], w[ordem]
+    primeira = np.concatenate([[True], (osm_u[1:] != osm_u[:-1]) | (osm_v[1:] != osm_v[:-1])])
+    duplicadas = len(w) - int(primeira.sum())
+    osm_u, osm_v, w = osm_u[primeira], osm_v[primeira], w[primeira]
+
+    usados = np.unique(np.concatenate([osm_u, osm_v]))
+    globais = mapa.registrar(usados)
+    denso = np.empty(len(usados), dtype=np.int64)
+    denso[np.argsort(globais)] = np.arange(len(usados))
+    u = denso[np.searchsorted(usados, osm_u)]
+    v = denso[np.searchsorted(usados, osm_v)]
+    ordem = np.lexsort((v, u))
+    u, v, w = u[ordem], v[ordem], w[ordem]
+    ids_osm = np.empty(len(usados), dtype=np.int64)
+    ids_osm[denso] = usados
+
+    todos = np.concatenate([b["ids"] for b in bairros])
+    unicos, primeiro, vezes = np.unique(todos, return_index=True, return_counts=True)
+    lat = lon = None
+    if any(b["lat"] is not None for b in bairros):
+        lat = np.concatenate([b["lat"] if b["lat"] is not None else np.full(len(b["ids"]), np.nan)
+                              for b in bairros])
+        lon = np.concatenate([b["lon"] if b["lon"] is not None else np.full(len(b["ids"]), np.nan)
+                              for b in bairros])
+        # coordenada do primeiro bairro que tem o nó com coordenada
+        com_coord = ~np.isnan(lat)
+        _, primeiro_com = np.unique(todos[com_coord], return_index=True)
+        origem = np.flatnonzero(com_coord)[primeiro_com]
+        pos = np.full(len(unicos), -1, dtype=np.int64)
+        pos[np.searchsorted(unicos, todos[origem])] = origem
+        pos = pos[np.searchsorted(unicos, ids_osm)]
+        lat = np.where(pos >= 0, lat[pos], np.nan)
+        lon = np.where(pos >= 0, lon[pos], np.nan)
+
+    # bairros sem nenhum nó em comum com os outros (não costuram com nada)
+    soltos = []
+    if len(bairros) > 1:
+        repetidos = unicos[vezes > 1]
+        soltos = [b["arquivo"] for b in bairros if not np.isin(b["ids"], repetidos).any()]
+
+    rotulo = componentes_fracas(len(usados), u, v)
+    _, tamanhos = np.unique(rotulo, return_counts=True)
+    estatisticas = {"duplicadas": duplicadas, "compartilhados": int((vezes > 1).sum()),
+                    "isolados": len(unicos) - len(usados), "soltos": soltos,
+                    "componentes": len(tamanhos), "maior_componente": int(tamanhos.max(initial=0))}
+    return u, v, w, ids_osm, lat, lon, estatisticas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Junta os grafos dos bairros num grafo da cidade, "
+                                                 "com ids globais estáveis pelo id OSM.")
+    parser.add_argument("--grafos", nargs="*", default=None,
+                        help="grafos de bairro (padrão: graphs/rio_*.csv, menos a saída)")
+    parser.add_argument("--saida", default=PATH_CIDADE)
+    parser.add_argument("--mapa", default=PATH_MAPA, help="tabela persistente id OSM -> id global")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--sem-csrg", action="store_true", help="não grava o .csrg em cache_csr/")
+    args = parser.parse_args()
+
+    if np is None:
+        parser.error("a junção requer numpy instalado")
+    files = args.grafos or sorted(glob.glob(os.path.join("graphs", "rio_*.csv")))
+    files = [p for p in files if os.path.abspath(p) != os.path.abspath(args.saida)]
+    if not files:
+        print("Nenhum grafo encontrado.")
+        return
+
+    inicio = time.perf_counter()
+    bairros = []
+    with Pool(args.processos) as pool:
+        for bairro in pool.imap(ler_bairro, files):
+            if "erro" in bairro:
+                print(f"[ERRO] {bairro['arquivo']}: {bairro['erro']}")
+                continue
+            print(f"  - {bairro['arquivo']}: n={bairro['n']}, m={bairro['m']}")
+            bairros.append(bairro)
+    if not bairros:
+        print("Nenhum bairro com ids OSM para juntar.")
+        return
+    t_leitura = time.perf_counter() - inicio
+
+    mapa = MapaOsm(args.mapa)
+    antes = len(mapa)
+    u, v, w, ids_osm, lat, lon, est = juntar(bairros, mapa)
+    mapa.salvar()
+    n, m = gravar_grafo(args.saida, u, v, w, ids_osm, lat, lon, not args.sem_csrg)
+
+    print(f"[OK] {args.saida}: n={n}, m={m} a partir de {len(bairros)} bairros "
+          f"({est['duplicadas']} arestas repetidas removidas, {est['compartilhados']} nós em mais de um bairro"
+          + (f", {est['isolados']} nós sem aresta descartados" if est["isolados"] else "") + ")")
+    print(f"     {est['componentes']} componentes conexas (maior com {est['maior_componente']} vértices, "
+          f"{100 * est['maior_componente'] / max(n, 1):.1f}%)")
+    for path in est["soltos"]:
+        print(f"[AVISO] {path} não tem nenhum nó em comum com os outros bairros: sem arestas na divisa "
+              "(baixe com truncate_by_edge=True ou use recortes que se sobreponham)")
+    print(f"     mapa {args.mapa}: {len(mapa)} ids ({len(mapa) - antes} novos)"
+          + ("; ids densos = ids globais" if n == len(mapa) else "")
+          + f"; leitura {t_leitura:.1f}s, total {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,7 @@ def main():
     path_bf = "results_bellman/tempos_bellman.csv"
     path_dj = "results_dijkstra/tempos_dijkstra.csv"
     path_bm = "results_BMSSP/tempos_BMSSP.csv"  # <- NOVO
+    path_dt = "results_delta/tempos_delta.csv"
 
     tempos_bf = carregar_tempos(path_bf)
     tempos_dj = carregar_tempos(path_dj)
@@ -34,6 +35,11 @@ def main():
     except FileNotFoundError:
         # se o arquivo ainda não existir, segue sem BMSSP
         tempos_bm = {}
+    try:
+        tempos_dt = carregar_tempos(path_dt)
+    except FileNotFoundError:
+        # idem para o delta-stepping
+        tempos_dt = {}
 
     # arquivo de saída com comparação
     out_path = "comparacao_tempos.csv"
@@ -48,7 +54,9 @@ def main():
             "razao_bf_sobre_dj",
             "tempo_bmssp",             # <- NOVO
             "razao_bf_sobre_bmssp",    # <- NOVO
-            "razao_bmssp_sobre_dj"     # <- NOVO
+            "razao_bmssp_sobre_dj",    # <- NOVO
+            "tempo_delta",
+            "razao_delta_sobre_dj"
         ])
 
         # percorre só arquivos que existem nos dois (BF e Dijkstra)
@@ -95,6 +103,15 @@ def main():
                 razao_bf_bm_str = ""
                 razao_bm_dj_str = ""
 
+            # ---- delta-stepping ----
+            if arquivo in tempos_dt:
+                t_dt = tempos_dt[arquivo][2]
+                t_dt_str = f"{t_dt:.6f}"
+                razao_dt_dj_str = f"{t_dt / t_dj:.2f}" if t_dj > 0 else "0.00"
+            else:
+                t_dt_str = ""
+                razao_dt_dj_str = ""
+
             writer.writerow([
                 arquivo,
                 n,
@@ -104,7 +121,9 @@ def main():
                 f"{razao_bf_dj:.2f}",
                 t_bm_str,
                 razao_bf_bm_str,
-                razao_bm_dj_str
+                razao_bm_dj_str,
+                t_dt_str,
+                razao_dt_dj_str
             ])
 
     print(f"Arquivo de comparação gerado: {out_path}")
@@ -0,0 +1,285 @@
+import argparse
+import csv
+import glob
+import heapq
+import math
+import os
+import random
+import time
+from array import array
+
+from grafo import CSRGraph, caminho_coordenadas
+from grafo_binario import load_graph
+from run_dijkstra_results import dijkstra
+
+INF = float("inf")
+RAIO_TERRA = 6371008.8  # metros (raio médio, o mesmo usado pelo OSMnx)
+
+# a heurística tem de ficar abaixo da distância real apesar dos erros de
+# arredondamento: o fator cobre o erro proporcional ao comprimento e a folga
+# absoluta (metros) o das coordenadas, gravadas com 7 casas (~1-2 cm por
+# ponto, em v e em t), e dos pesos, arredondados ao milímetro; sem ela, a
+# poucos metros de t a heurística pode passar da distância real
+FATOR_HEURISTICA = 0.999
+FOLGA_HEURISTICA = 0.05
+
+# ----------------------------
+# Consultas origem -> destino
+# ----------------------------
+# Todas as consultas devolvem (distância, caminho, vértices_fixados), onde
+# caminho é a lista de vértices de s até t (vazia se t for inalcançável) e
+# vértices_fixados conta quantos vértices saíram da fila com distância final.
+
+
+def carregar_coordenadas(path_grafo):
+    """
+    Lê o arquivo de coordenadas do grafo (vertex,lat,lon), gravado por
+    gera_grafos_osm_rio.graph_to_csv. Retorna (lat, lon) em arrays float64
+    indexados pelo vértice, ou None se o arquivo não existir.
+    """
+    path = caminho_coordenadas(path_grafo)
+    if not os.path.exists(path):
+        return None
+    pares = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)  # pula cabeçalho
+        for row in reader:
+            if len(row) >= 3:
+                pares[int(row[0])] = (float(row[1]), float(row[2]))
+    n = max(pares) + 1 if pares else 0
+    lat = array("d", bytes(8 * n))
+    lon = array("d", bytes(8 * n))
+    for v, (la, lo) in pares.items():
+        lat[v] = la
+        lon[v] = lo
+    return lat, lon
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Distância em metros sobre a esfera entre dois pontos em graus."""
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * RAIO_TERRA * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _caminho(pred, s, t):
+    if s != t and pred.get(t) is None:
+        return []
+    caminho = [t]
+    while caminho[-1] != s:
+        caminho.append(pred[caminho[-1]])
+    caminho.reverse()
+    return caminho
+
+
+def dijkstra_p2p(graph, s, t):
+    """Dijkstra unidirecional que para ao fixar t (referência para comparação)."""
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    dist = {s: 0.0}
+    pred = {s: None}
+    heap = [(0.0, s)]
+    fixados = 0
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        fixados += 1
+        if u == t:
+            return d, _caminho(pred, s, t), fixados
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            nd = d + weights[i]
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+    return INF, [], fixados
+
+
+def dijkstra_bidirecional(graph, reverso, s, t):
+    """
+    Dijkstra bidirecional: uma busca a partir de s no grafo e outra a partir
+    de t no grafo reverso (graph.reverse(), montado uma vez fora da consulta),
+    alternando pelo lado de menor fila. Para quando topo_frente + topo_tras
+    >= mu, a melhor distância s -> t encontrada até então.
+    """
+    if s == t:
+        return 0.0, [s], 0
+    lados = (
+        (graph.offsets, graph.targets, graph.weights, {s: 0.0}, {s: None}, [(0.0, s)]),
+        (reverso.offsets, reverso.targets, reverso.weights, {t: 0.0}, {t: None}, [(0.0, t)]),
+    )
+    fixos = (set(), set())
+    mu = INF
+    encontro = None
+    fixados = 0
+
+    while lados[0][5] and lados[1][5]:
+        if lados[0][5][0][0] + lados[1][5][0][0] >= mu:
+            break
+        lado = 0 if len(lados[0][5]) <= len(lados[1][5]) else 1
+        offsets, targets, weights, dist, pred, heap = lados[lado]
+        dist_outro = lados[1 - lado][3]
+
+        d, u = heapq.heappop(heap)
+        if d > dist[u] or u in fixos[lado]:
+            continue
+        fixos[lado].add(u)
+        fixados += 1
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            nd = d + weights[i]
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+            if v in dist_outro and nd + dist_outro[v] < mu:
+                mu = nd + dist_outro[v]
+                encontro = v
+
+    if encontro is None:
+        return INF, [], fixados
+    frente = _caminho(lados[0][4], s, encontro)
+    tras = _caminho(lados[1][4], t, encontro)
+    return mu, frente + tras[::-1][1:], fixados
+
+
+def astar(graph, s, t, coords=None, fator=FATOR_HEURISTICA, folga=FOLGA_HEURISTICA):
+    """
+    A* com heurística max(0, haversine(v, t) * fator - folga) (limite
+    inferior em metros, válido para os grafos do OSM, cujos pesos são
+    comprimentos em metros). Os arredondamentos podem deixar a heurística
+    inconsistente numa aresta curta, então um vértice já fechado que
+    recebe distância menor volta à fila: o resultado é o caminho mínimo
+    enquanto a heurística for um limite inferior.
+    Sem coordenadas, a heurística é zero e a busca vira Dijkstra com parada.
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    if coords is not None:
+        lat, lon = coords
+        lat_t, lon_t = lat[t], lon[t]
+
+        def h(v):
+            return max(0.0, fator * haversine(lat[v], lon[v], lat_t, lon_t) - folga)
+    else:
+        def h(v):
+            return 0.0
+
+    dist = {s: 0.0}
+    pred = {s: None}
+    heap = [(h(s), s)]
+    fechados = set()
+    fixados = 0
+    while heap:
+        _, u = heapq.heappop(heap)
+        if u in fechados:
+            continue
+        fechados.add(u)
+        fixados += 1
+        if u == t:
+            return dist[t], _caminho(pred, s, t), fixados
+        du = dist[u]
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            nd = du + weights[i]
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                pred[v] = u
+                # reabre v se já tinha sido fechado (heurística inconsistente)
+                fechados.discard(v)
+                heapq.heappush(heap, (nd + h(v), v))
+    return INF, [], fixados
+
+
+def conferir_casos():
+    """
+    Roda o A* em grafos pequenos que já deram distância errada e devolve a
+    lista de (caso, astar, dijkstra) que divergem (vazia = tudo certo).
+    """
+    m_por_grau = haversine(0.0, 0.0, 1.0, 0.0)
+    casos = {
+        # t = 0, a = 1 a 10.02 m em linha reta (erro das coordenadas) mas
+        # com aresta de 10.0 m: sem folga absoluta, h(a) = 10.00998 passa
+        # de d(a, t) e o atalho s -> t de 15.005 m sai antes de s -> a -> t
+        "folga_coordenadas": ([0.0, 10.02, 15.02], [(2, 1, 5.0), (2, 0, 15.005), (1, 0, 10.0)], 2, 0),
+    }
+    falhas = []
+    for nome, (metros, arestas, s, t) in casos.items():
+        n = len(metros)
+        us, vs, ws = zip(*arestas)
+        graph = CSRGraph.from_edges(n, us, vs, ws)
+        coords = (array("d", [x / m_por_grau for x in metros]), array("d", [0.0]) * n)
+        d_astar = astar(graph, s, t, coords)[0]
+        d_ref = dijkstra(graph, s)[t]
+        if d_astar != d_ref:
+            falhas.append((nome, d_astar, d_ref))
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultas origem->destino: Dijkstra, bidirecional e A*.")
+    parser.add_argument("grafos", nargs="*", help="CSVs de grafo (padrão: graphs/rio_*.csv)")
+    parser.add_argument("--consultas", type=int, default=100, help="pares (s, t) sorteados por grafo")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    files = args.grafos or sorted(glob.glob(os.path.join("graphs", "rio_*.csv")))
+    if not files:
+        print("Nenhum grafo encontrado.")
+        return
+
+    for nome, d_astar, d_ref in conferir_casos():
+        print(f"[ERRO] caso conhecido {nome}: astar {d_astar} vs dijkstra {d_ref}")
+
+    for path in files:
+        graph = load_graph(path)
+        if graph.n == 0:
+            continue
+        reverso = graph.reverse()
+        coords = carregar_coordenadas(path)
+        rng = random.Random(args.seed)
+        pares = [(rng.randrange(graph.n), rng.randrange(graph.n)) for _ in range(args.consultas)]
+
+        # referência: árvore completa a partir de cada origem
+        inicio = time.perf_counter()
+        arvores = {s: dijkstra(graph, s) for s, _ in pares}
+        t_arvore = (time.perf_counter() - inicio) / len(pares)
+
+        nome = os.path.basename(path)
+        aviso = "" if coords is not None else " (sem coordenadas: A* sem heurística)"
+        print(f"{nome}: n={graph.n}, m={graph.m}, {len(pares)} consultas{aviso}")
+        print(f"  - árvore completa (dijkstra): {1e3 * t_arvore:.3f} ms/consulta")
+
+        engines = [
+            ("dijkstra_p2p", lambda s, t: dijkstra_p2p(graph, s, t)),
+            ("bidirecional", lambda s, t: dijkstra_bidirecional(graph, reverso, s, t)),
+            ("astar", lambda s, t: astar(graph, s, t, coords)),
+        ]
+        for nome_engine, consulta in engines:
+            fixados = 0
+            erros = 0
+            inicio = time.perf_counter()
+            for s, t in pares:
+                d, caminho, k = consulta(s, t)
+                fixados += k
+                ref = arvores[s][t]
+                if not (d == ref or math.isclose(d, ref, rel_tol=1e-9, abs_tol=1e-6)):
+                    erros += 1
+            elapsed = (time.perf_counter() - inicio) / len(pares)
+            frac = fixados / (len(pares) * graph.n)
+            status = "OK" if erros == 0 else f"{erros} divergências"
+            print(f"  - {nome_engine}: {1e3 * elapsed:.3f} ms/consulta, "
+                  f"{fixados / len(pares):.1f} vértices fixados ({100 * frac:.1f}% do grafo) -> {status}")
+
+
+if __name__ == "__main__":
+    main()
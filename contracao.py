@@ -0,0 +1,474 @@
+import argparse
+import glob
+import heapq
+import math
+import mmap
+import os
+import random
+import struct
+import time
+from array import array
+
+from grafo import CSRGraph, TIPO_ALVO, TIPO_OFFSET, TIPO_PESO
+from grafo_binario import PASTA_CACHE, caminho_binario, ler_cabecalho, load_graph
+from run_dijkstra_results import dijkstra
+
+INF = float("inf")
+
+# ----------------------------
+# Contraction Hierarchies
+# ----------------------------
+# Pré-processamento: os vértices são contraídos um a um, na ordem dada pela
+# diferença de arestas (atalhos criados - arestas removidas + vizinhos já
+# contraídos). Contrair v cria o atalho u -> w (peso w(u,v) + w(v,w)) só
+# quando uma busca de testemunha a partir de u, sem passar por v, não acha
+# caminho tão curto quanto esse. rank[v] é a posição de v na ordem.
+#
+# Consulta: Dijkstra bidirecional só por arestas que sobem no rank; a frente
+# usa o grafo "acima" (u -> v com rank[v] > rank[u]) e a de trás o grafo
+# "abaixo" reverso (para cada aresta u -> v com rank[u] > rank[v], guarda
+# v -> u). Cada aresta carrega o vértice do meio (-1 se for original), usado
+# para desempacotar os atalhos no caminho completo.
+#
+# Formato binário (.ch, na mesma pasta dos .csrg), little-endian:
+#   magic b"CHIERAR1", versao I, reserv. I, n q, m_acima q, m_abaixo q,
+#   sha1 20s do CSV de origem (o .ch é refeito quando o CSV muda)
+#   rank int32[n]
+#   acima:  offsets int64[n+1], weights float64[m], targets int32[m], meio int32[m]
+#   abaixo: idem
+MAGIC = b"CHIERAR1"
+VERSAO = 1
+FORMATO_CABECALHO = "<8sIIqqq20s"
+TAM_CABECALHO = 128
+
+# limite de vértices fixados por busca de testemunha: se estourar, o atalho
+# é criado mesmo sem necessidade (continua correto, só fica maior)
+LIMITE_TESTEMUNHA = 500
+
+
+class Hierarquia:
+    """
+    Resultado do pré-processamento:
+      rank    = array int32, posição de cada vértice na ordem de contração
+      acima   = CSRGraph das arestas que sobem (busca a partir da origem)
+      abaixo  = CSRGraph reverso das arestas que descem (busca a partir do destino)
+      meio_acima / meio_abaixo = vértice do meio de cada aresta (-1 = original)
+    """
+
+    __slots__ = ("n", "rank", "acima", "meio_acima", "abaixo", "meio_abaixo")
+
+    def __init__(self, n, rank, acima, meio_acima, abaixo, meio_abaixo):
+        self.n = n
+        self.rank = rank
+        self.acima = acima
+        self.meio_acima = meio_acima
+        self.abaixo = abaixo
+        self.meio_abaixo = meio_abaixo
+
+    def atalhos(self):
+        return sum(1 for x in self.meio_acima if x >= 0) + sum(1 for x in self.meio_abaixo if x >= 0)
+
+
+# ----------------------------
+# Pré-processamento
+# ----------------------------
+def _testemunhas(saida, u, v, alvos, limite):
+    """
+    Dijkstra limitado a partir de u no grafo restante, sem passar por v.
+    Para quando todos os alvos foram fixados, quando a distância passa de
+    'limite' ou quando LIMITE_TESTEMUNHA vértices foram fixados.
+    Retorna {vértice: distância} dos vértices alcançados.
+    """
+    dist = {u: 0.0}
+    heap = [(0.0, u)]
+    restantes = len(alvos)
+    fixados = 0
+    while heap and restantes and fixados < LIMITE_TESTEMUNHA:
+        d, x = heapq.heappop(heap)
+        if d > dist[x]:
+            continue
+        if d > limite:
+            break
+        fixados += 1
+        if x in alvos:
+            restantes -= 1
+        for y, w in saida[x].items():
+            if y == v:
+                continue
+            nd = d + w
+            if nd < dist.get(y, INF):
+                dist[y] = nd
+                heapq.heappush(heap, (nd, y))
+    return dist
+
+
+def _atalhos_necessarios(saida, entrada, v):
+    """Lista os atalhos (u, w, peso) que a contração de v exigiria."""
+    atalhos = []
+    saindo = saida[v]
+    if not saindo:
+        return atalhos
+    max_saida = max(saindo.values())
+    for u, w_uv in entrada[v].items():
+        alvos = {w for w in saindo if w != u}
+        if not alvos:
+            continue
+        dist = _testemunhas(saida, u, v, alvos, w_uv + max_saida)
+        for w in alvos:
+            via_v = w_uv + saindo[w]
+            if dist.get(w, INF) > via_v:
+                atalhos.append((u, w, via_v))
+    return atalhos
+
+
+def _prioridade(saida, entrada, contraidos_viz, v):
+    atalhos = _atalhos_necessarios(saida, entrada, v)
+    return len(atalhos) - len(saida[v]) - len(entrada[v]) + contraidos_viz[v], atalhos
+
+
+def construir_hierarquia(graph):
+    """
+    Contrai todos os vértices de graph e retorna (Hierarquia, atalhos criados).
+    A prioridade é atualizada de forma preguiçosa: o vértice retirado do heap
+    tem a prioridade recalculada e, se ela piorou além do próximo da fila,
+    volta para o heap.
+    """
+    n = graph.n
+    # grafo restante como dicionários (arestas paralelas -> a menor)
+    saida = [{} for _ in range(n)]
+    entrada = [{} for _ in range(n)]
+    for u, v, w in graph.edges():
+        if u == v:
+            continue
+        if w < saida[u].get(v, INF):
+            saida[u][v] = w
+            entrada[v][u] = w
+    meio = {}
+
+    # todas as arestas (originais e atalhos) com o menor peso visto, para
+    # montar os CSRs no final
+    todas = {(u, v): w for u in range(n) for v, w in saida[u].items()}
+
+    contraidos_viz = [0] * n
+    heap = [(_prioridade(saida, entrada, contraidos_viz, v)[0], v) for v in range(n)]
+    heapq.heapify(heap)
+
+    rank = array(TIPO_ALVO, bytes(4 * n))
+    contraido = bytearray(n)
+    proximo = 0
+    n_atalhos = 0
+    while heap:
+        _, v = heapq.heappop(heap)
+        if contraido[v]:
+            continue
+        prioridade, atalhos = _prioridade(saida, entrada, contraidos_viz, v)
+        if heap and prioridade > heap[0][0]:
+            heapq.heappush(heap, (prioridade, v))
+            continue
+
+        for u, w, peso in atalhos:
+            if peso < saida[u].get(w, INF):
+                saida[u][w] = peso
+                entrada[w][u] = peso
+                meio[(u, w)] = v
+                if peso < todas.get((u, w), INF):
+                    todas[(u, w)] = peso
+                n_atalhos += 1
+
+        for u in entrada[v]:
+            del saida[u][v]
+            contraidos_viz[u] += 1
+        for w in saida[v]:
+            del entrada[w][v]
+            contraidos_viz[w] += 1
+        saida[v] = {}
+        entrada[v] = {}
+
+        contraido[v] = 1
+        rank[v] = proximo
+        proximo += 1
+
+    us_a, vs_a, ws_a, ms_a = [], [], [], []
+    us_b, vs_b, ws_b, ms_b = [], [], [], []
+    for (u, v), w in todas.items():
+        x = meio.get((u, v), -1)
+        if rank[v] > rank[u]:
+            us_a.append(u), vs_a.append(v), ws_a.append(w), ms_a.append(x)
+        else:
+            us_b.append(v), vs_b.append(u), ws_b.append(w), ms_b.append(x)
+
+    acima, meio_acima = _csr_com_meio(n, us_a, vs_a, ws_a, ms_a)
+    abaixo, meio_abaixo = _csr_com_meio(n, us_b, vs_b, ws_b, ms_b)
+    return Hierarquia(n, rank, acima, meio_acima, abaixo, meio_abaixo), n_atalhos
+
+
+def _csr_com_meio(n, us, vs, ws, ms):
+    """CSRGraph.from_edges, levando junto o vetor 'meio' na mesma ordem."""
+    ordem = sorted(range(len(us)), key=us.__getitem__)
+    graph = CSRGraph.from_edges(n, [us[i] for i in ordem], [vs[i] for i in ordem],
+                                [ws[i] for i in ordem])
+    return graph, array(TIPO_ALVO, [ms[i] for i in ordem])
+
+
+# ----------------------------
+# Persistência
+# ----------------------------
+def caminho_hierarquia(path_csv, pasta_cache=PASTA_CACHE):
+    base = os.path.splitext(os.path.basename(path_csv))[0]
+    return os.path.join(pasta_cache, f"{base}.ch")
+
+
+def salvar_hierarquia(h, path_out, sha1=b"\0" * 20):
+    """Grava a hierarquia (arquivo temporário + rename, como em salvar_binario)."""
+    os.makedirs(os.path.dirname(path_out) or ".", exist_ok=True)
+    tmp = f"{path_out}.{os.getpid()}.tmp"
+    raw = struct.pack(FORMATO_CABECALHO, MAGIC, VERSAO, 0, h.n, h.acima.m, h.abaixo.m, sha1)
+    with open(tmp, "wb") as f:
+        f.write(raw.ljust(TAM_CABECALHO, b"\0"))
+        f.write(memoryview(h.rank).cast("B"))
+        for graph, meio in ((h.acima, h.meio_acima), (h.abaixo, h.meio_abaixo)):
+            f.write(memoryview(graph.offsets).cast("B"))
+            f.write(memoryview(graph.weights).cast("B"))
+            f.write(memoryview(graph.targets).cast("B"))
+            f.write(memoryview(meio).cast("B"))
+    os.replace(tmp, path_out)
+
+
+def abrir_hierarquia(path, sha1=None):
+    """
+    Abre um .ch com mmap, sem cópia. Retorna None se o arquivo não existir,
+    for inválido ou tiver sido gerado a partir de outro conteúdo (sha1).
+    """
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+    with f:
+        raw = f.read(TAM_CABECALHO)
+        if len(raw) < TAM_CABECALHO:
+            return None
+        magic, versao, _, n, m_a, m_b, sha1_arq = struct.unpack_from(FORMATO_CABECALHO, raw)
+        if magic != MAGIC or versao != VERSAO or (sha1 is not None and sha1 != sha1_arq):
+            return None
+        tam = TAM_CABECALHO + 4 * n + 2 * 8 * (n + 1) + 16 * (m_a + m_b)
+        if os.fstat(f.fileno()).st_size != tam:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    buf = memoryview(mm)
+    pos = TAM_CABECALHO
+    rank = buf[pos:pos + 4 * n].cast(TIPO_ALVO)
+    pos += 4 * n
+    partes = []
+    for m in (m_a, m_b):
+        offsets = buf[pos:pos + 8 * (n + 1)].cast(TIPO_OFFSET)
+        pos += 8 * (n + 1)
+        weights = buf[pos:pos + 8 * m].cast(TIPO_PESO)
+        pos += 8 * m
+        targets = buf[pos:pos + 4 * m].cast(TIPO_ALVO)
+        pos += 4 * m
+        meio = buf[pos:pos + 4 * m].cast(TIPO_ALVO)
+        pos += 4 * m
+        partes.append((CSRGraph(n, offsets, targets, weights), meio))
+    (acima, meio_acima), (abaixo, meio_abaixo) = partes
+    return Hierarquia(n, rank, acima, meio_acima, abaixo, meio_abaixo)
+
+
+def carregar_hierarquia(path_csv, pasta_cache=PASTA_CACHE, refazer=False):
+    """
+    Carrega o grafo pelo cache binário (grafo_binario.load_graph) e a
+    hierarquia correspondente; se o .ch não existir ou for de outra versão
+    do CSV, contrai de novo e grava.
+    Retorna (graph, hierarquia, segundos de pré-processamento ou None se veio do disco).
+    """
+    graph = load_graph(path_csv, pasta_cache)
+    sha1 = ler_cabecalho(caminho_binario(path_csv, pasta_cache))["sha1"]
+    path_ch = caminho_hierarquia(path_csv, pasta_cache)
+    if not refazer:
+        h = abrir_hierarquia(path_ch, sha1)
+        if h is not None:
+            return graph, h, None
+
+    inicio = time.perf_counter()
+    h, _ = construir_hierarquia(graph)
+    elapsed = time.perf_counter() - inicio
+    salvar_hierarquia(h, path_ch, sha1)
+    return graph, abrir_hierarquia(path_ch, sha1), elapsed
+
+
+# ----------------------------
+# Consulta
+# ----------------------------
+def _busca_acima(graph, dist, pred, heap, mu, dist_outro):
+    """Um passo da busca para cima; retorna (mu, encontro) se melhorou."""
+    d, u = heapq.heappop(heap)
+    if d > dist[u]:
+        return mu, None
+    encontro = None
+    if u in dist_outro and d + dist_outro[u] < mu:
+        mu = d + dist_outro[u]
+        encontro = u
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    for i in range(offsets[u], offsets[u + 1]):
+        v = targets[i]
+        nd = d + weights[i]
+        if nd < dist.get(v, INF):
+            dist[v] = nd
+            pred[v] = i
+            heapq.heappush(heap, (nd, v))
+    return mu, encontro
+
+
+def consulta(h, s, t):
+    """
+    Distância s -> t na hierarquia: duas buscas só para cima, alternadas,
+    cada uma parando quando o topo da sua fila já não melhora mu.
+    Retorna (distância, vértice de encontro, pred_frente, pred_tras), com
+    pred = índice da aresta no CSR pela qual o vértice foi alcançado.
+    """
+    if s == t:
+        return 0.0, s, {}, {}
+    dist_f, dist_b = {s: 0.0}, {t: 0.0}
+    pred_f, pred_b = {}, {}
+    heap_f, heap_b = [(0.0, s)], [(0.0, t)]
+    mu = INF
+    encontro = None
+    frente = True
+    while (heap_f and heap_f[0][0] < mu) or (heap_b and heap_b[0][0] < mu):
+        if frente and not (heap_f and heap_f[0][0] < mu):
+            frente = False
+        elif not frente and not (heap_b and heap_b[0][0] < mu):
+            frente = True
+        if frente:
+            mu, e = _busca_acima(h.acima, dist_f, pred_f, heap_f, mu, dist_b)
+        else:
+            mu, e = _busca_acima(h.abaixo, dist_b, pred_b, heap_b, mu, dist_f)
+        if e is not None:
+            encontro = e
+        frente = not frente
+    return mu, encontro, pred_f, pred_b
+
+
+def _origem_aresta(graph, i):
+    """Vértice de origem da aresta de índice i no CSR (busca binária em offsets)."""
+    offsets = graph.offsets
+    lo, hi = 0, graph.n
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if offsets[mid + 1] <= i:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _meio_de(h, a, b):
+    """Vértice do meio da aresta a -> b da hierarquia (-1 se for original)."""
+    if h.rank[b] > h.rank[a]:
+        graph, meio, de, para = h.acima, h.meio_acima, a, b
+    else:
+        graph, meio, de, para = h.abaixo, h.meio_abaixo, b, a
+    targets = graph.targets
+    for i in range(graph.offsets[de], graph.offsets[de + 1]):
+        if targets[i] == para:
+            return meio[i]
+    raise KeyError((a, b))
+
+
+def _desempacotar(h, a, b, saida):
+    """Acrescenta a saida os vértices do caminho original de a até b (sem a)."""
+    pilha = [(a, b)]
+    while pilha:
+        a, b = pilha.pop()
+        x = _meio_de(h, a, b)
+        if x < 0:
+            saida.append(b)
+        else:
+            pilha.append((x, b))
+            pilha.append((a, x))
+
+
+def caminho(h, s, t):
+    """Distância e caminho completo s -> t (atalhos desempacotados)."""
+    d, encontro, pred_f, pred_b = consulta(h, s, t)
+    if encontro is None:
+        return (0.0, [s]) if s == t else (INF, [])
+
+    # sobe de encontro até s pela frente, e de encontro até t por trás
+    subida = [encontro]
+    while subida[-1] != s:
+        subida.append(_origem_aresta(h.acima, pred_f[subida[-1]]))
+    subida.reverse()
+    descida = [encontro]
+    while descida[-1] != t:
+        descida.append(_origem_aresta(h.abaixo, pred_b[descida[-1]]))
+
+    nos = subida + descida[1:]
+    completo = [s]
+    for a, b in zip(nos, nos[1:]):
+        _desempacotar(h, a, b, completo)
+    return d, completo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Contraction Hierarchies nos grafos do Rio.")
+    parser.add_argument("grafos", nargs="*", help="CSVs de grafo (padrão: graphs/rio_*.csv)")
+    parser.add_argument("--consultas", type=int, default=1000, help="pares (s, t) sorteados por grafo")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--refazer", action="store_true", help="ignora o .ch salvo e contrai de novo")
+    args = parser.parse_args()
+
+    files = args.grafos or sorted(glob.glob(os.path.join("graphs", "rio_*.csv")))
+    if not files:
+        print("Nenhum grafo encontrado.")
+        return
+
+    for path in files:
+        graph, h, t_pre = carregar_hierarquia(path, refazer=args.refazer)
+        if graph.n == 0:
+            continue
+        nome = os.path.basename(path)
+        pre = f"pré-processamento {t_pre:.3f}s" if t_pre is not None else "hierarquia lida do disco"
+        print(f"{nome}: n={graph.n}, m={graph.m}, {pre}, {h.atalhos()} atalhos "
+              f"(acima={h.acima.m}, abaixo={h.abaixo.m})")
+
+        rng = random.Random(args.seed)
+        pares = [(rng.randrange(graph.n), rng.randrange(graph.n)) for _ in range(args.consultas)]
+
+        inicio = time.perf_counter()
+        for s, t in pares:
+            consulta(h, s, t)
+        t_consulta = (time.perf_counter() - inicio) / len(pares)
+
+        inicio = time.perf_counter()
+        resultados = [caminho(h, s, t) for s, t in pares]
+        t_caminho = (time.perf_counter() - inicio) / len(pares)
+
+        # conferência contra o Dijkstra completo (distância e peso do caminho)
+        arvores = {}
+        erros = 0
+        for (s, t), (d, nos) in zip(pares, resultados):
+            if s not in arvores:
+                arvores[s] = dijkstra(graph, s)
+            ref = arvores[s][t]
+            peso = _peso_caminho(graph, nos) if nos else INF
+            if not (d == ref or math.isclose(d, ref, rel_tol=1e-9, abs_tol=1e-6)) or \
+                    not (peso == ref or math.isclose(peso, ref, rel_tol=1e-9, abs_tol=1e-6)):
+                erros += 1
+        status = "OK" if erros == 0 else f"{erros} divergências"
+        print(f"  - consulta: {1e6 * t_consulta:.1f} µs, com caminho: {1e6 * t_caminho:.1f} µs "
+              f"({len(pares)} pares) -> {status}")
+
+
+def _peso_caminho(graph, nos):
+    """Soma dos pesos do caminho no grafo original (menor aresta entre cada par)."""
+    total = 0.0
+    for a, b in zip(nos, nos[1:]):
+        total += min(w for v, w in graph.neighbors(a) if v == b)
+    return total
+
+
+if __name__ == "__main__":
+    main()
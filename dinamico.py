@@ -0,0 +1,355 @@
+import argparse
+import glob
+import heapq
+import math
+import os
+import random
+import time
+from array import array
+
+from grafo import CSRGraph
+from grafo_binario import load_graph
+from run_dijkstra_results import dijkstra, dijkstra_arvore
+
+INF = float("inf")
+
+# ----------------------------
+# SSSP dinâmico (reparo incremental da árvore de caminhos mínimos)
+# ----------------------------
+# Mantém dist/pred de uma fonte enquanto o grafo muda (lotes de aumentos,
+# reduções, inserções e remoções de arestas) e repara só o que a mudança
+# afeta, no estilo Ramalingam–Reps:
+#   1. aumentos/remoções: se a aresta (u, v) que piorou é a do pred de v,
+#      a subárvore de v perde o caminho; seus vértices são reiniciados com o
+#      melhor vizinho de entrada fora da subárvore e um Dijkstra restrito a
+#      eles recalcula as distâncias;
+#   2. reduções/inserções (e as arestas que saem da subárvore recalculada):
+#      cada aresta que agora encurta um caminho é relaxada e a melhora é
+#      propagada por Dijkstra a partir dos vértices melhorados.
+# O custo é proporcional aos vértices tocados e às suas arestas, não ao grafo.
+#
+# O CSR original não muda de forma: os pesos ficam numa cópia mutável
+# (aresta removida = peso INF), arestas novas ficam num dicionário à parte
+# e o CSR transposto guarda o índice da aresta original, para ler o peso
+# atual das arestas de entrada. Os filhos de cada vértice na árvore ficam
+# em listas duplamente encadeadas (primeiro filho / irmãos) para percorrer
+# subárvores e trocar de pai em O(1).
+
+
+class ArvoreDinamica:
+    def __init__(self, graph, source=0, dist=None, pred=None):
+        """
+        Árvore de caminhos mínimos de source em graph. dist/pred de uma
+        árvore já calculada (por exemplo, a do cache do servidor) evitam o
+        Dijkstra inicial; são copiados, o reparo não altera os originais.
+        """
+        n = graph.n
+        if (dist is None) != (pred is None):
+            raise ValueError("dist e pred devem ser dados juntos")
+        if dist is not None and (len(dist) != n or len(pred) != n):
+            raise ValueError(f"dist/pred com {len(dist)}/{len(pred)} posições; o grafo tem {n} vértices")
+        self.graph = graph
+        self.n = n
+        self.source = source
+        self.pesos = array("d", graph.weights)
+        self.extras = {}      # u -> {v: w}, arestas inseridas fora do CSR
+        self.extras_rev = {}  # v -> {u: w}
+
+        # CSR transposto com o índice da aresta original no lugar do peso
+        rev = CSRGraph.from_edges(n, graph.targets, graph.sources(), array("d", range(graph.m)))
+        self.rev_offsets = rev.offsets
+        self.rev_origens = rev.targets
+        self.rev_aresta = array("q", map(int, rev.weights))
+
+        if dist is None:
+            self.dist, self.pred = dijkstra_arvore(graph, source)
+        else:
+            self.dist, self.pred = array("d", dist), array("i", pred)
+        self.primeiro = array("i", [-1]) * n
+        self.proximo = array("i", [-1]) * n
+        self.anterior = array("i", [-1]) * n
+        pred = self.pred
+        for v in range(n):
+            if pred[v] >= 0:
+                self._ligar(v, pred[v])
+
+    # ----------------------------
+    # Árvore: listas de filhos
+    # ----------------------------
+    def _ligar(self, v, p):
+        self.pred[v] = p
+        b = self.primeiro[p]
+        self.proximo[v] = b
+        self.anterior[v] = -1
+        if b >= 0:
+            self.anterior[b] = v
+        self.primeiro[p] = v
+
+    def _desligar(self, v):
+        p = self.pred[v]
+        if p < 0:
+            return
+        a = self.anterior[v]
+        b = self.proximo[v]
+        if a >= 0:
+            self.proximo[a] = b
+        else:
+            self.primeiro[p] = b
+        if b >= 0:
+            self.anterior[b] = a
+        self.pred[v] = -1
+        self.proximo[v] = self.anterior[v] = -1
+
+    def _trocar_pred(self, v, p):
+        if self.pred[v] != p:
+            self._desligar(v)
+            if p >= 0:
+                self._ligar(v, p)
+
+    def subarvore(self, r):
+        """Vértices da subárvore de r (incluindo r)."""
+        primeiro = self.primeiro
+        proximo = self.proximo
+        saida = []
+        pilha = [r]
+        while pilha:
+            u = pilha.pop()
+            saida.append(u)
+            c = primeiro[u]
+            while c >= 0:
+                pilha.append(c)
+                c = proximo[c]
+        return saida
+
+    # ----------------------------
+    # Grafo atual
+    # ----------------------------
+    def _saida(self, u):
+        """Itera sobre (v, w) das arestas de saída de u com os pesos atuais."""
+        g = self.graph
+        pesos = self.pesos
+        targets = g.targets
+        for i in range(g.offsets[u], g.offsets[u + 1]):
+            w = pesos[i]
+            if w < INF:
+                yield targets[i], w
+        extras = self.extras.get(u)
+        if extras:
+            yield from extras.items()
+
+    def _entrada(self, v):
+        """Itera sobre (u, w) das arestas de entrada de v com os pesos atuais."""
+        pesos = self.pesos
+        origens = self.rev_origens
+        aresta = self.rev_aresta
+        for j in range(self.rev_offsets[v], self.rev_offsets[v + 1]):
+            w = pesos[aresta[j]]
+            if w < INF:
+                yield origens[j], w
+        extras = self.extras_rev.get(v)
+        if extras:
+            yield from extras.items()
+
+    def peso(self, u, v):
+        """Peso atual de u -> v (o menor, se houver paralelas); INF se não existir."""
+        g = self.graph
+        w = INF
+        for i in range(g.offsets[u], g.offsets[u + 1]):
+            if g.targets[i] == v and self.pesos[i] < w:
+                w = self.pesos[i]
+        extra = self.extras.get(u, {}).get(v, INF)
+        return extra if extra < w else w
+
+    def _definir(self, u, v, w):
+        """Troca o peso de todas as arestas u -> v por w (None = remove; nova = insere)."""
+        g = self.graph
+        no_csr = False
+        for i in range(g.offsets[u], g.offsets[u + 1]):
+            if g.targets[i] == v:
+                self.pesos[i] = INF if w is None else w
+                no_csr = True
+        if w is None or no_csr:
+            if v in self.extras.get(u, ()):
+                del self.extras[u][v]
+                del self.extras_rev[v][u]
+        else:
+            self.extras.setdefault(u, {})[v] = w
+            self.extras_rev.setdefault(v, {})[u] = w
+
+    def grafo_atual(self):
+        """CSRGraph com as arestas e pesos atuais (para conferência)."""
+        us, vs, ws = array("i"), array("i"), array("d")
+        for u in range(self.n):
+            for v, w in self._saida(u):
+                us.append(u)
+                vs.append(v)
+                ws.append(w)
+        return CSRGraph.from_edges(self.n, us, vs, ws)
+
+    # ----------------------------
+    # Reparo
+    # ----------------------------
+    def atualizar(self, mudancas):
+        """
+        Aplica um lote de mudanças [(u, v, novo_peso), ...] (novo_peso None
+        remove a aresta; aresta inexistente é inserida) e repara dist/pred.
+        Retorna {"tocados", "alterados", "subarvores", "afetados"}.
+        """
+        dist = self.dist
+        pred = self.pred
+        raizes = []
+        reduzidas = []
+        for u, v, w in mudancas:
+            antes = self.peso(u, v)
+            self._definir(u, v, w)
+            depois = self.peso(u, v)
+            if depois > antes and pred[v] == u:
+                raizes.append(v)
+            elif depois < antes:
+                reduzidas.append((u, v))
+
+        antigos = {}
+        tocados = set()
+
+        # fase 1: subárvores que perderam a aresta do pred
+        afetados = set()
+        for r in raizes:
+            if r not in afetados:
+                afetados.update(self.subarvore(r))
+        heap = []
+        for v in afetados:
+            antigos[v] = dist[v]
+            dist[v] = INF
+        for v in afetados:
+            melhor, p = INF, -1
+            for u, w in self._entrada(v):
+                if u not in afetados and dist[u] + w < melhor:
+                    melhor, p = dist[u] + w, u
+            dist[v] = melhor
+            self._trocar_pred(v, p)
+            if melhor < INF:
+                heap.append((melhor, v))
+        heapq.heapify(heap)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for v, w in self._saida(u):
+                nd = d + w
+                if v in afetados and nd < dist[v]:
+                    dist[v] = nd
+                    self._trocar_pred(v, u)
+                    heapq.heappush(heap, (nd, v))
+        tocados |= afetados
+
+        # fase 2: arestas que encurtam caminhos (reduzidas e as que saem dos
+        # vértices recalculados, que podem ter ficado mais curtos)
+        def relaxar(u, v, w):
+            nd = dist[u] + w
+            if nd < dist[v]:
+                antigos.setdefault(v, dist[v])
+                dist[v] = nd
+                self._trocar_pred(v, u)
+                heapq.heappush(heap, (nd, v))
+
+        for u, v in reduzidas:
+            # peso lido agora: a mesma aresta pode mudar mais de uma vez no lote
+            w = self.peso(u, v)
+            if w < INF:
+                relaxar(u, v, w)
+        for u in afetados:
+            for v, w in self._saida(u):
+                if v not in afetados:
+                    relaxar(u, v, w)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            tocados.add(u)
+            for v, w in self._saida(u):
+                relaxar(u, v, w)
+
+        alterados = sum(1 for v, d in antigos.items() if d != dist[v])
+        return {"tocados": len(tocados), "alterados": alterados,
+                "subarvores": len(raizes), "afetados": len(afetados)}
+
+
+# ----------------------------
+# Conferência e medição
+# ----------------------------
+def lote_aleatorio(dinamica, k, rng):
+    """Lote de k mudanças sorteadas: aumentos, reduções, remoções e inserções."""
+    g = dinamica.graph
+    mudancas = []
+    while len(mudancas) < k:
+        u = rng.randrange(g.n)
+        saida = list(dinamica._saida(u))
+        if not saida:
+            continue
+        v, w = rng.choice(saida)
+        r = rng.random()
+        if r < 0.4:
+            mudancas.append((u, v, w * rng.uniform(1.2, 3.0)))    # trânsito, penalidade
+        elif r < 0.7:
+            mudancas.append((u, v, w * rng.uniform(0.5, 0.95)))   # via liberada
+        elif r < 0.85:
+            mudancas.append((u, v, None))                        # interdição
+        else:
+            # atalho entre u e um vizinho de v (inserção, ou redução se já existir)
+            segundo = list(dinamica._saida(v))
+            if segundo:
+                x, w2 = rng.choice(segundo)
+                if x != u:
+                    mudancas.append((u, x, (w + w2) * rng.uniform(0.6, 0.95)))
+    return mudancas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reparo incremental de caminhos mínimos após mudanças de peso.")
+    parser.add_argument("--grafos", nargs="*", default=None, help="arquivos de grafo (padrão: graphs/rio_*.csv)")
+    parser.add_argument("--fonte", type=int, default=0)
+    parser.add_argument("--lote", type=int, default=10, help="mudanças por lote")
+    parser.add_argument("--lotes", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sem-conferir", action="store_true",
+                        help="não recalcula do zero para conferir (só mede o reparo)")
+    args = parser.parse_args()
+
+    files = args.grafos or sorted(glob.glob(os.path.join("graphs", "rio_*.csv")))
+    if not files:
+        print("Nenhum grafo encontrado.")
+        return
+
+    rng = random.Random(args.seed)
+    for path in files:
+        graph = load_graph(path)
+        if graph.n == 0:
+            continue
+        dinamica = ArvoreDinamica(graph, args.fonte)
+        t_reparo = t_zero = 0.0
+        tocados = erros = 0
+        for _ in range(args.lotes):
+            mudancas = lote_aleatorio(dinamica, args.lote, rng)
+            inicio = time.perf_counter()
+            info = dinamica.atualizar(mudancas)
+            t_reparo += time.perf_counter() - inicio
+            tocados += info["tocados"]
+            if not args.sem_conferir:
+                atual = dinamica.grafo_atual()
+                inicio = time.perf_counter()
+                ref = dijkstra(atual, args.fonte)
+                t_zero += time.perf_counter() - inicio
+                erros += sum(1 for a, b in zip(ref, dinamica.dist)
+                             if not (a == b or math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)))
+
+        linha = (f"  - {os.path.basename(path)} (n={graph.n}, m={graph.m}): "
+                 f"{args.lotes} lotes de {args.lote}, reparo médio {1e3 * t_reparo / args.lotes:.3f} ms, "
+                 f"{tocados / args.lotes:.0f} vértices tocados por lote ({100 * tocados / args.lotes / graph.n:.2f}%)")
+        if not args.sem_conferir:
+            linha += (f", do zero {1e3 * t_zero / args.lotes:.3f} ms ({t_zero / max(t_reparo, 1e-12):.1f}x), "
+                      + ("OK" if erros == 0 else f"{erros} DIVERGÊNCIAS"))
+        print(linha)
+
+
+if __name__ == "__main__":
+    main()
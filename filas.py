@@ -0,0 +1,332 @@
+# ----------------------------
+# Filas de prioridade com decrease-key
+# ----------------------------
+# Todas as filas têm a mesma interface, usada pelos Dijkstras com fila
+# selecionável:
+#   Fila(n, max_peso)   n = número de vértices, max_peso = maior peso de aresta
+#   push(v, chave)      insere v ou diminui sua chave (nunca duplica v)
+#   pop()               remove e retorna (chave, v) de menor chave
+#   limpar()            esvazia a fila para reaproveitá-la em outra busca
+#   len(fila) / bool(fila)
+# Como cada vértice aparece no máximo uma vez, não existem entradas
+# desatualizadas ("stale") e o tamanho da fila fica limitado por n.
+
+
+class FilaHeapIndexado:
+    """
+    Heap binário indexado (array-backed) com decrease-key de verdade:
+    heap guarda os vértices, pos[v] a posição de v no heap (-1 se fora)
+    e chave[v] a prioridade. Aceita chaves reais.
+    """
+
+    def __init__(self, n, max_peso=None):
+        self.heap = []
+        self.pos = [-1] * n
+        self.chave = [0.0] * n
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __bool__(self):
+        return bool(self.heap)
+
+    def limpar(self):
+        for v in self.heap:
+            self.pos[v] = -1
+        self.heap.clear()
+
+    def _subir(self, i, v, k):
+        heap = self.heap
+        pos = self.pos
+        chave = self.chave
+        while i > 0:
+            p = (i - 1) >> 1
+            w = heap[p]
+            if chave[w] <= k:
+                break
+            heap[i] = w
+            pos[w] = i
+            i = p
+        heap[i] = v
+        pos[v] = i
+
+    def push(self, v, k):
+        i = self.pos[v]
+        if i < 0:
+            self.chave[v] = k
+            self.heap.append(v)
+            self._subir(len(self.heap) - 1, v, k)
+        elif k < self.chave[v]:
+            self.chave[v] = k
+            self._subir(i, v, k)
+
+    def pop(self):
+        heap = self.heap
+        pos = self.pos
+        chave = self.chave
+        topo = heap[0]
+        ultimo = heap.pop()
+        pos[topo] = -1
+        tam = len(heap)
+        if tam:
+            # desce o último elemento a partir da raiz ("buraco" na raiz)
+            k = chave[ultimo]
+            i = 0
+            while True:
+                c = 2 * i + 1
+                if c >= tam:
+                    break
+                if c + 1 < tam and chave[heap[c + 1]] < chave[heap[c]]:
+                    c += 1
+                w = heap[c]
+                if k <= chave[w]:
+                    break
+                heap[i] = w
+                pos[w] = i
+                i = c
+            heap[i] = ultimo
+            pos[ultimo] = i
+        return chave[topo], topo
+
+
+class FilaPairing:
+    """
+    Pairing heap com decrease-key, com os nós guardados em vetores indexados
+    pelo vértice (filho, irmao, ant), sem um objeto por nó. ant[v] é o pai
+    se v for o primeiro filho, senão o irmão à esquerda. Aceita chaves reais.
+    """
+
+    def __init__(self, n, max_peso=None):
+        self.chave = [0.0] * n
+        self.filho = [-1] * n
+        self.irmao = [-1] * n
+        self.ant = [-1] * n
+        self.na_fila = bytearray(n)
+        self.raiz = -1
+        self.tamanho = 0
+
+    def __len__(self):
+        return self.tamanho
+
+    def __bool__(self):
+        return self.tamanho > 0
+
+    def limpar(self):
+        while self.tamanho:
+            self.pop()
+
+    def _unir(self, a, b):
+        """Une duas raízes; a de maior chave vira primeiro filho da outra."""
+        chave = self.chave
+        if chave[b] < chave[a]:
+            a, b = b, a
+        f = self.filho[a]
+        self.irmao[b] = f
+        if f != -1:
+            self.ant[f] = b
+        self.ant[b] = a
+        self.filho[a] = b
+        return a
+
+    def push(self, v, k):
+        if not self.na_fila[v]:
+            self.na_fila[v] = 1
+            self.tamanho += 1
+            self.chave[v] = k
+            self.filho[v] = self.irmao[v] = self.ant[v] = -1
+            self.raiz = v if self.raiz == -1 else self._unir(self.raiz, v)
+            return
+        if k >= self.chave[v]:
+            return
+        self.chave[v] = k
+        if v == self.raiz:
+            return
+        # desliga a subárvore de v e une com a raiz
+        a = self.ant[v]
+        i = self.irmao[v]
+        if self.filho[a] == v:
+            self.filho[a] = i
+        else:
+            self.irmao[a] = i
+        if i != -1:
+            self.ant[i] = a
+        self.irmao[v] = self.ant[v] = -1
+        self.raiz = self._unir(self.raiz, v)
+
+    def pop(self):
+        r = self.raiz
+        irmao = self.irmao
+        ant = self.ant
+        filhos = []
+        c = self.filho[r]
+        while c != -1:
+            prox = irmao[c]
+            irmao[c] = ant[c] = -1
+            filhos.append(c)
+            c = prox
+
+        # duas passadas: pares da esquerda para a direita, depois da direita para a esquerda
+        pares = [self._unir(filhos[j], filhos[j + 1]) if j + 1 < len(filhos) else filhos[j]
+                 for j in range(0, len(filhos), 2)]
+        nova = -1
+        for a in reversed(pares):
+            nova = a if nova == -1 else self._unir(a, nova)
+
+        self.raiz = nova
+        self.filho[r] = -1
+        self.na_fila[r] = 0
+        self.tamanho -= 1
+        return self.chave[r], r
+
+
+class FilaRadix:
+    """
+    Radix heap monótono para chaves inteiras não negativas.
+    O bucket i guarda os vértices cuja chave difere de 'ultimo' (a última
+    chave extraída) a partir do bit i-1; pop só redistribui o primeiro
+    bucket não vazio. Exige chaves inteiras e extrações monótonas (como no
+    Dijkstra com pesos não negativos).
+    """
+
+    def __init__(self, n, max_peso=None):
+        self.buckets = [{} for _ in range(65)]
+        self.onde = [-1] * n
+        self.ultimo = 0
+        self.tamanho = 0
+
+    def __len__(self):
+        return self.tamanho
+
+    def __bool__(self):
+        return self.tamanho > 0
+
+    def limpar(self):
+        for bucket in self.buckets:
+            for v in bucket:
+                self.onde[v] = -1
+            bucket.clear()
+        self.ultimo = 0
+        self.tamanho = 0
+
+    def push(self, v, chave):
+        chave = int(chave)
+        i = self.onde[v]
+        if i >= 0:
+            del self.buckets[i][v]
+        else:
+            self.tamanho += 1
+        i = (chave ^ self.ultimo).bit_length()
+        self.buckets[i][v] = chave
+        self.onde[v] = i
+
+    def pop(self):
+        buckets = self.buckets
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            bucket = buckets[i]
+            ultimo = min(bucket.values())
+            self.ultimo = ultimo
+            onde = self.onde
+            for v, chave in bucket.items():
+                j = (chave ^ ultimo).bit_length()
+                buckets[j][v] = chave
+                onde[v] = j
+            bucket.clear()
+        v, chave = buckets[0].popitem()
+        self.onde[v] = -1
+        self.tamanho -= 1
+        return chave, v
+
+
+class FilaDial:
+    """
+    Fila de buckets circular de Dial para pesos inteiros em [0, max_peso].
+    Com C = max_peso + 1, todas as chaves presentes estão em [atual, atual + C),
+    então C buckets bastam. Por isso só serve para busca a partir de uma
+    única fonte (ou de fontes cujas chaves caibam nessa janela). Os buckets
+    ficam num dicionário chave % C -> {v: chave} e só existem enquanto têm
+    vértices, então criar a fila não custa O(C). Boa para pesos pequenos
+    (1..10 nos grafos sintéticos); com pesos grandes (milímetros no OSM) o
+    pop varre buckets vazios demais: fila_efetiva troca por FilaRadix.
+    """
+
+    def __init__(self, n, max_peso):
+        self.C = int(max_peso) + 1
+        self.buckets = {}
+        self.onde = [-1] * n
+        self.atual = 0
+        self.tamanho = 0
+
+    def __len__(self):
+        return self.tamanho
+
+    def __bool__(self):
+        return self.tamanho > 0
+
+    def limpar(self):
+        for bucket in self.buckets.values():
+            for v in bucket:
+                self.onde[v] = -1
+        self.buckets.clear()
+        self.atual = 0
+        self.tamanho = 0
+
+    def push(self, v, chave):
+        chave = int(chave)
+        buckets = self.buckets
+        i = self.onde[v]
+        if i >= 0:
+            bucket = buckets[i]
+            del bucket[v]
+            if not bucket:
+                del buckets[i]
+        else:
+            self.tamanho += 1
+        i = chave % self.C
+        bucket = buckets.get(i)
+        if bucket is None:
+            bucket = buckets[i] = {}
+        bucket[v] = chave
+        self.onde[v] = i
+
+    def pop(self):
+        buckets = self.buckets
+        C = self.C
+        atual = self.atual
+        while atual % C not in buckets:
+            atual += 1
+        self.atual = atual
+        i = atual % C
+        bucket = buckets[i]
+        v, chave = bucket.popitem()
+        if not bucket:
+            del buckets[i]
+        self.onde[v] = -1
+        self.tamanho -= 1
+        return chave, v
+
+
+# a Dial varre em média até C buckets por pop; com C acima de algumas vezes
+# n (pesos em milímetros em grafos de poucos milhares de vértices) a varredura
+# domina e o radix, que só depende do número de bits da chave, ganha
+DIAL_MAX_C_POR_VERTICE = 4
+
+
+def fila_efetiva(nome, n, max_peso):
+    """Nome da fila a usar no lugar de nome: "dial" vira "radix" se C = max_peso + 1 passa de DIAL_MAX_C_POR_VERTICE * n."""
+    if nome == "dial" and int(max_peso) + 1 > DIAL_MAX_C_POR_VERTICE * max(n, 1):
+        return "radix"
+    return nome
+
+
+FILAS = {
+    "binario": FilaHeapIndexado,
+    "pairing": FilaPairing,
+    "radix": FilaRadix,
+    "dial": FilaDial,
+}
+
+# filas com chave inteira (exigem o grafo em ponto fixo, ver grafo.para_ponto_fixo)
+FILAS_INTEIRAS = {"radix", "dial"}
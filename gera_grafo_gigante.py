@@ -1,58 +1,345 @@
-import csv
+import argparse
+import hashlib
+import math
 import os
-import random
+import struct
+import time
 
-def generate_big_grid(rows, cols, max_weight=10, bidirectional=False):
+try:
+    import numpy as np
+except ImportError:  # o gerador em blocos é todo vetorizado: sem numpy, não roda
+    np = None
+
+from grafo_binario import FORMATO_CABECALHO, MAGIC, TAM_CABECALHO, VERSAO, caminho_binario
+
+# ----------------------------
+# Geradores de grafos grandes (vetorizados, em blocos)
+# ----------------------------
+# Cada família gera as arestas em blocos de arrays numpy (u, v, w); o bloco
+# i usa o gerador default_rng([seed, i]), então a mesma seed (com o mesmo
+# --bloco) produz sempre o mesmo grafo e cada bloco pode ser gerado de novo
+# sem guardar os outros.
+# A escrita é em fluxo, sem o grafo inteiro na memória:
+#   1ª passada  CSV bloco a bloco (com sha1 calculado junto) e graus por vértice;
+#   2ª passada  os mesmos blocos regenerados e espalhados direto nas posições
+#               finais do .csrg (np.memmap), com um cursor por vértice.
+# Com CSV e CSR, o .csrg vai para cache_csr/ com o cabeçalho do CSV
+# (mtime, tamanho, sha1): load_graph abre o grafo sem reconverter o CSV.
+# A ordem das arestas de cada vértice no CSR é a ordem do CSV, igual à que
+# load_graph_from_csv montaria.
+#
+# Famílias:
+#   grade       grade rows x cols, arestas para a direita e para baixo
+#               (opcionalmente nos dois sentidos), pesos inteiros 1..max
+#   estradas    malha viária planar: quarteirões de 50-150 m, trechos
+#               removidos e ruas de mão única sorteados
+#   rmat        R-MAT (Chakrabarti et al.), graus em lei de potência; ids
+#               embaralhados por uma permutação da seed; pode ter paralelas
+#   geometrico  pontos uniformes num quadrado, arestas (nos dois sentidos)
+#               entre pontos a menos de um raio, peso = distância euclidiana
+
+TAM_BLOCO = 1 << 20  # arestas por bloco (aproximado)
+
+
+# ----------------------------
+# Famílias
+# ----------------------------
+def _rng(seed, i):
+    return np.random.default_rng([seed, i])
+
+
+def blocos_grade(rows, cols, seed=42, max_weight=10, bidirectional=False, bloco=TAM_BLOCO):
+    por_bloco = max(1, bloco // (4 * cols))
+    for i, r0 in enumerate(range(0, rows, por_bloco)):
+        rng = _rng(seed, i)
+        r1 = min(rows, r0 + por_bloco)
+        r = np.arange(r0, r1, dtype=np.int64)[:, None]
+        c = np.arange(cols, dtype=np.int64)[None, :]
+        # direita: (r, c) -> (r, c+1); baixo: (r, c) -> (r+1, c)
+        dir_u = (r * cols + c[:, :-1]).ravel()
+        baixo_u = (r[r[:, 0] + 1 < rows] * cols + c).ravel()
+        us = [dir_u, baixo_u]
+        vs = [dir_u + 1, baixo_u + cols]
+        if bidirectional:
+            us, vs = us + vs, vs + us
+        u = np.concatenate(us)
+        v = np.concatenate(vs)
+        yield u, v, rng.integers(1, max_weight + 1, len(u))
+
+
+def blocos_estradas(rows, cols, seed=42, p_remover=0.1, p_mao_unica=0.2, bloco=TAM_BLOCO):
+    por_bloco = max(1, bloco // (4 * cols))
+    for i, r0 in enumerate(range(0, rows, por_bloco)):
+        rng = _rng(seed, i)
+        r1 = min(rows, r0 + por_bloco)
+        r = np.arange(r0, r1, dtype=np.int64)[:, None]
+        c = np.arange(cols, dtype=np.int64)[None, :]
+        dir_a = (r * cols + c[:, :-1]).ravel()
+        baixo_a = (r[r[:, 0] + 1 < rows] * cols + c).ravel()
+        a = np.concatenate([dir_a, baixo_a])
+        b = np.concatenate([dir_a + 1, baixo_a + cols])
+
+        mantem = rng.random(len(a)) >= p_remover
+        comprimento = rng.integers(500, 1501, len(a)) / 10  # metros, com 1 casa
+        sorteio = rng.random(len(a))
+        ida = mantem & ~(sorteio < p_mao_unica / 2)                          # a -> b
+        volta = mantem & ~((sorteio >= p_mao_unica / 2) & (sorteio < p_mao_unica))  # b -> a
+        yield (np.concatenate([a[ida], b[volta]]), np.concatenate([b[ida], a[volta]]),
+               np.concatenate([comprimento[ida], comprimento[volta]]))
+
+
+def blocos_rmat(escala, grau, seed=42, max_weight=10, a=0.57, b=0.19, c=0.19, bloco=TAM_BLOCO):
+    n = 1 << escala
+    m = grau * n
+    permutacao = np.random.default_rng([seed, 1 << 30]).permutation(n)
+    for i, inicio in enumerate(range(0, m, bloco)):
+        rng = _rng(seed, i)
+        k = min(bloco, m - inicio)
+        u = np.zeros(k, dtype=np.int64)
+        v = np.zeros(k, dtype=np.int64)
+        for bit in range(escala):
+            x = rng.random(k)
+            # quadrantes: a = (0,0), b = (0,1), c = (1,0), d = (1,1)
+            u |= (x >= a + b).astype(np.int64) << bit
+            v |= (((x >= a) & (x < a + b)) | (x >= a + b + c)).astype(np.int64) << bit
+        u = permutacao[u]
+        v = permutacao[v]
+        w = rng.integers(1, max_weight + 1, k)
+        fora_laco = u != v
+        yield u[fora_laco], v[fora_laco], w[fora_laco]
+
+
+def blocos_geometrico(n, grau, seed=42, bloco=TAM_BLOCO):
+    # quadrado de lado ~100 m por vértice e raio que dá o grau médio pedido
+    lado = math.sqrt(n) * 100.0
+    raio = 100.0 * math.sqrt(grau / math.pi)
+    g = max(1, int(lado // raio))
+    pontos = np.random.default_rng([seed, 1 << 30]).random((n, 2)) * lado
+    celula_xy = np.minimum((pontos / (lado / g)).astype(np.int64), g - 1)
+    celula = celula_xy[:, 1] * g + celula_xy[:, 0]
+    # renumera os vértices pela célula: vizinhos geométricos ficam com ids próximos
+    ordem = np.argsort(celula, kind="stable")
+    pontos = pontos[ordem]
+    celula_xy = celula_xy[ordem]
+    inicio_celula = np.searchsorted(celula[ordem], np.arange(g * g + 1))
+
+    por_bloco = max(1, bloco // (grau + 1))
+    for s0 in range(0, n, por_bloco):
+        fontes = np.arange(s0, min(n, s0 + por_bloco), dtype=np.int64)
+        us, vs = [], []
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                cx = celula_xy[fontes, 0] + dx
+                cy = celula_xy[fontes, 1] + dy
+                valida = (cx >= 0) & (cx < g) & (cy >= 0) & (cy < g)
+                viz = np.where(valida, cy * g + cx, 0)
+                ini = inicio_celula[viz]
+                cont = np.where(valida, inicio_celula[viz + 1] - ini, 0)
+                total = int(cont.sum())
+                if total == 0:
+                    continue
+                u = np.repeat(fontes, cont)
+                v = np.repeat(ini - np.cumsum(cont) + cont, cont) + np.arange(total)
+                us.append(u)
+                vs.append(v)
+        if not us:
+            continue
+        u = np.concatenate(us)
+        v = np.concatenate(vs)
+        d = np.hypot(*(pontos[u] - pontos[v]).T)
+        perto = (d <= raio) & (u != v)
+        u, v, d = u[perto], v[perto], d[perto]
+        # arestas de cada fonte juntas e em ordem de destino
+        ordem = np.lexsort((v, u))
+        # peso em metros com 1 casa (mínimo 0.1)
+        w = np.maximum(np.rint(d[ordem] * 10), 1) / 10
+        yield u[ordem], v[ordem], w
+
+
+FAMILIAS = {
+    "grade": blocos_grade,
+    "estradas": blocos_estradas,
+    "rmat": blocos_rmat,
+    "geometrico": blocos_geometrico,
+}
+
+
+# ----------------------------
+# Escrita em fluxo
+# ----------------------------
+def _linhas_csv(u, v, w):
+    # uma formatação só por bloco; %r dá a representação mais curta que
+    # volta exatamente ao mesmo float (e inteiros sem casas decimais)
+    k = len(u)
+    intercalado = [None] * (3 * k)
+    intercalado[0::3] = u.tolist()
+    intercalado[1::3] = v.tolist()
+    intercalado[2::3] = w.tolist()
+    return (("%d,%d,%r\n" * k) % tuple(intercalado)).encode("ascii")
+
+
+def primeira_passada(blocos, path_csv=None):
+    """
+    Escreve o CSV (se path_csv) e conta os graus. Retorna (n, m, graus, sha1),
+    com n = maior id + 1, como em load_graph_from_csv.
+    """
+    graus = np.zeros(0, dtype=np.int64)
+    m = 0
+    h = hashlib.sha1()
+    f = None
+    if path_csv is not None:
+        os.makedirs(os.path.dirname(path_csv) or ".", exist_ok=True)
+        f = open(path_csv + ".tmp", "wb")
+        cabecalho = b"u,v,w\n"
+        f.write(cabecalho)
+        h.update(cabecalho)
+    try:
+        for u, v, w in blocos:
+            if len(u) == 0:
+                continue
+            maior = int(max(u.max(), v.max())) + 1
+            if maior > len(graus):
+                graus = np.concatenate([graus, np.zeros(maior - len(graus), dtype=np.int64)])
+            origens, cont = np.unique(u, return_counts=True)
+            graus[origens] += cont
+            m += len(u)
+            if f is not None:
+                dados = _linhas_csv(u, v, w)
+                f.write(dados)
+                h.update(dados)
+    finally:
+        if f is not None:
+            f.close()
+    if path_csv is not None:
+        os.replace(path_csv + ".tmp", path_csv)
+    return len(graus), m, graus, h.digest()
+
+
+def segunda_passada(blocos, n, m, graus, path_csrg, mtime_ns=0, tamanho=0, sha1=b"\0" * 20):
+    """Espalha os blocos (regenerados) direto no .csrg, no layout de grafo_binario."""
+    os.makedirs(os.path.dirname(path_csrg) or ".", exist_ok=True)
+    tmp = f"{path_csrg}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(struct.pack(FORMATO_CABECALHO, MAGIC, VERSAO, 0, n, m, mtime_ns, tamanho, sha1)
+                .ljust(TAM_CABECALHO, b"\0"))
+        f.truncate(TAM_CABECALHO + 8 * (n + 1) + 8 * m + 4 * m)
+
+    pos = TAM_CABECALHO
+    offsets = np.memmap(tmp, dtype="<i8", mode="r+", offset=pos, shape=(n + 1,))
+    pos += 8 * (n + 1)
+    weights = np.memmap(tmp, dtype="<f8", mode="r+", offset=pos, shape=(m,)) if m else np.zeros(0)
+    pos += 8 * m
+    targets = np.memmap(tmp, dtype="<i4", mode="r+", offset=pos, shape=(m,)) if m else np.zeros(0)
+
+    offsets[0] = 0
+    np.cumsum(graus, out=offsets[1:])
+    cursor = np.array(offsets[:-1])
+    for u, v, w in blocos:
+        if len(u) == 0:
+            continue
+        ordem = np.argsort(u, kind="stable")
+        us = u[ordem]
+        # posição de cada aresta dentro do grupo da sua origem no bloco
+        posto = np.arange(len(us)) - np.searchsorted(us, us, side="left")
+        destino = cursor[us] + posto
+        targets[destino] = v[ordem]
+        weights[destino] = w[ordem]
+        origens, cont = np.unique(us, return_counts=True)
+        cursor[origens] += cont
+    for arr in (offsets, weights, targets):
+        if isinstance(arr, np.memmap):
+            arr.flush()
+    del offsets, weights, targets
+    os.replace(tmp, path_csrg)
+
+
+def gerar(familia, parametros, path_csv=None, path_csrg=None, seed=42, bloco=TAM_BLOCO):
     """
-    Gera um grafo em grade rows x cols.
-    Cada vértice (r,c) vira um id = r*cols + c.
-    Arestas para direita e para baixo (e opcionalmente para cima/esquerda).
+    Gera o grafo da família com os parâmetros dados, gravando o CSV e/ou o
+    .csrg (para o cache de load_graph, use path_csrg = caminho_binario(path_csv)).
+    Retorna (n, m).
     """
-    edges = []
-    def vid(r, c):
-        return r * cols + c
-
-    for r in range(rows):
-        for c in range(cols):
-            u = vid(r, c)
-            # direita
-            if c + 1 < cols:
-                v = vid(r, c + 1)
-                w = random.randint(1, max_weight)
-                edges.append((u, v, w))
-                if bidirectional:
-                    edges.append((v, u, random.randint(1, max_weight)))
-            # baixo
-            if r + 1 < rows:
-                v = vid(r + 1, c)
-                w = random.randint(1, max_weight)
-                edges.append((u, v, w))
-                if bidirectional:
-                    edges.append((v, u, random.randint(1, max_weight)))
-    return edges
-
-def save_graph_csv(path, edges):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["u", "v", "w"])
-        for u, v, wt in edges:
-            w.writerow([u, v, wt])
+    def blocos():
+        return FAMILIAS[familia](**parametros, seed=seed, bloco=bloco)
+
+    n, m, graus, sha1 = primeira_passada(blocos(), path_csv)
+    if path_csrg is not None:
+        if path_csv is not None:
+            st = os.stat(path_csv)
+            segunda_passada(blocos(), n, m, graus, path_csrg, st.st_mtime_ns, st.st_size, sha1)
+        else:
+            segunda_passada(blocos(), n, m, graus, path_csrg)
+    return n, m
+
 
 def main():
-    # ajuste aqui o tamanho da grade:
-    rows = 400
-    cols = 400
-    bidirectional = False  # pode testar True também, fica mais denso
-
-    edges = generate_big_grid(rows, cols, max_weight=10, bidirectional=bidirectional)
-    n = rows * cols
-    m = len(edges)
-    print(f"Grafo gerado: n={n}, m={m}")
-
-    path = os.path.join("graphs", f"grid_{rows}x{cols}.csv")
-    save_graph_csv(path, edges)
-    print("Salvo em:", path)
+    parser = argparse.ArgumentParser(description="Gera grafos grandes em blocos (numpy), sem o grafo inteiro na memória.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--saida", default=None, help="CSV de saída (padrão: graphs/<família>_<parâmetros>.csv)")
+    parser.add_argument("--formato", choices=["csv", "csrg", "ambos"], default="ambos",
+                        help="csrg = só o binário (ao lado de --saida, abrir com grafo_binario.abrir_binario)")
+    parser.add_argument("--bloco", type=int, default=TAM_BLOCO, help="arestas por bloco")
+    sub = parser.add_subparsers(dest="familia")
+
+    p = sub.add_parser("grade", help="grade rows x cols (padrão: 400 x 400)")
+    p.add_argument("--linhas", type=int, default=400)
+    p.add_argument("--colunas", type=int, default=400)
+    p.add_argument("--max-peso", type=int, default=10)
+    p.add_argument("--bidirecional", action="store_true")
+
+    p = sub.add_parser("estradas", help="malha viária planar")
+    p.add_argument("--linhas", type=int, default=1000)
+    p.add_argument("--colunas", type=int, default=1000)
+    p.add_argument("--p-remover", type=float, default=0.1)
+    p.add_argument("--p-mao-unica", type=float, default=0.2)
+
+    p = sub.add_parser("rmat", help="R-MAT / lei de potência")
+    p.add_argument("--escala", type=int, default=20, help="n = 2^escala")
+    p.add_argument("--grau", type=int, default=8, help="grau médio")
+    p.add_argument("--max-peso", type=int, default=10)
+
+    p = sub.add_parser("geometrico", help="grafo geométrico aleatório")
+    p.add_argument("--n", type=int, default=1_000_000)
+    p.add_argument("--grau", type=int, default=6, help="grau médio aproximado")
+    args = parser.parse_args()
+
+    if np is None:
+        parser.error("este gerador requer numpy instalado")
+
+    familia = args.familia or "grade"
+    if familia == "grade":
+        parametros = {"rows": getattr(args, "linhas", 400), "cols": getattr(args, "colunas", 400),
+                      "max_weight": getattr(args, "max_peso", 10),
+                      "bidirectional": getattr(args, "bidirecional", False)}
+        nome = f"grid_{parametros['rows']}x{parametros['cols']}"
+    elif familia == "estradas":
+        parametros = {"rows": args.linhas, "cols": args.colunas,
+                      "p_remover": args.p_remover, "p_mao_unica": args.p_mao_unica}
+        nome = f"estradas_{args.linhas}x{args.colunas}"
+    elif familia == "rmat":
+        parametros = {"escala": args.escala, "grau": args.grau, "max_weight": args.max_peso}
+        nome = f"rmat_s{args.escala}_g{args.grau}"
+    else:
+        parametros = {"n": args.n, "grau": args.grau}
+        nome = f"geometrico_n{args.n}_g{args.grau}"
+
+    saida = args.saida or os.path.join("graphs", nome + ".csv")
+    path_csv = saida if args.formato != "csrg" else None
+    if args.formato == "csv":
+        path_csrg = None
+    elif args.formato == "csrg":
+        path_csrg = os.path.splitext(saida)[0] + ".csrg"
+    else:
+        path_csrg = caminho_binario(saida)
+
+    inicio = time.perf_counter()
+    n, m = gerar(familia, parametros, path_csv, path_csrg, args.seed, args.bloco)
+    print(f"Grafo gerado: n={n}, m={m} em {time.perf_counter() - inicio:.1f}s")
+    if path_csv is not None:
+        print("Salvo em:", path_csv)
+    if path_csrg is not None:
+        print("CSR em:", path_csrg)
+
 
 if __name__ == "__main__":
     main()
@@ -4,6 +4,8 @@ import unicodedata
 
 import osmnx as ox
 
+from grafo import caminho_coordenadas, caminho_ids_osm
+
 
 def sanitize_name(name: str) -> str:
     """
@@ -34,15 +36,38 @@ def graph_to_csv(G, path_out):
     ...
 
     Onde:
-    - vértices são renumerados para 0..n-1
+    - vértices são renumerados para 0..n-1 na ordem do id OSM (a mesma
+      numeração a cada regeneração, se o bairro não mudar)
     - w = comprimento da aresta em metros (atributo 'length')
     - em caso de múltiplas arestas u->v, fica só a menor
+
+    As coordenadas de cada vértice renumerado vão para um arquivo à parte
+    (ver caminho_coordenadas), no formato vertex,lat,lon, e o id OSM de
+    cada um para outro (ver caminho_ids_osm), no formato vertex,osm_id:
+    é por ele que cidade.py junta os bairros num grafo só.
     """
     os.makedirs(os.path.dirname(path_out), exist_ok=True)
 
-    nodes = list(G.nodes())
+    nodes = sorted(G.nodes())
     id_map = {node_id: idx for idx, node_id in enumerate(nodes)}
 
+    path_coords = caminho_coordenadas(path_out)
+    os.makedirs(os.path.dirname(path_coords), exist_ok=True)
+    with open(path_coords, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["vertex", "lat", "lon"])
+        for node_id in nodes:
+            data = G.nodes[node_id]
+            writer.writerow([id_map[node_id], f"{data['y']:.7f}", f"{data['x']:.7f}"])
+
+    path_ids = caminho_ids_osm(path_out)
+    os.makedirs(os.path.dirname(path_ids), exist_ok=True)
+    with open(path_ids, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["vertex", "osm_id"])
+        for node_id in nodes:
+            writer.writerow([id_map[node_id], node_id])
+
     best = {}  # (iu, iv) -> menor peso
     for u, v, data in G.edges(data=True):
         iu = id_map[u]
@@ -70,8 +95,11 @@ def baixar_grafo_bairro(bairro: str, pasta_saida: str, network_type: str = "driv
     query = f"{bairro}, Rio de Janeiro, Brazil"
     print(f"\n[INFO] Baixando grafo para: {query}")
 
-    # baixa o grafo viário (apenas vias dirigíveis)
-    G = ox.graph_from_place(query, network_type=network_type, simplify=True)
+    # baixa o grafo viário (apenas vias dirigíveis). truncate_by_edge=True
+    # mantém as arestas que cruzam a divisa (com o nó de fora), para que os
+    # dois bairros vizinhos tenham a aresta e cidade.py consiga costurá-los;
+    # o osmnx simplifica antes de recortar, então as pontas batem dos dois lados
+    G = ox.graph_from_place(query, network_type=network_type, simplify=True, truncate_by_edge=True)
 
     n = len(G.nodes())
     m = len(G.edges())
@@ -23,7 +23,9 @@ def generate_chain_graph(n, max_weight=10):
 
 def generate_random_graph(n, m, max_weight=10):
     """Grafo aleatório dirigido sem laços e sem arestas duplicadas."""
-    edges = set()
+    edges = []
+    # pares (u, v) já usados: o peso não entra na checagem de duplicata
+    pares = set()
     # evita tentar criar mais arestas do que o possível
     max_possible = n * (n - 1)
     m = min(m, max_possible)
@@ -33,11 +35,12 @@ def generate_random_graph(n, m, max_weight=10):
         v = random.randrange(0, n)
         if u == v:
             continue
-        if (u, v) in edges:
+        if (u, v) in pares:
             continue
         w = random.randint(1, max_weight)
-        edges.add((u, v, w))
-    return list(edges)
+        pares.add((u, v))
+        edges.append((u, v, w))
+    return edges
 
 def generate_grid_graph(rows, cols, max_weight=10, bidirectional=True):
     """
@@ -0,0 +1,290 @@
+import os
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: sem ele, usa o parser em Python puro
+    np = None
+
+# ----------------------------
+# Grafo em formato CSR (compressed sparse row)
+# ----------------------------
+# offsets[u] .. offsets[u+1] delimita as arestas de saída de u em
+# targets/weights. Os três vetores são arrays tipados (sem um objeto
+# Python por aresta), montados uma única vez por grafo e compartilhados
+# por todos os algoritmos.
+TIPO_OFFSET = "q"   # int64
+TIPO_ALVO = "i"     # int32
+TIPO_PESO = "d"     # float64
+
+# tamanho do bloco lido de uma vez pelo carregador de CSV
+TAM_BLOCO = 1 << 24
+
+
+class CSRGraph:
+    """
+    Grafo dirigido ponderado em formato CSR.
+      n       = número de vértices (0..n-1)
+      m       = número de arestas
+      offsets = array int64 de tamanho n+1
+      targets = array int32 de tamanho m (vértice de chegada)
+      weights = array float64 de tamanho m (peso da aresta)
+    """
+
+    __slots__ = ("n", "m", "offsets", "targets", "weights")
+
+    def __init__(self, n, offsets, targets, weights):
+        self.n = n
+        self.m = len(targets)
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+    @classmethod
+    def from_edges(cls, n, us, vs, ws):
+        """
+        Monta o CSR a partir de três sequências paralelas (u, v, w)
+        usando counting sort pelo vértice de origem (O(n + m)).
+        A ordem relativa das arestas de um mesmo vértice é preservada.
+        """
+        m = len(us)
+        grau = array(TIPO_OFFSET, bytes(8 * (n + 1)))
+        for u in us:
+            grau[u + 1] += 1
+        for i in range(n):
+            grau[i + 1] += grau[i]
+        offsets = array(TIPO_OFFSET, grau)
+
+        pos = grau  # reaproveita como cursor de escrita
+        targets = array(TIPO_ALVO, bytes(4 * m))
+        weights = array(TIPO_PESO, bytes(8 * m))
+        for i in range(m):
+            u = us[i]
+            k = pos[u]
+            targets[k] = vs[i]
+            weights[k] = ws[i]
+            pos[u] = k + 1
+        return cls(n, offsets, targets, weights)
+
+    def out_degree(self, u):
+        return self.offsets[u + 1] - self.offsets[u]
+
+    def neighbors(self, u):
+        """Itera sobre (v, w) das arestas de saída de u."""
+        targets = self.targets
+        weights = self.weights
+        for i in range(self.offsets[u], self.offsets[u + 1]):
+            yield targets[i], weights[i]
+
+    def edges(self):
+        """Itera sobre todas as arestas (u, v, w), agrupadas por origem."""
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+        for u in range(self.n):
+            for i in range(offsets[u], offsets[u + 1]):
+                yield u, targets[i], weights[i]
+
+    def sources(self):
+        """
+        Retorna um array int32 com a origem de cada aresta, na ordem do CSR
+        (útil para algoritmos que varrem a lista de arestas, como Bellman-Ford).
+        """
+        src = array(TIPO_ALVO, bytes(4 * self.m))
+        offsets = self.offsets
+        for u in range(self.n):
+            for i in range(offsets[u], offsets[u + 1]):
+                src[i] = u
+        return src
+
+    def reverse(self):
+        """Retorna o grafo transposto (arestas invertidas), também em CSR."""
+        return CSRGraph.from_edges(self.n, self.targets, self.sources(), self.weights)
+
+    def nbytes(self):
+        """Memória ocupada pelos três vetores do CSR, em bytes."""
+        return sum(a.itemsize * len(a) for a in (self.offsets, self.targets, self.weights))
+
+
+def caminho_coordenadas(path_grafo):
+    """
+    Caminho do arquivo de coordenadas (vertex,lat,lon) de um grafo:
+    graphs/rio_centro.csv -> graphs/coords/rio_centro.csv
+    (fica numa subpasta para não entrar no glob graphs/*.csv dos runners)
+    """
+    pasta, nome = os.path.split(path_grafo)
+    return os.path.join(pasta, "coords", nome)
+
+
+def caminho_ids_osm(path_grafo):
+    """
+    Caminho do arquivo com o id OSM de cada vértice (vertex,osm_id) de um grafo:
+    graphs/rio_centro.csv -> graphs/ids/rio_centro.csv
+    """
+    pasta, nome = os.path.split(path_grafo)
+    return os.path.join(pasta, "ids", nome)
+
+
+def _csr_numpy(n, us, vs, ws):
+    """Monta o CSR com numpy (ordenação estável por origem + bincount)."""
+    ordem = np.argsort(us, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(us, minlength=n), out=offsets[1:])
+    return CSRGraph(
+        n,
+        array(TIPO_OFFSET, offsets.tobytes()),
+        array(TIPO_ALVO, vs[ordem].tobytes()),
+        array(TIPO_PESO, ws[ordem].tobytes()),
+    )
+
+
+def _parse_bloco_python(bloco, us, vs, ws):
+    """
+    Converte um bloco de linhas "u,v,w" sem laço por linha em Python:
+    o bloco vira uma única lista de campos e cada coluna é convertida
+    com map() direto para o array tipado.
+    """
+    linhas = [ln for ln in bloco.split(b"\n") if ln.strip()]
+    if not linhas:
+        return
+    if not all(ln.count(b",") == 2 for ln in linhas):
+        # linha com número de colunas diferente de 3: trata uma a uma
+        for ln in linhas:
+            row = ln.split(b",")
+            if len(row) < 3:
+                continue
+            us.append(int(row[0]))
+            vs.append(int(row[1]))
+            ws.append(float(row[2]))
+        return
+    campos = b",".join(linhas).split(b",")
+    us.extend(map(int, campos[0::3]))
+    vs.extend(map(int, campos[1::3]))
+    ws.extend(map(float, campos[2::3]))
+
+
+def _tres_campos_por_linha(bloco):
+    """
+    Toda linha do bloco tem exatamente duas vírgulas? Contado em numpy: só
+    o total de campos não basta, 2 + 4 colunas somam 6 e inventariam arestas.
+    """
+    b = np.frombuffer(bloco, dtype=np.uint8)
+    virgulas = np.cumsum(b == ord(","))
+    ate_fim = virgulas[b == ord("\n")]
+    por_linha = np.diff(ate_fim, prepend=0, append=virgulas[-1])
+    return bool((por_linha == 2).all())
+
+
+def _parse_bloco_numpy(bloco):
+    """Converte um bloco de linhas "u,v,w" numa matriz (k, 3) de float64."""
+    bloco = bloco.replace(b"\r", b"").strip(b"\n")
+    if not bloco:
+        return np.empty((0, 3))
+    try:
+        dados = np.fromstring(bloco.replace(b"\n", b","), sep=",")
+    except ValueError:
+        dados = None
+    if dados is None or not _tres_campos_por_linha(bloco):
+        # linhas vazias ou malformadas: cai no parser tolerante
+        us, vs, ws = array(TIPO_OFFSET), array(TIPO_OFFSET), array(TIPO_PESO)
+        _parse_bloco_python(bloco, us, vs, ws)
+        return np.column_stack([np.asarray(us, dtype=np.float64),
+                                np.asarray(vs, dtype=np.float64),
+                                np.asarray(ws, dtype=np.float64)])
+    return dados.reshape(-1, 3)
+
+
+def _ler_blocos(path, tam_bloco):
+    """
+    Lê o arquivo em blocos grandes de bytes, sempre cortando no último
+    fim de linha, e descarta a linha de cabeçalho.
+    """
+    with open(path, "rb") as f:
+        primeira = f.readline()
+        # arquivo sem cabeçalho: a primeira linha já é uma aresta
+        resto = primeira if primeira[:1].isdigit() else b""
+        while True:
+            chunk = f.read(tam_bloco)
+            if not chunk:
+                break
+            chunk = resto + chunk
+            corte = chunk.rfind(b"\n") + 1
+            if corte == 0:
+                resto = chunk
+                continue
+            resto = chunk[corte:]
+            yield chunk[:corte]
+        if resto:
+            yield resto
+
+
+def load_graph_from_csv(path, tam_bloco=TAM_BLOCO):
+    """
+    Lê um grafo dirigido ponderado de um CSV no formato:
+    u,v,w
+    0,1,2.5
+    1,2,1.0
+    ...
+    Retorna um CSRGraph com n = max(u, v) + 1 vértices.
+    Um arquivo sem arestas gera um grafo com n = 0.
+
+    O arquivo é lido em blocos de tam_bloco bytes e cada bloco é convertido
+    de uma vez (numpy.fromstring se numpy estiver instalado, senão map()
+    sobre os campos), produzindo direto os vetores tipados.
+    """
+    if np is not None:
+        # cada bloco já é reduzido aos tipos finais, para não acumular
+        # a matriz float64 inteira na memória
+        us, vs, ws = [], [], []
+        n = 0
+        for bloco in _ler_blocos(path, tam_bloco):
+            dados = _parse_bloco_numpy(bloco)
+            if len(dados) == 0:
+                continue
+            us.append(dados[:, 0].astype(np.int32))
+            vs.append(dados[:, 1].astype(np.int32))
+            ws.append(dados[:, 2].copy())
+            n = max(n, int(dados[:, :2].max()) + 1)
+        if not us:
+            return CSRGraph.from_edges(0, [], [], [])
+        return _csr_numpy(n, np.concatenate(us), np.concatenate(vs), np.concatenate(ws))
+
+    us = array(TIPO_ALVO)
+    vs = array(TIPO_ALVO)
+    ws = array(TIPO_PESO)
+    for bloco in _ler_blocos(path, tam_bloco):
+        _parse_bloco_python(bloco.replace(b"\r", b""), us, vs, ws)
+    n = max(max(us, default=-1), max(vs, default=-1)) + 1
+    return CSRGraph.from_edges(n, us, vs, ws)
+
+
+# ----------------------------
+# Pesos em ponto fixo
+# ----------------------------
+def escala_ponto_fixo(weights, max_casas=6, tol=1e-9):
+    """
+    Menor escala 10^c (c <= max_casas) que torna todos os pesos inteiros,
+    ou None se não houver. Pesos inteiros (grafos sintéticos) dão escala 1;
+    comprimentos do OSM arredondados a 3 casas dão 1000 (milímetros).
+    """
+    for casas in range(max_casas + 1):
+        escala = 10 ** casas
+        if all(abs(w * escala - round(w * escala)) <= tol * max(1.0, abs(w * escala))
+               for w in weights):
+            return escala
+    return None
+
+
+def para_ponto_fixo(graph, escala=None):
+    """
+    Retorna (grafo, escala): uma cópia do grafo com pesos inteiros
+    round(w * escala) num array int64, com a mesma topologia (offsets e
+    targets são compartilhados, não copiados). Distâncias calculadas no
+    grafo em ponto fixo são exatas; basta dividir por escala no final.
+    """
+    if escala is None:
+        escala = escala_ponto_fixo(graph.weights)
+        if escala is None:
+            raise ValueError("Pesos não representáveis em ponto fixo com até 6 casas decimais")
+    pesos = array("q", (round(w * escala) for w in graph.weights))
+    return CSRGraph(graph.n, graph.offsets, graph.targets, pesos), escala
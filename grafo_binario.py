@@ -0,0 +1,160 @@
+import glob
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+
+from grafo import CSRGraph, TIPO_ALVO, TIPO_OFFSET, TIPO_PESO, load_graph_from_csv
+
+# ----------------------------
+# Formato binário do CSR (.csrg)
+# ----------------------------
+# Cabeçalho fixo de 128 bytes, little-endian:
+#   magic    8s   b"CSRGRAF1"
+#   versao   I
+#   reserv.  I
+#   n        q
+#   m        q
+#   mtime_ns q    mtime do CSV de origem no momento da conversão
+#   tamanho  q    tamanho em bytes do CSV de origem
+#   sha1     20s  hash do conteúdo do CSV de origem
+# Em seguida, os vetores em sequência (todos alinhados em 8 ou 4 bytes):
+#   offsets  int64[n+1]
+#   weights  float64[m]
+#   targets  int32[m]
+MAGIC = b"CSRGRAF1"
+VERSAO = 2  # 2: refaz os caches montados antes da checagem de 3 campos por linha (grafo.py)
+FORMATO_CABECALHO = "<8sIIqqqq20s"
+TAM_CABECALHO = 128
+PASTA_CACHE = "cache_csr"
+
+
+def sha1_arquivo(path, bloco=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(bloco)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.digest()
+
+
+def _cabecalho(n, m, mtime_ns, tamanho, sha1):
+    raw = struct.pack(FORMATO_CABECALHO, MAGIC, VERSAO, 0, n, m, mtime_ns, tamanho, sha1)
+    return raw.ljust(TAM_CABECALHO, b"\0")
+
+
+def salvar_binario(graph, path_out, mtime_ns=0, tamanho=0, sha1=b"\0" * 20):
+    """
+    Grava o CSR no formato binário. A escrita é feita num arquivo temporário
+    e depois renomeada, para que outro processo nunca abra um arquivo pela metade.
+    """
+    os.makedirs(os.path.dirname(path_out) or ".", exist_ok=True)
+    tmp = f"{path_out}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_cabecalho(graph.n, graph.m, mtime_ns, tamanho, sha1))
+        f.write(memoryview(graph.offsets).cast("B"))
+        f.write(memoryview(graph.weights).cast("B"))
+        f.write(memoryview(graph.targets).cast("B"))
+    os.replace(tmp, path_out)
+
+
+def ler_cabecalho(path):
+    """Retorna o cabeçalho como dicionário, ou None se o arquivo não for válido."""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read(TAM_CABECALHO)
+    except OSError:
+        return None
+    if len(raw) < TAM_CABECALHO:
+        return None
+    magic, versao, _, n, m, mtime_ns, tamanho, sha1 = struct.unpack_from(FORMATO_CABECALHO, raw)
+    if magic != MAGIC or versao != VERSAO:
+        return None
+    return {"n": n, "m": m, "mtime_ns": mtime_ns, "tamanho": tamanho, "sha1": sha1}
+
+
+def abrir_binario(path):
+    """
+    Abre um .csrg com mmap (somente leitura) e devolve um CSRGraph cujos
+    vetores são memoryviews sobre as páginas mapeadas: nada é copiado, e
+    vários processos abrindo o mesmo arquivo compartilham as mesmas páginas.
+    """
+    cab = ler_cabecalho(path)
+    if cab is None:
+        raise ValueError(f"Arquivo binário inválido: {path}")
+    n, m = cab["n"], cab["m"]
+
+    with open(path, "rb") as f:
+        tam_esperado = TAM_CABECALHO + 8 * (n + 1) + 8 * m + 4 * m
+        if os.fstat(f.fileno()).st_size != tam_esperado:
+            raise ValueError(f"Arquivo binário truncado: {path}")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    buf = memoryview(mm)
+    pos = TAM_CABECALHO
+    offsets = buf[pos:pos + 8 * (n + 1)].cast(TIPO_OFFSET)
+    pos += 8 * (n + 1)
+    weights = buf[pos:pos + 8 * m].cast(TIPO_PESO)
+    pos += 8 * m
+    targets = buf[pos:pos + 4 * m].cast(TIPO_ALVO)
+    return CSRGraph(n, offsets, targets, weights)
+
+
+def caminho_binario(path_csv, pasta_cache=PASTA_CACHE):
+    base = os.path.splitext(os.path.basename(path_csv))[0]
+    return os.path.join(pasta_cache, f"{base}.csrg")
+
+
+def _atualizar_mtime(path_bin, cab, mtime_ns, tamanho):
+    """Regrava só o cabeçalho quando o CSV foi tocado mas o conteúdo é o mesmo."""
+    with open(path_bin, "r+b") as f:
+        f.write(_cabecalho(cab["n"], cab["m"], mtime_ns, tamanho, cab["sha1"]))
+
+
+def load_graph(path_csv, pasta_cache=PASTA_CACHE):
+    """
+    Carrega o grafo de path_csv usando a cópia binária em pasta_cache.
+    - se mtime e tamanho do CSV batem com o cabeçalho, abre direto com mmap;
+    - se mudaram, compara o sha1 do conteúdo: igual -> só atualiza o cabeçalho;
+      diferente (ou binário ausente/inválido) -> reconverte a partir do CSV.
+    """
+    st = os.stat(path_csv)
+    path_bin = caminho_binario(path_csv, pasta_cache)
+    cab = ler_cabecalho(path_bin)
+
+    if cab is not None and cab["mtime_ns"] == st.st_mtime_ns and cab["tamanho"] == st.st_size:
+        return abrir_binario(path_bin)
+
+    sha1 = sha1_arquivo(path_csv)
+    if cab is not None and cab["sha1"] == sha1:
+        _atualizar_mtime(path_bin, cab, st.st_mtime_ns, st.st_size)
+        return abrir_binario(path_bin)
+
+    graph = load_graph_from_csv(path_csv)
+    salvar_binario(graph, path_bin, st.st_mtime_ns, st.st_size, sha1)
+    return abrir_binario(path_bin)
+
+
+def main():
+    # converte (ou valida) todos os grafos de uma pasta, mostrando o tempo de cada etapa
+    folder_in = sys.argv[1] if len(sys.argv) > 1 else "graphs"
+    files = sorted(glob.glob(os.path.join(folder_in, "*.csv")))
+
+    if not files:
+        print(f"Nenhum CSV encontrado em '{folder_in}'.")
+        return
+
+    for path in files:
+        inicio = time.perf_counter()
+        graph = load_graph(path)
+        elapsed = time.perf_counter() - inicio
+        print(f"  - {os.path.basename(path)}: n={graph.n}, m={graph.m}, "
+              f"carregado em {elapsed:.6f}s -> {caminho_binario(path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+import argparse
+import bz2
+import gzip
+import os
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # o importador é todo vetorizado: sem numpy, não roda
+    np = None
+
+from consultas_p2p import RAIO_TERRA
+from gera_grafo_gigante import TAM_BLOCO, primeira_passada, segunda_passada
+from grafo import caminho_coordenadas, caminho_ids_osm
+from grafo_binario import caminho_binario
+
+# ----------------------------
+# Importador OSM offline (sem osmnx, sem rede)
+# ----------------------------
+# Lê um extrato local (.osm, .osm.bz2, .osm.gz ou, com pyosmium instalado,
+# .osm.pbf) em fluxo, sem montar um grafo NetworkX, em três passadas:
+#   1. vias: só as dirigíveis (mesmo filtro do network_type="drive" do
+#      osmnx); os nós de cada via vão para um arquivo temporário, junto com
+#      o início de cada via e o sentido (mão dupla / única / invertida);
+#   2. nós: as coordenadas só dos nós usados por alguma via, em lotes;
+#   3. arestas, vetorizado: comprimento de cada trecho por haversine e,
+#      como o simplify=True do osmnx, só ficam vértices que são pontas de via
+#      ou cruzamentos (nó em 2+ vias); cada trecho entre dois deles vira uma
+#      aresta com a soma dos comprimentos. Paralelas ficam com a menor.
+# Os elementos XML são descartados assim que lidos; o que fica na memória
+# são arrays numpy do tamanho das vias dirigíveis, não do extrato.
+# Vértices são numerados pela ordem do id OSM (estável entre execuções).
+# A saída é a mesma de gera_grafos_osm_rio.graph_to_csv (CSV u,v,w em
+# metros com 3 casas, coordenadas em graphs/coords/ e ids OSM em
+# graphs/ids/), mais o .csrg pronto para load_graph (ver gera_grafo_gigante).
+
+# filtro "drive" do osmnx
+HIGHWAY_EXCLUIDOS = {
+    "abandoned", "bridleway", "bus_guideway", "construction", "corridor", "cycleway",
+    "elevator", "escalator", "footway", "no", "path", "pedestrian", "planned", "platform",
+    "proposed", "raceway", "razed", "service", "steps", "track",
+}
+SERVICE_EXCLUIDOS = {"alley", "driveway", "emergency_access", "parking", "parking_aisle", "private"}
+ACESSO_EXCLUIDO = {"private", "no"}
+ONEWAY_SIM = {"yes", "true", "1"}
+ONEWAY_REVERSO = {"-1", "reverse"}
+
+TAM_LOTE = 1 << 20  # refs/nós acumulados antes de ir para o disco / para o numpy
+
+
+def via_dirigivel(tags):
+    highway = tags.get("highway")
+    return (highway is not None and highway not in HIGHWAY_EXCLUIDOS
+            and tags.get("area") != "yes"
+            and tags.get("motor_vehicle") != "no" and tags.get("motorcar") != "no"
+            and tags.get("service") not in SERVICE_EXCLUIDOS
+            and tags.get("access") not in ACESSO_EXCLUIDO)
+
+
+def sentido(tags):
+    """1 = só no sentido dos nós, -1 = só no contrário, 0 = mão dupla."""
+    oneway = tags.get("oneway")
+    if oneway in ONEWAY_REVERSO:
+        return -1
+    if oneway in ONEWAY_SIM or (tags.get("junction") == "roundabout" and oneway != "no"):
+        return 1
+    return 0
+
+
+# ----------------------------
+# Leitura em fluxo
+# ----------------------------
+def _abrir(path):
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _elementos_xml(path, alvo, avisar_em=None):
+    """
+    Itera sobre os elementos <alvo> do XML, limpando a árvore a cada elemento
+    lido. Com avisar_em, produz um None ao abrir o primeiro <avisar_em>
+    (quem lê decide se para ali).
+    """
+    with _abrir(path) as f:
+        contexto = ET.iterparse(f, events=("start", "end"))
+        _, raiz = next(contexto)
+        for evento, elem in contexto:
+            if evento == "start":
+                if elem.tag == avisar_em:
+                    avisar_em = None
+                    yield None
+                continue
+            if elem.tag == alvo:
+                yield elem
+            if elem.tag in ("node", "way", "relation"):
+                raiz.clear()
+
+
+def _vias_xml(path):
+    for elem in _elementos_xml(path, "way"):
+        tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+        if via_dirigivel(tags):
+            yield [int(nd.get("ref")) for nd in elem.iter("nd")], tags
+
+
+def _nos_xml(path):
+    # extratos OSM costumam trazer todos os nós antes das vias: o None no
+    # primeiro <way> deixa ler_coordenadas parar ali se já achou todos; a
+    # saída do Overpass ("out body; >; out skel qt;") traz as vias antes
+    for elem in _elementos_xml(path, "node", avisar_em="way"):
+        yield None if elem is None else (int(elem.get("id")), float(elem.get("lat")), float(elem.get("lon")))
+
+
+def _vias_pbf(path):
+    import osmium
+
+    for via in osmium.FileProcessor(path, osmium.osm.WAY):
+        tags = {t.k: t.v for t in via.tags}
+        if via_dirigivel(tags):
+            yield [nd.ref for nd in via.nodes], tags
+
+
+def _nos_pbf(path):
+    import osmium
+
+    for no in osmium.FileProcessor(path, osmium.osm.NODE):
+        if no.location.valid():
+            yield no.id, no.location.lat, no.location.lon
+
+
+def leitores(path):
+    if path.endswith(".pbf"):
+        return _vias_pbf, _nos_pbf
+    return _vias_xml, _nos_xml
+
+
+# ----------------------------
+# Passadas
+# ----------------------------
+def ler_vias(path, pasta_tmp):
+    """1ª passada: (refs, inicio, sentidos) das vias dirigíveis, como arrays numpy."""
+    vias, _ = leitores(path)
+    path_refs = os.path.join(pasta_tmp, "refs.bin")
+    inicio = array("q", [0])
+    sentidos = array("b")
+    buffer = array("q")
+    total = 0
+    with open(path_refs, "wb") as f:
+        for refs, tags in vias(path):
+            if len(refs) < 2:
+                continue
+            buffer.extend(refs)
+            total += len(refs)
+            inicio.append(total)
+            sentidos.append(sentido(tags))
+            if len(buffer) >= TAM_LOTE:
+                buffer.tofile(f)
+                del buffer[:]
+        buffer.tofile(f)
+    refs = np.fromfile(path_refs, dtype=np.int64)
+    return refs, np.frombuffer(inicio, dtype=np.int64), np.frombuffer(sentidos, dtype=np.int8)
+
+
+def ler_coordenadas(path, ids):
+    """
+    2ª passada: (lat, lon) dos nós em ids (ordenados); NaN para os ausentes.
+    O leitor pode produzir None (fim dos nós num extrato ordenado): a leitura
+    para ali se todos os nós já foram achados, senão segue até o fim do arquivo.
+    """
+    _, nos = leitores(path)
+    lat = np.full(len(ids), np.nan)
+    lon = np.full(len(ids), np.nan)
+    if len(ids) == 0:
+        # nenhuma via dirigível: não há nó a procurar
+        return lat, lon
+    lote_id, lote_lat, lote_lon = array("q"), array("d"), array("d")
+
+    def descarregar():
+        # cópias (np.array, não frombuffer): os lotes são esvaziados e reusados
+        b = np.array(lote_id, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(ids, b), len(ids) - 1)
+        achou = ids[pos] == b
+        lat[pos[achou]] = np.array(lote_lat, dtype=np.float64)[achou]
+        lon[pos[achou]] = np.array(lote_lon, dtype=np.float64)[achou]
+        del lote_id[:], lote_lat[:], lote_lon[:]
+
+    for item in nos(path):
+        if item is None:
+            if lote_id:
+                descarregar()
+            if not np.isnan(lat).any():
+                break
+            continue
+        no, la, lo = item
+        lote_id.append(no)
+        lote_lat.append(la)
+        lote_lon.append(lo)
+        if len(lote_id) >= TAM_LOTE:
+            descarregar()
+    if lote_id:
+        descarregar()
+    return lat, lon
+
+
+def haversine_vetorizado(lat1, lon1, lat2, lon2):
+    p1 = np.radians(lat1)
+    p2 = np.radians(lat2)
+    a = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(np.radians(lon2 - lon1) / 2) ** 2
+    return 2 * RAIO_TERRA * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def montar_arestas(refs, inicio, sentidos, ids, usos, lat, lon, simplificar=True):
+    """
+    3ª passada: arestas (u, v, w) em índices de ids, já sem paralelas
+    (fica a menor) e sem laços, ordenadas por (u, v).
+    """
+    vazio = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+    if len(refs) == 0:
+        return vazio
+    idx = np.searchsorted(ids, refs)
+    via_de = np.repeat(np.arange(len(inicio) - 1), np.diff(inicio))
+    tem_coord = ~np.isnan(lat[idx])
+
+    # trecho k -> k+1 (dentro da mesma via); NaN se falta coordenada
+    mesma_via = via_de[:-1] == via_de[1:]
+    trecho = haversine_vetorizado(lat[idx[:-1]], lon[idx[:-1]], lat[idx[1:]], lon[idx[1:]])
+    invalido = mesma_via & np.isnan(trecho)
+    acumulado = np.concatenate([[0.0], np.cumsum(np.where(mesma_via & ~invalido, trecho, 0.0))])
+    invalidos = np.concatenate([[0], np.cumsum(invalido)])
+
+    if simplificar:
+        manter = usos[idx] >= 2
+        manter[inicio[:-1]] = True
+        manter[inicio[1:] - 1] = True
+        # nó sem coordenada (extrato recortado) corta a via: as pontas do corte ficam
+        manter[:-1] |= invalido
+        manter[1:] |= invalido
+    else:
+        manter = np.ones(len(refs), dtype=bool)
+    k = np.flatnonzero(manter & tem_coord)
+    a, b = k[:-1], k[1:]
+    par = (via_de[a] == via_de[b]) & (invalidos[a] == invalidos[b]) & (idx[a] != idx[b])
+    a, b = a[par], b[par]
+    w = acumulado[b] - acumulado[a]
+    s = sentidos[via_de[a]]
+
+    ida = s != -1
+    volta = s != 1
+    u = np.concatenate([idx[a][ida], idx[b][volta]])
+    v = np.concatenate([idx[b][ida], idx[a][volta]])
+    w = np.concatenate([w[ida], w[volta]])
+    if len(u) == 0:
+        return vazio
+
+    # paralelas: fica a menor
+    chave = u * len(ids) + v
+    ordem = np.lexsort((w, chave))
+    chave = chave[ordem]
+    primeira = np.concatenate([[True], chave[1:] != chave[:-1]])
+    ordem = ordem[primeira]
+    return u[ordem], v[ordem], np.rint(w[ordem] * 1000) / 1000
+
+
+def gravar_grafo(path_csv, u, v, w, ids_osm, lat=None, lon=None, csrg=True):
+    """
+    Grava o grafo de vértices densos 0..n-1 (u, v, w arrays numpy): CSV,
+    ids OSM (graphs/ids/), coordenadas (graphs/coords/, se lat/lon) e o
+    .csrg em cache_csr/. Retorna (n, m).
+    """
+    def blocos():
+        for i in range(0, len(u), TAM_BLOCO):
+            yield u[i:i + TAM_BLOCO], v[i:i + TAM_BLOCO], w[i:i + TAM_BLOCO]
+
+    n, m, graus, sha1 = primeira_passada(blocos(), path_csv)
+    if csrg:
+        st = os.stat(path_csv)
+        segunda_passada(blocos(), n, m, graus, caminho_binario(path_csv), st.st_mtime_ns, st.st_size, sha1)
+
+    colunas = [("vertex,osm_id\n", "%d,%d\n", caminho_ids_osm(path_csv), (ids_osm,))]
+    if lat is not None:
+        colunas.append(("vertex,lat,lon\n", "%d,%.7f,%.7f\n", caminho_coordenadas(path_csv), (lat, lon)))
+    for cabecalho, linha, path, valores in colunas:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        k = len(valores) + 1
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(cabecalho)
+            for i in range(0, len(ids_osm), TAM_BLOCO):
+                tam = len(ids_osm[i:i + TAM_BLOCO])
+                intercalado = [None] * (k * tam)
+                intercalado[0::k] = range(i, i + tam)
+                for j, coluna in enumerate(valores, 1):
+                    intercalado[j::k] = coluna[i:i + TAM_BLOCO].tolist()
+                f.write((linha * tam) % tuple(intercalado))
+    return n, m
+
+
+def importar(path_osm, path_csv, csrg=True, simplificar=True):
+    """Importa o extrato e grava o grafo (ver gravar_grafo). Retorna estatísticas."""
+    inicio_t = time.perf_counter()
+    with tempfile.TemporaryDirectory() as pasta_tmp:
+        refs, inicio, sentidos = ler_vias(path_osm, pasta_tmp)
+    t_vias = time.perf_counter() - inicio_t
+    ids, usos = np.unique(refs, return_counts=True)
+    lat, lon = ler_coordenadas(path_osm, ids)
+    t_nos = time.perf_counter() - inicio_t - t_vias
+    u, v, w = montar_arestas(refs, inicio, sentidos, ids, usos, lat, lon, simplificar)
+    del refs
+
+    # renumeração densa só com os vértices que ficaram em alguma aresta
+    vertices = np.unique(np.concatenate([u, v]))
+    u = np.searchsorted(vertices, u)
+    v = np.searchsorted(vertices, v)
+    n, m = gravar_grafo(path_csv, u, v, w, ids[vertices], lat[vertices], lon[vertices], csrg)
+
+    return {"n": n, "m": m, "vias": len(inicio) - 1, "nos_usados": len(ids),
+            "sem_coordenada": int(np.isnan(lat).sum()), "ids_osm": ids[vertices],
+            "t_vias": t_vias, "t_nos": t_nos, "t_total": time.perf_counter() - inicio_t}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa um extrato OSM local (.osm/.osm.bz2/.osm.gz/.pbf) "
+                                                 "para o formato de grafos do projeto, sem osmnx.")
+    parser.add_argument("extrato", help="arquivo OSM local")
+    parser.add_argument("--saida", required=True, help="CSV de saída (ex.: graphs/rio_cidade.csv)")
+    parser.add_argument("--sem-simplificar", action="store_true",
+                        help="mantém todos os nós das vias como vértices")
+    parser.add_argument("--sem-csrg", action="store_true", help="não grava o .csrg em cache_csr/")
+    args = parser.parse_args()
+
+    if np is None:
+        parser.error("o importador requer numpy instalado")
+    if args.extrato.endswith(".pbf"):
+        try:
+            import osmium  # noqa: F401
+        except ImportError:
+            parser.error("arquivos .pbf requerem pyosmium (pip install osmium); "
+                         "para XML (.osm/.osm.bz2) não há dependência")
+
+    info = importar(args.extrato, args.saida, not args.sem_csrg, not args.sem_simplificar)
+    print(f"[OK] {args.saida}: n={info['n']}, m={info['m']} "
+          f"({info['vias']} vias dirigíveis, {info['nos_usados']} nós usados"
+          + (f", {info['sem_coordenada']} sem coordenada no extrato" if info["sem_coordenada"] else "")
+          + f") em {info['t_total']:.1f}s (vias {info['t_vias']:.1f}s, nós {info['t_nos']:.1f}s)")
+    if info["m"] == 0:
+        if info["vias"] and info["sem_coordenada"]:
+            # há vias, mas faltam coordenadas (extrato recortado ou sem os nós)
+            print(f"[AVISO] {info['vias']} vias dirigíveis, mas {info['sem_coordenada']} de "
+                  f"{info['nos_usados']} nós sem coordenada no extrato: grafo vazio gravado")
+        else:
+            print("[AVISO] nenhuma aresta dirigível no extrato: grafo vazio gravado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,733 @@
+import heapq
+import math
+import statistics
+import sys
+from collections import Counter, deque
+from contextlib import contextmanager
+
+from bloco_parcial import BlocosParciais
+from filas import FILAS, fila_efetiva
+
+INF = float("inf")
+
+# ----------------------------
+# Contadores de instrumentação
+# ----------------------------
+# As engines medidas ficam intocadas: não há nenhum "if contando" no laço
+# por aresta. Aqui estão cópias instrumentadas de cada engine, com a mesma
+# lógica e contadores explícitos; a bancada (benchmark.py --contadores)
+# roda a cópia uma vez, fora da medição de tempo, e confere que ela devolve
+# as mesmas distâncias da engine medida e que os contadores que dá para ver
+# de fora batem com os da engine medida: observar() roda a própria engine
+# com o grafo, o heapq e as filas de filas.py trocados por versões que
+# contam (arestas lidas, pushes, decrease-keys e pops). Assim uma cópia que
+# se afastou da engine aparece mesmo quando as distâncias continuam certas.
+# conferir_casos() (python instrumentacao.py) confere ainda os contadores
+# contra valores calculados à mão num grafo pequeno.
+#
+# Contadores (os que não se aplicam a uma engine ficam de fora):
+#   relaxacoes_tentadas   arestas examinadas
+#   relaxacoes_sucesso    arestas que diminuíram uma distância
+#   pushes / pops         operações na fila de prioridade
+#   pops_obsoletos        pops de entradas desatualizadas (heapq sem decrease-key)
+#   decrease_key          pushes que só diminuíram a chave (filas de filas.py)
+#   rodadas               rodadas do Bellman-Ford até convergir
+#   quadros               quadros de pilha/recursão do BMSSP
+#   pivos                 pivôs escolhidos (bmssp) / devolvidos por FindPivots (duan)
+#   arestas_floresta      arestas lidas ao montar a floresta de FindPivots (duan)
+#   chamadas_dijkstra_limitado, limites, particao_esquerda/direita, ...
+# Séries (limites, tamanhos de partição) são resumidas em n/min/mediana/max.
+
+
+class Contadores:
+    def __init__(self):
+        self.contagens = Counter()
+        self.series = {}
+
+    def somar(self, nome, valor=1):
+        self.contagens[nome] += valor
+
+    def anotar(self, nome, valor):
+        self.series.setdefault(nome, []).append(valor)
+
+    def como_dict(self):
+        saida = dict(self.contagens)
+        for nome, valores in self.series.items():
+            finitos = [v for v in valores if v != INF]
+            saida[nome] = {
+                "n": len(valores),
+                "infinitos": len(valores) - len(finitos),
+                "min": min(finitos) if finitos else None,
+                "mediana": statistics.median(finitos) if finitos else None,
+                "max": max(finitos) if finitos else None,
+            }
+        return saida
+
+
+class FilaContada:
+    """Envolve uma fila de filas.py contando pushes, decrease-keys e pops."""
+
+    def __init__(self, fila, c):
+        self.fila = fila
+        self.c = c
+        self.dentro = set()
+
+    def __len__(self):
+        return len(self.fila)
+
+    def __bool__(self):
+        return bool(self.fila)
+
+    def limpar(self):
+        self.dentro.clear()
+        self.fila.limpar()
+
+    def push(self, v, chave):
+        self.c.somar("decrease_key" if v in self.dentro else "pushes")
+        self.dentro.add(v)
+        self.fila.push(v, chave)
+
+    def pop(self):
+        self.c.somar("pops")
+        chave, v = self.fila.pop()
+        self.dentro.discard(v)
+        return chave, v
+
+
+# ----------------------------
+# Observação da engine medida
+# ----------------------------
+class _LeiturasContadas:
+    """Sequência que conta as leituras por índice (targets da engine medida)."""
+
+    def __init__(self, seq, c, nome):
+        self.seq = seq
+        self.c = c
+        self.nome = nome
+
+    def __len__(self):
+        return len(self.seq)
+
+    def __getitem__(self, i):
+        self.c.somar(self.nome)
+        return self.seq[i]
+
+
+class GrafoContado:
+    """
+    O grafo visto pela engine medida: cada leitura de targets[i] conta como
+    uma aresta examinada; o resto (n, m, offsets, weights, ...) é o próprio grafo.
+    """
+
+    def __init__(self, graph, c):
+        self._graph = graph
+        self.targets = _LeiturasContadas(graph.targets, c, "relaxacoes_tentadas")
+
+    def __getattr__(self, nome):
+        return getattr(self._graph, nome)
+
+
+class _HeapqContado:
+    """
+    heapq com os pops contados. Os pushes não: a heap inicial das engines
+    às vezes é uma lista literal, que não passa por heappush.
+    """
+
+    def __init__(self, c):
+        self.c = c
+        self.heappush = heapq.heappush
+        self.heapify = heapq.heapify
+
+    def heappop(self, heap):
+        self.c.somar("pops")
+        return heapq.heappop(heap)
+
+
+@contextmanager
+def _contando(modulo, c):
+    """Troca heapq e FILAS do módulo da engine por versões que contam, só dentro do with."""
+    trocas = {}
+    if hasattr(modulo, "heapq"):
+        trocas["heapq"] = _HeapqContado(c)
+    if hasattr(modulo, "FILAS"):
+        trocas["FILAS"] = {nome: (lambda n, w_max, cls=cls: FilaContada(cls(n, w_max), c))
+                           for nome, cls in modulo.FILAS.items()}
+    antigos = {nome: getattr(modulo, nome) for nome in trocas}
+    for nome, valor in trocas.items():
+        setattr(modulo, nome, valor)
+    try:
+        yield
+    finally:
+        for nome, valor in antigos.items():
+            setattr(modulo, nome, valor)
+
+
+# engines que leem o CSR por buffer (numpy): não dá para contar as leituras
+SEM_OBSERVACAO = {"bellman_ford_vetorizado"}
+
+
+def observavel(alg):
+    """
+    A engine medida de alg (entrada de benchmark.REGISTRO) roda com o grafo
+    contado? Não se ler o CSR por buffer nem se usar workers, que leem a
+    cópia em memória compartilhada.
+    """
+    return alg.alvo.split(":")[1] not in SEM_OBSERVACAO and alg.kwargs.get("processos", 1) <= 1
+
+
+def observar(modulo, resolver, graph, source):
+    """
+    Roda a engine medida (resolver, definida no módulo modulo) com o grafo,
+    o heapq e as filas contando; devolve o Counter com relaxacoes_tentadas
+    e, conforme a fila que a engine usa, pops, pushes e decrease_key.
+    """
+    c = Contadores()
+    with _contando(modulo, c):
+        resolver(GrafoContado(graph, c), source)
+    return c.contagens
+
+
+def divergencias(contagens, observado):
+    """
+    Contadores da cópia instrumentada (contagens) que não batem com os
+    observados na engine medida: {nome: (cópia, engine)}; vazio = confere.
+    """
+    esperado = {"relaxacoes_tentadas": contagens["relaxacoes_tentadas"] + contagens["arestas_floresta"]}
+    for nome in ("pushes", "decrease_key", "pops"):
+        if nome in observado:
+            esperado[nome] = contagens[nome]
+    return {nome: (v, observado[nome]) for nome, v in esperado.items() if v != observado[nome]}
+
+
+# ----------------------------
+# Dijkstra
+# ----------------------------
+def dijkstra(graph, source, c):
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    dist = [math.inf] * graph.n
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    c.somar("pushes")
+    while heap:
+        d_atual, u = heapq.heappop(heap)
+        c.somar("pops")
+        if d_atual > dist[u]:
+            c.somar("pops_obsoletos")
+            continue
+        for i in range(offsets[u], offsets[u + 1]):
+            c.somar("relaxacoes_tentadas")
+            v = targets[i]
+            nd = d_atual + weights[i]
+            if nd < dist[v]:
+                c.somar("relaxacoes_sucesso")
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+                c.somar("pushes")
+    return dist
+
+
+def dijkstra_fila(graph, source, c, fila="binario"):
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    dist = [math.inf] * graph.n
+    dist[source] = 0
+    max_peso = max(weights, default=0)
+    fila_q = FilaContada(FILAS[fila_efetiva(fila, graph.n, max_peso)](graph.n, max_peso), c)
+    fila_q.push(source, 0)
+    while fila_q:
+        d_atual, u = fila_q.pop()
+        for i in range(offsets[u], offsets[u + 1]):
+            c.somar("relaxacoes_tentadas")
+            v = targets[i]
+            nd = d_atual + weights[i]
+            if nd < dist[v]:
+                c.somar("relaxacoes_sucesso")
+                dist[v] = nd
+                fila_q.push(v, nd)
+    return dist
+
+
+# ----------------------------
+# Bellman-Ford
+# ----------------------------
+def bellman_ford(graph, source, c):
+    n = graph.n
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    dist = [math.inf] * n
+    dist[source] = 0.0
+    for _ in range(n - 1):
+        c.somar("rodadas")
+        updated = False
+        for u in range(n):
+            du = dist[u]
+            if du == math.inf:
+                continue
+            for i in range(offsets[u], offsets[u + 1]):
+                c.somar("relaxacoes_tentadas")
+                v = targets[i]
+                if du + weights[i] < dist[v]:
+                    c.somar("relaxacoes_sucesso")
+                    dist[v] = du + weights[i]
+                    updated = True
+        if not updated:
+            break
+    return dist
+
+
+def bellman_ford_vetorizado(graph, source, c):
+    import numpy as np
+
+    n = graph.n
+    offsets = np.frombuffer(graph.offsets, dtype=np.int64)
+    targets = np.frombuffer(graph.targets, dtype=np.int32)
+    weights = np.frombuffer(graph.weights, dtype=np.float64)
+    grau = np.diff(offsets)
+    dist = np.full(n, np.inf)
+    dist[source] = 0.0
+    ativos = np.array([source], dtype=np.int64)
+    for _ in range(n - 1):
+        cont = grau[ativos]
+        total = int(cont.sum())
+        if total == 0:
+            break
+        c.somar("rodadas")
+        c.anotar("fronteira", len(ativos))
+        inicio = np.repeat(offsets[ativos] - np.cumsum(cont) + cont, cont)
+        idx = inicio + np.arange(total)
+        vs = targets[idx]
+        cand = np.repeat(dist[ativos], cont) + weights[idx]
+        antes = dist[vs]
+        np.minimum.at(dist, vs, cand)
+        c.somar("relaxacoes_tentadas", total)
+        # arestas cujo candidato é menor que a distância do início da rodada
+        c.somar("relaxacoes_sucesso", int((cand < antes).sum()))
+        melhorou = dist[vs] < antes
+        if not melhorou.any():
+            break
+        ativos = np.unique(vs[melhorou])
+    return dist.tolist()
+
+
+def spfa(graph, source, c, slf=True, lll=True):
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    dist = [math.inf] * graph.n
+    dist[source] = 0.0
+    na_fila = bytearray(graph.n)
+    fila = deque([source])
+    na_fila[source] = 1
+    c.somar("pushes")
+    soma = 0.0
+    while fila:
+        if lll:
+            media = soma / len(fila)
+            for _ in range(len(fila)):
+                if dist[fila[0]] <= media:
+                    break
+                fila.rotate(-1)
+                c.somar("rotacoes_lll")
+        u = fila.popleft()
+        c.somar("pops")
+        na_fila[u] = 0
+        du = dist[u]
+        soma -= du
+        for i in range(offsets[u], offsets[u + 1]):
+            c.somar("relaxacoes_tentadas")
+            v = targets[i]
+            nd = du + weights[i]
+            if nd < dist[v]:
+                c.somar("relaxacoes_sucesso")
+                if na_fila[v]:
+                    soma -= dist[v] - nd
+                    dist[v] = nd
+                    continue
+                dist[v] = nd
+                na_fila[v] = 1
+                soma += nd
+                c.somar("pushes")
+                if slf and fila and nd < dist[fila[0]]:
+                    c.somar("slf_frente")
+                    fila.appendleft(v)
+                else:
+                    fila.append(v)
+    return dist
+
+
+# ----------------------------
+# BMSSP iterativo (run_BMSSP_results.bmssp)
+# ----------------------------
+def dijkstra_limited(S, B, graph, dhat, c, fila=None):
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    c.somar("chamadas_dijkstra_limitado")
+    c.anotar("limites", B)
+
+    if fila is not None:
+        fila.limpar()
+        for v in S:
+            if dhat[v] < INF and dhat[v] <= B:
+                fila.push(v, dhat[v])
+        while fila:
+            d, u = fila.pop()
+            for i in range(offsets[u], offsets[u + 1]):
+                c.somar("relaxacoes_tentadas")
+                v = targets[i]
+                nd = d + weights[i]
+                if nd < dhat[v] and nd <= B:
+                    c.somar("relaxacoes_sucesso")
+                    dhat[v] = nd
+                    fila.push(v, nd)
+        return
+
+    heap = []
+    for v in S:
+        if dhat[v] < INF and dhat[v] <= B:
+            heapq.heappush(heap, (dhat[v], v))
+            c.somar("pushes")
+    while heap:
+        d, u = heapq.heappop(heap)
+        c.somar("pops")
+        if d != dhat[u]:
+            c.somar("pops_obsoletos")
+            continue
+        if d > B:
+            break
+        for i in range(offsets[u], offsets[u + 1]):
+            c.somar("relaxacoes_tentadas")
+            v = targets[i]
+            nd = d + weights[i]
+            if nd < dhat[v] and nd <= B:
+                c.somar("relaxacoes_sucesso")
+                dhat[v] = nd
+                heapq.heappush(heap, (nd, v))
+                c.somar("pushes")
+
+
+def bmssp(graph, source, c, B_initial=INF, fila="heapq"):
+    from run_BMSSP_results import median_of_three_pivot
+
+    if fila == "dial":
+        raise ValueError("A fila de Dial não serve para o Dijkstra limitado com várias fontes")
+    fila_q = None if fila == "heapq" else FilaContada(FILAS[fila](graph.n, max(graph.weights, default=0)), c)
+
+    dhat = [INF] * graph.n
+    dhat[source] = 0.0
+    stack = [(B_initial, {source})]
+    while stack:
+        B, S = stack.pop()
+        c.somar("quadros")
+        c.anotar("tamanho_S", len(S))
+        if not S:
+            continue
+        if len(S) == 1 or B <= 1.0:
+            c.somar("casos_base")
+            dijkstra_limited(S, B, graph, dhat, c, fila_q)
+            continue
+        pivot = median_of_three_pivot(S, dhat)
+        c.somar("pivos")
+        bound = min(B, dhat[pivot])
+        if abs(bound - B) < 1e-12:
+            c.somar("pivos_inuteis")
+            dijkstra_limited(S, B, graph, dhat, c, fila_q)
+            continue
+        dijkstra_limited(S, bound, graph, dhat, c, fila_q)
+        left = set()
+        right = set()
+        for u in S:
+            d = dhat[u]
+            if d == INF:
+                continue
+            if d <= bound + 1e-12:
+                left.add(u)
+            elif d < B - 1e-12:
+                right.add(u)
+        c.anotar("particao_esquerda", len(left))
+        c.anotar("particao_direita", len(right))
+        if right and len(right) < len(S):
+            stack.append((B, right))
+        if left and len(left) < len(S):
+            stack.append((bound, left))
+    return dhat
+
+
+# ----------------------------
+# BMSSP recursivo (bmssp_duan.bmssp_duan)
+# ----------------------------
+def bmssp_duan(graph, source, c):
+    from bmssp_duan import parametros
+
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    k, t, nivel = parametros(graph.n)
+    d = [INF] * graph.n
+    d[source] = 0.0
+
+    def find_pivots(B, S):
+        c.somar("find_pivots")
+        W = set(S)
+        camada = S
+        for _ in range(k):
+            prox = set()
+            for u in camada:
+                du = d[u]
+                for i in range(offsets[u], offsets[u + 1]):
+                    c.somar("relaxacoes_tentadas")
+                    v = targets[i]
+                    nd = du + weights[i]
+                    if nd <= d[v]:
+                        c.somar("relaxacoes_sucesso")
+                        d[v] = nd
+                        if nd < B:
+                            prox.add(v)
+            W |= prox
+            camada = prox
+            if len(W) > k * len(S):
+                c.anotar("pivos_por_chamada", len(S))
+                c.somar("pivos", len(S))
+                return list(S), W
+
+        pai = {}
+        for u in W:
+            du = d[u]
+            for i in range(offsets[u], offsets[u + 1]):
+                c.somar("arestas_floresta")
+                v = targets[i]
+                if v != u and v in W and v not in pai and du + weights[i] == d[v]:
+                    pai[v] = u
+        raiz_de = {}
+        tamanho = {}
+        for v in W:
+            caminho = []
+            x = v
+            while x in pai and x not in raiz_de and len(caminho) <= len(W):
+                caminho.append(x)
+                x = pai[x]
+            r = raiz_de.get(x, x)
+            for y in caminho:
+                raiz_de[y] = r
+            raiz_de[x] = r
+            tamanho[r] = tamanho.get(r, 0) + 1
+        P = [x for x in S if raiz_de.get(x) == x and tamanho[x] >= k]
+        c.anotar("pivos_por_chamada", len(P))
+        c.somar("pivos", len(P))
+        return P, W
+
+    def base_case(B, S):
+        c.somar("casos_base")
+        heap = [(d[x], x) for x in S]
+        heapq.heapify(heap)
+        c.somar("pushes", len(heap))
+        no_heap = set(S)
+        U = []
+        feitos = set()
+        limite = k + len(S)
+        ultimo = -INF
+        while heap:
+            du, u = heap[0]
+            if u in feitos or du > d[u]:
+                heapq.heappop(heap)
+                c.somar("pops")
+                c.somar("pops_obsoletos")
+                continue
+            if len(U) >= limite and du > ultimo:
+                return du, U
+            heapq.heappop(heap)
+            c.somar("pops")
+            feitos.add(u)
+            U.append(u)
+            ultimo = du
+            for i in range(offsets[u], offsets[u + 1]):
+                c.somar("relaxacoes_tentadas")
+                v = targets[i]
+                nd = du + weights[i]
+                if nd <= d[v] and nd < B and v not in feitos:
+                    if nd < d[v] or v not in no_heap:
+                        c.somar("relaxacoes_sucesso")
+                        d[v] = nd
+                        no_heap.add(v)
+                        heapq.heappush(heap, (nd, v))
+                        c.somar("pushes")
+        return B, U
+
+    def bmssp(l, B, S):
+        c.somar("quadros")
+        c.anotar("tamanho_S", len(S))
+        if l == 0:
+            return base_case(B, S)
+        P, W = find_pivots(B, S)
+        D = BlocosParciais(2 ** ((l - 1) * t), B)
+        for x in P:
+            D.insert(x, d[x])
+        U = set()
+        B_ult = min((d[x] for x in P), default=B)
+        limite = k * 2 ** (l * t)
+        while len(U) < limite and D:
+            Bi, Si = D.pull()
+            c.somar("pulls")
+            c.anotar("tamanho_pull", len(Si))
+            c.anotar("limites", Bi)
+            B_ult, Ui = bmssp(l - 1, Bi, Si)
+            U.update(Ui)
+            K = []
+            for u in Ui:
+                du = d[u]
+                for i in range(offsets[u], offsets[u + 1]):
+                    c.somar("relaxacoes_tentadas")
+                    v = targets[i]
+                    nd = du + weights[i]
+                    if nd <= d[v]:
+                        c.somar("relaxacoes_sucesso")
+                        d[v] = nd
+                        if Bi <= nd < B:
+                            D.insert(v, nd)
+                        elif B_ult <= nd < Bi:
+                            K.append((v, nd))
+            for x in Si:
+                if B_ult <= d[x] < Bi:
+                    K.append((x, d[x]))
+            c.anotar("batch_prepend", len(K))
+            D.batch_prepend(K)
+        B_novo = min(B_ult, B)
+        U.update(x for x in W if d[x] < B_novo)
+        return B_novo, U
+
+    limite_recursao = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limite_recursao, 100 + 10 * nivel))
+    try:
+        bmssp(nivel, INF, [source])
+    finally:
+        sys.setrecursionlimit(limite_recursao)
+    return d
+
+
+# ----------------------------
+# Delta-stepping (run_delta_results.delta_stepping; o trabalho é o mesmo com pool)
+# ----------------------------
+def delta_stepping(graph, source, c, delta=None, processos=1):
+    # processos não muda o trabalho: os workers só dividem as relaxações
+    from run_delta_results import delta_automatico
+
+    if delta is None:
+        delta = delta_automatico(graph)
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    dist = [INF] * graph.n
+
+    def relaxar(vertices, leves):
+        c.somar("fases_leves" if leves else "fases_pesadas")
+        melhor = {}
+        for u in vertices:
+            du = dist[u]
+            for i in range(offsets[u], offsets[u + 1]):
+                w = weights[i]
+                if (w <= delta) is not leves:
+                    continue
+                c.somar("relaxacoes_tentadas")
+                v = targets[i]
+                nd = du + w
+                if nd < dist[v] and nd < melhor.get(v, INF):
+                    melhor[v] = nd
+        return melhor
+
+    buckets = {}
+    bucket_de = {}
+
+    def aplicar(melhor):
+        for v, nd in melhor.items():
+            if nd < dist[v]:
+                c.somar("relaxacoes_sucesso")
+                antigo = bucket_de.get(v)
+                if antigo is not None:
+                    b = buckets[antigo]
+                    b.discard(v)
+                    if not b:
+                        del buckets[antigo]
+                dist[v] = nd
+                i = int(nd // delta)
+                buckets.setdefault(i, set()).add(v)
+                bucket_de[v] = i
+
+    dist[source] = 0.0
+    buckets[0] = {source}
+    bucket_de[source] = 0
+    while buckets:
+        i = min(buckets)
+        c.somar("buckets")
+        removidos = set()
+        while i in buckets:
+            fronteira = buckets.pop(i)
+            for v in fronteira:
+                del bucket_de[v]
+            removidos |= fronteira
+            aplicar(relaxar(fronteira, True))
+        aplicar(relaxar(removidos, False))
+    return dist
+
+
+# ----------------------------
+# Conferência em grafos conhecidos
+# ----------------------------
+def conferir_casos():
+    """
+    Roda as cópias instrumentadas num grafo pequeno e devolve a lista de
+    (caso, engine, contador, obtido, esperado) que divergem dos valores
+    calculados à mão e, para todas as engines do registro da bancada, dos
+    observados na engine medida (vazia = tudo certo).
+    """
+    import importlib
+
+    from benchmark import REGISTRO
+    from grafo import CSRGraph, para_ponto_fixo
+
+    casos = {
+        # 0 -> 1 -> 2 -> 3 com atalhos mais caros 0 -> 2 e 1 -> 3: o Dijkstra
+        # com heapq deixa duas entradas obsoletas (2 e 3) e a fila com
+        # decrease-key as troca por dois decrease-keys
+        "diamante": (4, [(0, 1, 1.0), (0, 2, 4.0), (1, 2, 2.0), (1, 3, 6.0), (2, 3, 1.0)], 0, {
+            "dijkstra": {"relaxacoes_tentadas": 5, "relaxacoes_sucesso": 5, "pushes": 6, "pops": 6,
+                         "pops_obsoletos": 2},
+            "dijkstra_binario": {"relaxacoes_tentadas": 5, "relaxacoes_sucesso": 5, "pushes": 4,
+                                 "decrease_key": 2, "pops": 4},
+            # a segunda rodada não melhora nada e encerra o laço
+            "bellman_classico": {"rodadas": 2, "relaxacoes_tentadas": 10, "relaxacoes_sucesso": 5},
+        }),
+    }
+    falhas = []
+    for caso, (n, arestas, fonte, esperados) in casos.items():
+        us, vs, ws = zip(*arestas)
+        graph = CSRGraph.from_edges(n, us, vs, ws)
+        for nome, alg in REGISTRO.items():
+            if alg.contado is None:
+                continue
+            if not observavel(alg) and nome not in esperados:
+                continue
+            g = para_ponto_fixo(graph)[0] if alg.inteiro else graph
+            c = Contadores()
+            alg.funcao(instrumentada=True)(g, fonte, c)
+            for contador, valor in esperados.get(nome, {}).items():
+                if c.contagens[contador] != valor:
+                    falhas.append((caso, nome, contador, c.contagens[contador], valor))
+            if not observavel(alg):
+                continue
+            modulo = importlib.import_module(alg.alvo.split(":")[0])
+            observado = observar(modulo, alg.funcao(), g, fonte)
+            for contador, (copia, engine) in divergencias(c.contagens, observado).items():
+                falhas.append((caso, nome, contador, copia, engine))
+    return falhas
+
+
+if __name__ == "__main__":
+    falhas = conferir_casos()
+    for caso, nome, contador, obtido, esperado in falhas:
+        print(f"[ERRO] caso {caso}, {nome}: {contador}={obtido}, esperado {esperado}")
+    print("Contadores conferem." if not falhas else f"{len(falhas)} contador(es) divergente(s).")
+    sys.exit(1 if falhas else 0)
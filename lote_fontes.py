@@ -0,0 +1,190 @@
+import argparse
+import heapq
+import os
+import random
+import struct
+import time
+from array import array
+from multiprocessing import Pool
+
+from grafo_binario import load_graph
+from memoria_compartilhada import GrafoCompartilhado, anexar
+
+INF = float("inf")
+
+# ----------------------------
+# Várias fontes num único job
+# ----------------------------
+# O grafo é carregado uma vez e copiado para memória compartilhada; cada
+# worker anexa o CSR, mantém um vetor de distâncias de rascunho próprio
+# (reinicializado só nos vértices tocados) e devolve uma linha da matriz
+# de distâncias por fonte. O processo principal grava as linhas em disco
+# à medida que chegam, na ordem das fontes, sem montar a matriz inteira.
+#
+# Formato binário (.bin):
+#   magic b"DISTMAT1", k = número de fontes (int64), n (int64),
+#   fontes int64[k], depois k linhas float64[n] (inf = inalcançável)
+MAGIC = b"DISTMAT1"
+
+
+class Rascunho:
+    """Vetor de distâncias reaproveitado entre fontes."""
+
+    def __init__(self, n):
+        self.dist = [INF] * n
+        self.tocados = []
+
+    def dijkstra(self, graph, source):
+        """Dijkstra com heapq; devolve a linha de distâncias como array float64."""
+        offsets = graph.offsets
+        targets = graph.targets
+        weights = graph.weights
+        dist = self.dist
+        tocados = self.tocados
+
+        dist[source] = 0.0
+        tocados.append(source)
+        heap = [(0.0, source)]
+        while heap:
+            d_atual, u = heapq.heappop(heap)
+            if d_atual > dist[u]:
+                continue
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                nd = d_atual + weights[i]
+                if nd < dist[v]:
+                    if dist[v] == INF:
+                        tocados.append(v)
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+
+        linha = array("d", dist)
+        for v in tocados:
+            dist[v] = INF
+        tocados.clear()
+        return linha
+
+
+# estado de cada worker
+_worker = {}
+
+def _init_worker(descritor):
+    graph, _, blocos = anexar(descritor)
+    _worker.update(graph=graph, blocos=blocos, rascunho=Rascunho(graph.n))
+
+def _resolver(fonte):
+    linha = _worker["rascunho"].dijkstra(_worker["graph"], fonte)
+    return linha.tobytes()
+
+
+class EscritorMatriz:
+    """Grava as linhas da matriz de distâncias em 'bin' ou 'csv', em fluxo."""
+
+    def __init__(self, path, fontes, n, formato):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.formato = formato
+        self.fontes = fontes
+        self.i = 0
+        if formato == "bin":
+            self.f = open(path, "wb")
+            self.f.write(struct.pack("<8sqq", MAGIC, len(fontes), n))
+            self.f.write(array("q", fontes).tobytes())
+        else:
+            self.f = open(path, "w", encoding="utf-8", newline="")
+            self.f.write("fonte," + ",".join(str(v) for v in range(n)) + "\n")
+
+    def escrever(self, linha_bytes):
+        if self.formato == "bin":
+            self.f.write(linha_bytes)
+        else:
+            linha = array("d")
+            linha.frombytes(linha_bytes)
+            campos = ("INF" if d == INF else f"{d:.6f}" for d in linha)
+            self.f.write(f"{self.fontes[self.i]}," + ",".join(campos) + "\n")
+        self.i += 1
+
+    def fechar(self):
+        self.f.close()
+
+
+def distancias_multiplas_fontes(graph, fontes, path_saida, processos=None, formato="bin",
+                                chunksize=4):
+    """
+    Calcula uma árvore de caminhos mínimos por fonte em 'fontes' e grava a
+    matriz de distâncias em path_saida (linha i = distâncias a partir de
+    fontes[i]). Com processos > 1, as fontes são distribuídas num pool cujos
+    workers leem o CSR da memória compartilhada.
+    Retorna (número de árvores, segundos).
+    """
+    fontes = list(fontes)
+    processos = processos or os.cpu_count() or 1
+    escritor = EscritorMatriz(path_saida, fontes, graph.n, formato)
+    inicio = time.perf_counter()
+    try:
+        if processos <= 1:
+            rascunho = Rascunho(graph.n)
+            for s in fontes:
+                escritor.escrever(rascunho.dijkstra(graph, s).tobytes())
+        else:
+            compartilhado = GrafoCompartilhado(graph)
+            try:
+                with Pool(processos, _init_worker, (compartilhado.descritor(),)) as pool:
+                    # imap mantém a ordem das fontes e entrega as linhas em fluxo
+                    for linha in pool.imap(_resolver, fontes, chunksize=chunksize):
+                        escritor.escrever(linha)
+            finally:
+                compartilhado.liberar()
+    finally:
+        escritor.fechar()
+    return len(fontes), time.perf_counter() - inicio
+
+
+def ler_matriz(path):
+    """Lê uma matriz .bin gravada por distancias_multiplas_fontes: (fontes, linhas)."""
+    with open(path, "rb") as f:
+        magic, k, n = struct.unpack("<8sqq", f.read(24))
+        if magic != MAGIC:
+            raise ValueError(f"Arquivo de matriz inválido: {path}")
+        fontes = array("q")
+        fontes.frombytes(f.read(8 * k))
+        linhas = []
+        for _ in range(k):
+            linha = array("d")
+            linha.frombytes(f.read(8 * n))
+            linhas.append(linha)
+    return list(fontes), linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distâncias a partir de várias fontes num único job.")
+    parser.add_argument("grafo", help="CSV do grafo (u,v,w)")
+    parser.add_argument("--fontes", default=None, help="lista de fontes separadas por vírgula")
+    parser.add_argument("--fontes-arquivo", default=None, help="arquivo com uma fonte por linha")
+    parser.add_argument("--aleatorias", type=int, default=None, help="sorteia esse número de fontes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--formato", choices=["bin", "csv"], default="bin")
+    parser.add_argument("--saida", default=None,
+                        help="arquivo de saída (padrão: results_lote/lote_<grafo>.<formato>)")
+    args = parser.parse_args()
+
+    graph = load_graph(args.grafo)
+    if args.fontes:
+        fontes = [int(x) for x in args.fontes.split(",")]
+    elif args.fontes_arquivo:
+        with open(args.fontes_arquivo, encoding="utf-8") as f:
+            fontes = [int(ln) for ln in f if ln.strip()]
+    else:
+        k = args.aleatorias or min(100, graph.n)
+        fontes = random.Random(args.seed).sample(range(graph.n), min(k, graph.n))
+
+    base = os.path.splitext(os.path.basename(args.grafo))[0]
+    saida = args.saida or os.path.join("results_lote", f"lote_{base}.{args.formato}")
+
+    arvores, elapsed = distancias_multiplas_fontes(graph, fontes, saida, args.processos, args.formato)
+    taxa = arvores / elapsed if elapsed > 0 else 0.0
+    print(f"{base}: {arvores} árvores em {elapsed:.3f}s ({taxa:.1f} árvores/s) -> {saida}")
+
+
+if __name__ == "__main__":
+    main()
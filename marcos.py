@@ -0,0 +1,411 @@
+import argparse
+import glob
+import heapq
+import math
+import mmap
+import os
+import random
+import struct
+import time
+from array import array
+from collections import deque
+
+from consultas_p2p import dijkstra_p2p
+from grafo_binario import PASTA_CACHE, caminho_binario, ler_cabecalho, load_graph
+from run_dijkstra_results import dijkstra
+
+INF = float("inf")
+
+# ----------------------------
+# ALT: A* com marcos (landmarks) e desigualdade triangular
+# ----------------------------
+# Para cada marco L guardamos d(L, v) (Dijkstra no grafo) e d(v, L)
+# (Dijkstra no grafo reverso). Pela desigualdade triangular,
+#   d(v, t) >= d(L, t) - d(L, v)   e   d(v, t) >= d(v, L) - d(t, L),
+# e o maior desses limites entre os marcos é a heurística do A*. Não precisa
+# de coordenadas, então serve tanto para o OSM quanto para os sintéticos.
+#
+# Formato binário (.alt, na mesma pasta dos .csrg), little-endian:
+#   magic b"ALTMARC1", versao I, reserv. I, n q, k q, sha1 20s do CSV,
+#   seleção 8s (nome, completado com \0) e seed q da construção
+#   marcos int32[k]
+#   ida    float32[k*n]   linha i = d(marcos[i], v)
+#   volta  float32[k*n]   linha i = d(v, marcos[i])
+MAGIC = b"ALTMARC1"
+VERSAO = 2
+FORMATO_CABECALHO = "<8sIIqq20s8sq"
+TAM_CABECALHO = 128
+TIPO_TABELA = "f"   # float32
+TIPO_MARCO = "i"    # int32
+
+# as tabelas em float32 têm erro relativo de ~6e-8 em cada valor; cada termo
+# do limite é reduzido por FOLGA vezes a soma dos dois valores (o erro cresce
+# com eles, não com a diferença) para continuar sendo um limite inferior
+FOLGA = 1e-6
+
+
+class Marcos:
+    """Tabelas de distância dos marcos: ida[i][v] = d(L_i, v), volta[i][v] = d(v, L_i)."""
+
+    __slots__ = ("n", "marcos", "ida", "volta")
+
+    def __init__(self, n, marcos, ida, volta):
+        self.n = n
+        self.marcos = marcos
+        self.ida = ida
+        self.volta = volta
+
+    def limite(self, v, t, ativos=None):
+        """Limite inferior para d(v, t); ativos = índices dos marcos a usar."""
+        melhor = 0.0
+        for i in (range(len(self.marcos)) if ativos is None else ativos):
+            ida = self.ida[i]
+            volta = self.volta[i]
+            a = ida[t] - ida[v]
+            b = volta[v] - volta[t]
+            # inf - inf (v e t fora do alcance do marco) dá nan, que nunca é > melhor;
+            # INF é exato (o marco alcança um e não o outro) e fica sem folga
+            if a > melhor:
+                if a != INF:
+                    a -= FOLGA * (abs(ida[t]) + abs(ida[v]))
+                if a > melhor:
+                    melhor = a
+            if b > melhor:
+                if b != INF:
+                    b -= FOLGA * (abs(volta[v]) + abs(volta[t]))
+                if b > melhor:
+                    melhor = b
+        return melhor
+
+
+# ----------------------------
+# Seleção dos marcos
+# ----------------------------
+def _mais_distante(dist, excluir):
+    melhor, escolhido = -1.0, None
+    for v, d in enumerate(dist):
+        if d != INF and d > melhor and v not in excluir:
+            melhor, escolhido = d, v
+    return escolhido
+
+
+def selecionar_farthest(graph, k, rng):
+    """
+    Seleção "farthest": o primeiro marco é o vértice mais distante de um
+    vértice sorteado; cada marco seguinte maximiza a menor distância (ida)
+    até os marcos já escolhidos.
+    """
+    reverso = graph.reverse()
+    marcos, ida, volta = [], [], []
+    minimo = dijkstra(graph, rng.randrange(graph.n))
+    while len(marcos) < min(k, graph.n):
+        v = _mais_distante(minimo, set(marcos))
+        if v is None:
+            # nada alcançável além dos marcos: sorteia entre os restantes
+            livres = [x for x in range(graph.n) if x not in set(marcos)]
+            v = rng.choice(livres)
+        d = dijkstra(graph, v)
+        marcos.append(v)
+        ida.append(d)
+        volta.append(dijkstra(reverso, v))
+        minimo = d if len(marcos) == 1 else [min(a, b) for a, b in zip(minimo, d)]
+    return marcos, ida, volta
+
+
+def _arvore(graph, dist, raiz):
+    """Filhos da árvore de caminhos mínimos implícita em dist (arestas justas)."""
+    filhos = [[] for _ in range(graph.n)]
+    tem_pai = bytearray(graph.n)
+    tem_pai[raiz] = 1
+    for u, v, w in graph.edges():
+        if not tem_pai[v] and dist[u] != INF and dist[u] + w == dist[v]:
+            tem_pai[v] = 1
+            filhos[u].append(v)
+    return filhos
+
+
+def selecionar_avoid(graph, k, rng):
+    """
+    Seleção "avoid" (Goldberg & Werneck): sorteia uma raiz r, monta a árvore
+    de caminhos mínimos de r e dá a cada vértice o peso d(r, v) - limite(r, v)
+    (o quanto os marcos atuais erram). O tamanho de uma subárvore é a soma
+    dos pesos, ou zero se ela já contém um marco; o novo marco é a folha
+    alcançada descendo sempre pelo filho de maior tamanho.
+    """
+    reverso = graph.reverse()
+    marcos, ida, volta = [], [], []
+    while len(marcos) < min(k, graph.n):
+        r = rng.randrange(graph.n)
+        dist = dijkstra(graph, r)
+        filhos = _arvore(graph, dist, r)
+        atual = Marcos(graph.n, marcos, ida, volta)
+
+        ordem = [r]
+        fila = deque([r])
+        while fila:
+            u = fila.popleft()
+            for v in filhos[u]:
+                ordem.append(v)
+                fila.append(v)
+        eh_marco = set(marcos)
+        tamanho = [0.0] * graph.n
+        for v in reversed(ordem):
+            if v in eh_marco:
+                tamanho[v] = -1.0  # marca "subárvore com marco"
+                continue
+            total = dist[v] - atual.limite(r, v)
+            for c in filhos[v]:
+                if tamanho[c] < 0:
+                    total = -1.0
+                    break
+                total += tamanho[c]
+            tamanho[v] = total
+
+        v = r
+        while True:
+            candidatos = [c for c in filhos[v] if tamanho[c] >= 0]
+            if not candidatos:
+                break
+            v = max(candidatos, key=tamanho.__getitem__)
+        if v in eh_marco:
+            # a raiz sorteada é um marco (ou só alcança marcos): sorteia de novo
+            livres = [x for x in range(graph.n) if x not in eh_marco]
+            v = rng.choice(livres)
+
+        marcos.append(v)
+        ida.append(dijkstra(graph, v))
+        volta.append(dijkstra(reverso, v))
+    return marcos, ida, volta
+
+
+SELECOES = {
+    "farthest": selecionar_farthest,
+    "avoid": selecionar_avoid,
+}
+
+
+def construir_marcos(graph, k=8, selecao="avoid", seed=42):
+    """Escolhe k marcos e calcula as tabelas de ida e volta em float32."""
+    marcos, ida, volta = SELECOES[selecao](graph, k, random.Random(seed))
+    return Marcos(graph.n, array(TIPO_MARCO, marcos),
+                  [array(TIPO_TABELA, d) for d in ida],
+                  [array(TIPO_TABELA, d) for d in volta])
+
+
+# ----------------------------
+# Persistência
+# ----------------------------
+def caminho_marcos(path_csv, pasta_cache=PASTA_CACHE):
+    base = os.path.splitext(os.path.basename(path_csv))[0]
+    return os.path.join(pasta_cache, f"{base}.alt")
+
+
+def salvar_marcos(mc, path_out, sha1=b"\0" * 20, selecao="avoid", seed=42):
+    os.makedirs(os.path.dirname(path_out) or ".", exist_ok=True)
+    tmp = f"{path_out}.{os.getpid()}.tmp"
+    raw = struct.pack(FORMATO_CABECALHO, MAGIC, VERSAO, 0, mc.n, len(mc.marcos), sha1,
+                      selecao.encode("ascii"), seed)
+    with open(tmp, "wb") as f:
+        f.write(raw.ljust(TAM_CABECALHO, b"\0"))
+        f.write(memoryview(mc.marcos).cast("B"))
+        for linha in mc.ida:
+            f.write(memoryview(linha).cast("B"))
+        for linha in mc.volta:
+            f.write(memoryview(linha).cast("B"))
+    os.replace(tmp, path_out)
+
+
+def abrir_marcos(path, sha1=None, selecao=None, seed=None):
+    """
+    Abre um .alt com mmap (linhas como memoryviews float32); None se inválido
+    ou se sha1, seleção ou seed (os que forem dados) não baterem.
+    """
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+    with f:
+        raw = f.read(TAM_CABECALHO)
+        if len(raw) < TAM_CABECALHO:
+            return None
+        magic, versao, _, n, k, sha1_arq, selecao_arq, seed_arq = struct.unpack_from(FORMATO_CABECALHO, raw)
+        if magic != MAGIC or versao != VERSAO or (sha1 is not None and sha1 != sha1_arq):
+            return None
+        if selecao is not None and selecao_arq.rstrip(b"\0").decode("ascii") != selecao:
+            return None
+        if seed is not None and seed_arq != seed:
+            return None
+        if os.fstat(f.fileno()).st_size != TAM_CABECALHO + 4 * k + 8 * k * n:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    buf = memoryview(mm)
+    pos = TAM_CABECALHO
+    marcos = buf[pos:pos + 4 * k].cast(TIPO_MARCO)
+    pos += 4 * k
+    linhas = []
+    for _ in range(2 * k):
+        linhas.append(buf[pos:pos + 4 * n].cast(TIPO_TABELA))
+        pos += 4 * n
+    return Marcos(n, marcos, linhas[:k], linhas[k:])
+
+
+def carregar_marcos(path_csv, k=8, selecao="avoid", seed=42, pasta_cache=PASTA_CACHE, refazer=False):
+    """
+    Carrega o grafo pelo cache binário e as tabelas de marcos; se o .alt não
+    existir, for de outra versão do CSV ou tiver outro número de marcos,
+    outra seleção ou outra seed, recalcula e grava. Retorna (graph, marcos, segundos ou None se veio do disco).
+    """
+    graph = load_graph(path_csv, pasta_cache)
+    sha1 = ler_cabecalho(caminho_binario(path_csv, pasta_cache))["sha1"]
+    path_alt = caminho_marcos(path_csv, pasta_cache)
+    if not refazer:
+        mc = abrir_marcos(path_alt, sha1, selecao, seed)
+        if mc is not None and len(mc.marcos) == min(k, graph.n):
+            return graph, mc, None
+
+    inicio = time.perf_counter()
+    mc = construir_marcos(graph, k, selecao, seed)
+    elapsed = time.perf_counter() - inicio
+    salvar_marcos(mc, path_alt, sha1, selecao, seed)
+    return graph, abrir_marcos(path_alt, sha1, selecao, seed), elapsed
+
+
+# ----------------------------
+# Consulta
+# ----------------------------
+def marcos_ativos(mc, s, t, quantos):
+    """Os 'quantos' marcos com melhor limite para (s, t)."""
+    k = len(mc.marcos)
+    if quantos is None or quantos >= k:
+        return None
+    return sorted(range(k), key=lambda i: -mc.limite(s, t, (i,)))[:quantos]
+
+
+def astar_alt(graph, mc, s, t, ativos=4):
+    """
+    A* de s a t com a heurística dos marcos. ativos = quantos marcos (os de
+    melhor limite para o par s, t) entram na heurística; None usa todos.
+    Como as tabelas são float32 a heurística pode não ser exatamente
+    consistente, então um vértice reaparece na fila se sua distância melhorar.
+    Retorna (distância, vértices fixados).
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    usar = marcos_ativos(mc, s, t, ativos)
+    limite = mc.limite
+    h = {s: limite(s, t, usar)}
+
+    dist = {s: 0.0}
+    heap = [(h[s], 0.0, s)]
+    fixados = 0
+    while heap:
+        _, d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        fixados += 1
+        if u == t:
+            return d, fixados
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            nd = d + weights[i]
+            if nd < dist.get(v, INF):
+                hv = h.get(v)
+                if hv is None:
+                    hv = h[v] = limite(v, t, usar)
+                if hv == INF:
+                    continue
+                dist[v] = nd
+                heapq.heappush(heap, (nd + hv, nd, v))
+    return INF, fixados
+
+
+# ----------------------------
+# Casos conhecidos
+# ----------------------------
+def conferir_casos():
+    """
+    Roda o ALT em grafos pequenos que já deram distância errada e devolve a
+    lista de (caso, alt, dijkstra) que divergem (vazia = tudo certo).
+    """
+    from grafo import CSRGraph
+
+    casos = {
+        # marco longe (ida ~1e5 em float32, passo de ~0.008): sem folga
+        # proporcional aos valores, o limite em a passa de d(a, t) = 0.302
+        "folga_float32": (4, [(0, 2, 100000.0), (1, 2, 0.0001), (2, 3, 0.302), (1, 3, 0.3022)], [0], 1, 3),
+    }
+    falhas = []
+    for nome, (n, arestas, marcos, s, t) in casos.items():
+        us, vs, ws = zip(*arestas)
+        graph = CSRGraph.from_edges(n, us, vs, ws)
+        reverso = graph.reverse()
+        mc = Marcos(n, marcos, [array(TIPO_TABELA, dijkstra(graph, L)) for L in marcos],
+                    [array(TIPO_TABELA, dijkstra(reverso, L)) for L in marcos])
+        d_alt = astar_alt(graph, mc, s, t, None)[0]
+        d_ref = dijkstra(graph, s)[t]
+        if d_alt != d_ref:
+            falhas.append((nome, d_alt, d_ref))
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ALT (A* + marcos) comparado ao Dijkstra.")
+    parser.add_argument("grafos", nargs="*", help="CSVs de grafo (padrão: graphs/*.csv)")
+    parser.add_argument("--marcos", type=int, default=8)
+    parser.add_argument("--selecao", choices=sorted(SELECOES), default="avoid")
+    parser.add_argument("--ativos", type=int, default=4, help="marcos usados por consulta (0 = todos)")
+    parser.add_argument("--consultas", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--refazer", action="store_true", help="recalcula as tabelas salvas")
+    args = parser.parse_args()
+
+    files = args.grafos or sorted(glob.glob(os.path.join("graphs", "*.csv")))
+    if not files:
+        print("Nenhum grafo encontrado.")
+        return
+    ativos = args.ativos or None
+    for nome, d_alt, d_ref in conferir_casos():
+        print(f"[ERRO] caso conhecido {nome}: alt {d_alt} vs dijkstra {d_ref}")
+
+    for path in files:
+        graph, mc, t_pre = carregar_marcos(path, args.marcos, args.selecao, args.seed,
+                                           refazer=args.refazer)
+        if graph.n == 0:
+            continue
+        nome = os.path.basename(path)
+        pre = f"tabelas em {t_pre:.3f}s" if t_pre is not None else "tabelas lidas do disco"
+        print(f"{nome}: n={graph.n}, m={graph.m}, {len(mc.marcos)} marcos ({args.selecao}), {pre}")
+
+        rng = random.Random(args.seed)
+        pares = [(rng.randrange(graph.n), rng.randrange(graph.n)) for _ in range(args.consultas)]
+
+        resultados = {}
+        for nome_engine, consulta in (
+            ("dijkstra_p2p", lambda s, t: dijkstra_p2p(graph, s, t)[::2]),
+            ("alt", lambda s, t: astar_alt(graph, mc, s, t, ativos)),
+        ):
+            fixados = 0
+            inicio = time.perf_counter()
+            dists = []
+            for s, t in pares:
+                d, k = consulta(s, t)
+                dists.append(d)
+                fixados += k
+            elapsed = (time.perf_counter() - inicio) / len(pares)
+            resultados[nome_engine] = (dists, fixados / len(pares), elapsed)
+
+        ref, fix_dj, t_dj = resultados["dijkstra_p2p"]
+        alt, fix_alt, t_alt = resultados["alt"]
+        erros = sum(1 for a, b in zip(alt, ref)
+                    if not (a == b or math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)))
+        status = "OK" if erros == 0 else f"{erros} divergências"
+        razao = fix_dj / fix_alt if fix_alt else 0.0
+        print(f"  - dijkstra: {fix_dj:.1f} fixados, {1e3 * t_dj:.3f} ms/consulta")
+        print(f"  - alt:      {fix_alt:.1f} fixados, {1e3 * t_alt:.3f} ms/consulta "
+              f"({razao:.1f}x menos vértices) -> {status}")
+
+
+if __name__ == "__main__":
+    main()
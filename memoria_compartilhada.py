@@ -0,0 +1,94 @@
+from multiprocessing import shared_memory
+
+from grafo import CSRGraph, TIPO_ALVO, TIPO_OFFSET, TIPO_PESO
+
+# ----------------------------
+# CSR e vetores em multiprocessing.shared_memory
+# ----------------------------
+# O processo principal cria os blocos e passa para os workers só um
+# descritor pequeno (nomes + tamanhos); cada worker anexa os mesmos blocos,
+# sem cópia por processo. Quem cria é quem libera (liberar()).
+
+
+def _criar(nbytes):
+    # SharedMemory não aceita tamanho 0 (grafo sem arestas)
+    return shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+
+
+def _copiar(shm, vetor):
+    dados = memoryview(vetor).cast("B")
+    shm.buf[:len(dados)] = dados
+
+
+class GrafoCompartilhado:
+    """
+    Copia o CSR de graph (e opcionalmente vetores float64 extras, como a
+    distância) para memória compartilhada.
+      descritor()  -> dicionário picklável para os workers
+      grafo()      -> CSRGraph sobre os blocos compartilhados
+      vetor(nome)  -> memoryview float64 de um vetor extra
+      liberar()    -> fecha e remove os blocos (só no processo criador)
+    """
+
+    def __init__(self, graph, vetores=()):
+        self.n = graph.n
+        self.m = graph.m
+        self.blocos = {
+            "offsets": _criar(8 * (graph.n + 1)),
+            "targets": _criar(4 * graph.m),
+            "weights": _criar(8 * graph.m),
+        }
+        _copiar(self.blocos["offsets"], graph.offsets)
+        _copiar(self.blocos["targets"], graph.targets)
+        _copiar(self.blocos["weights"], graph.weights)
+        for nome in vetores:
+            self.blocos[nome] = _criar(8 * graph.n)
+
+    def descritor(self):
+        return {
+            "n": self.n,
+            "m": self.m,
+            "nomes": {chave: shm.name for chave, shm in self.blocos.items()},
+        }
+
+    def grafo(self):
+        return _montar(self.n, self.m, self.blocos)
+
+    def vetor(self, nome):
+        return self.blocos[nome].buf[:8 * self.n].cast(TIPO_PESO)
+
+    def liberar(self):
+        for shm in self.blocos.values():
+            shm.unlink()
+            try:
+                shm.close()
+            except BufferError:
+                # ainda há memoryviews vivas sobre o bloco; o mapeamento é
+                # desfeito quando elas forem coletadas
+                pass
+        self.blocos = {}
+
+
+def _montar(n, m, blocos):
+    offsets = blocos["offsets"].buf[:8 * (n + 1)].cast(TIPO_OFFSET)
+    targets = blocos["targets"].buf[:4 * m].cast(TIPO_ALVO)
+    weights = blocos["weights"].buf[:8 * m].cast(TIPO_PESO)
+    return CSRGraph(n, offsets, targets, weights)
+
+
+def anexar(descritor):
+    """
+    Anexa (no worker) os blocos descritos e retorna (graph, vetores, blocos):
+    vetores é um dicionário nome -> memoryview float64 de tamanho n, e
+    blocos são os SharedMemory abertos, que o worker deve manter vivos
+    enquanto usar graph/vetores. A remoção continua com o processo criador.
+    """
+    n, m = descritor["n"], descritor["m"]
+    blocos = {}
+    for chave, nome in descritor["nomes"].items():
+        # workers do multiprocessing usam o mesmo resource_tracker do
+        # processo principal, então anexar aqui não duplica o registro
+        blocos[chave] = shared_memory.SharedMemory(name=nome)
+    vetores = {chave: blocos[chave].buf[:8 * n].cast(TIPO_PESO)
+               for chave in blocos if chave not in ("offsets", "targets", "weights")}
+    return _montar(n, m, blocos), vetores, blocos
@@ -0,0 +1,142 @@
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+# ----------------------------
+# Perfil da fase de solução
+# ----------------------------
+# Usado pela bancada com --perfil: numa execução extra, fora da medição de
+# tempo, a solução de cada (grafo, algoritmo) roda sob cProfile e, com
+# --amostragem, também sob um amostrador de pilhas de baixo custo. Para
+# cada par são gravados em results_perfil/:
+#   <algoritmo>_<grafo>.prof     estatísticas do cProfile (pstats, snakeviz)
+#   <algoritmo>_<grafo>.folded   pilhas colapsadas ("a;b;c contagem"), para
+#                                flamegraph.pl / speedscope / inferno
+# e o resumo das funções com maior tempo acumulado vai para o registro.
+
+TOP_FUNCOES = 15
+INTERVALO_AMOSTRAGEM = 0.001  # segundos entre amostras
+DURACAO_AMOSTRAGEM = 0.5  # repete a solução até juntar pelo menos isto de amostragem
+MAX_EXECUCOES_AMOSTRAGEM = 1000
+
+
+def _rotulo(codigo):
+    return f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+
+
+class Amostrador:
+    """
+    Amostrador de pilhas: a cada 'intervalo' segundos de CPU registra a
+    pilha Python corrente abaixo do quadro que abriu o "with". No Linux/macOS
+    usa SIGPROF (setitimer), que interrompe o próprio laço do algoritmo; sem
+    setitimer (Windows) ou fora da thread principal, uma thread lê a pilha por
+    sys._current_frames(). Funções em C (heappush, ...) aparecem na pilha de
+    quem as chamou.
+    """
+
+    def __init__(self, intervalo=INTERVALO_AMOSTRAGEM):
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self._base = None
+
+    def _registrar(self, quadro):
+        pilha = []
+        codigo = None
+        while quadro is not None and quadro is not self._base:
+            codigo = quadro.f_code
+            pilha.append(_rotulo(codigo))
+            quadro = quadro.f_back
+        # descarta amostras do próprio __exit__ (a thread ainda ativa no join)
+        if quadro is self._base and pilha and codigo is not Amostrador.__exit__.__code__:
+            self.pilhas[";".join(reversed(pilha))] += 1
+
+    def __enter__(self):
+        # amostra as pilhas abaixo de quem abriu o bloco "with"
+        self._base = sys._getframe(1)
+        if hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread():
+            self._anterior = signal.signal(signal.SIGPROF, lambda _sinal, quadro: self._registrar(quadro))
+            signal.setitimer(signal.ITIMER_PROF, self.intervalo, self.intervalo)
+            self._thread = None
+            return self
+
+        alvo = threading.get_ident()
+        self._parar = threading.Event()
+        # a thread só consegue o GIL a cada switchinterval (5 ms por padrão)
+        self._troca = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._troca, self.intervalo))
+
+        def amostrar():
+            while not self._parar.wait(self.intervalo):
+                quadro = sys._current_frames().get(alvo)
+                if quadro is not None:
+                    self._registrar(quadro)
+
+        self._thread = threading.Thread(target=amostrar, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        if self._thread is None:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._anterior)
+        else:
+            self._parar.set()
+            self._thread.join()
+            sys.setswitchinterval(self._troca)
+        return False
+
+    def salvar(self, path_out):
+        with open(path_out, "w", encoding="utf-8") as f:
+            for pilha, contagem in sorted(self.pilhas.items()):
+                f.write(f"{pilha} {contagem}\n")
+
+
+def top_funcoes(stats, n=TOP_FUNCOES):
+    """As n funções com maior tempo acumulado de um pstats.Stats."""
+    linhas = []
+    for (arquivo, linha, nome), (_, chamadas, proprio, acumulado, _) in stats.stats.items():
+        if "_lsprof.Profiler" in nome:
+            continue  # o próprio cProfile (disable)
+        funcao = nome if arquivo == "~" else f"{nome} ({os.path.basename(arquivo)}:{linha})"
+        linhas.append({"funcao": funcao, "chamadas": chamadas,
+                       "tempo_proprio": proprio, "tempo_acumulado": acumulado})
+    linhas.sort(key=lambda x: -x["tempo_acumulado"])
+    return linhas[:n]
+
+
+def perfilar(resolver, graph, fonte, path_base, amostragem=False,
+             intervalo=INTERVALO_AMOSTRAGEM, top=TOP_FUNCOES):
+    """
+    Perfila resolver(graph, fonte): grava path_base.prof (cProfile) e, com
+    amostragem, path_base.folded. Retorna o resumo para o registro.
+    """
+    os.makedirs(os.path.dirname(path_base) or ".", exist_ok=True)
+    perfil = cProfile.Profile()
+    perfil.runcall(resolver, graph, fonte)
+    perfil.dump_stats(path_base + ".prof")
+    resumo = {
+        "top": top_funcoes(pstats.Stats(perfil), top),
+        "arquivos": [path_base + ".prof"],
+    }
+
+    if amostragem:
+        # execuções separadas: o cProfile distorceria as amostras
+        amostrador = Amostrador(intervalo)
+        execucoes = 0
+        inicio = time.perf_counter()
+        with amostrador:
+            while execucoes < MAX_EXECUCOES_AMOSTRAGEM:
+                resolver(graph, fonte)
+                execucoes += 1
+                if time.perf_counter() - inicio >= DURACAO_AMOSTRAGEM:
+                    break
+        amostrador.salvar(path_base + ".folded")
+        resumo["arquivos"].append(path_base + ".folded")
+        resumo["amostras"] = sum(amostrador.pilhas.values())
+        resumo["execucoes_amostradas"] = execucoes
+    return resumo
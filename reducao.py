@@ -0,0 +1,368 @@
+import argparse
+import glob
+import math
+import os
+import statistics
+import time
+from array import array
+
+from benchmark import REGISTRO, sortear_fontes
+from grafo import CSRGraph, escala_ponto_fixo, para_ponto_fixo
+from grafo_binario import load_graph
+
+INF = float("inf")
+
+# ----------------------------
+# Redução do grafo (pré-processamento para um conjunto de fontes)
+# ----------------------------
+# Os grafos do OSM têm muitos vértices que só atrapalham: pedaços que
+# nenhuma fonte alcança (todo engine os carrega como INF) e cadeias de
+# vértices de grau 2 (curvas de uma rua, que o simplify do osmnx não
+# junta quando a rua é de mão dupla ou muda de atributo). A redução:
+#   1. componentes fortemente conexas (Tarjan iterativo); como o Tarjan
+#      numera as componentes em ordem topológica reversa, a alcançabilidade
+#      a partir das fontes se propaga pelo grafo condensado numa passada só,
+#      e os vértices de componentes não alcançadas saem do grafo;
+#   2. cadeias de grau 2: um vértice que não é fonte e tem exatamente dois
+#      vizinhos distintos (contando entrada e saída) é interno a uma cadeia
+#      a - c1 - ... - ck - b entre dois vértices que ficam. A cadeia vira os
+#      atalhos a -> b e b -> a (soma dos pesos, se o sentido existir todo) e
+#      os ci saem do grafo. Distâncias entre os que ficam não mudam.
+# Qualquer engine do registro roda no grafo reduzido; depois, como só se
+# entra numa cadeia por a ou por b,
+#   dist(ci) = min(dist(a) + F[i], dist(b) + B[i])
+# com F/B os comprimentos de a até ci e de b até ci ao longo da cadeia
+# (INF se algum trecho não existe naquele sentido), e os podados ficam INF.
+# O resultado é exato (a menos da ordem das somas em ponto flutuante).
+# Ciclos isolados só de grau 2 mantêm um vértice como ponta.
+
+
+def componentes_fortes(graph):
+    """
+    Tarjan iterativo. Retorna (comp, k) com comp[v] em 0..k-1; se há aresta
+    de uma componente c1 para outra c2, então c1 > c2.
+    """
+    n = graph.n
+    offsets = graph.offsets
+    targets = graph.targets
+    indice = array("i", [-1]) * n
+    baixo = array("i", [0]) * n
+    comp = array("i", [-1]) * n
+    na_pilha = bytearray(n)
+    pilha = []
+    contador = 0
+    k = 0
+    for r in range(n):
+        if indice[r] >= 0:
+            continue
+        indice[r] = baixo[r] = contador
+        contador += 1
+        pilha.append(r)
+        na_pilha[r] = 1
+        chamadas = [(r, offsets[r])]
+        while chamadas:
+            v, i = chamadas[-1]
+            fim = offsets[v + 1]
+            desceu = False
+            while i < fim:
+                w = targets[i]
+                i += 1
+                if indice[w] < 0:
+                    chamadas[-1] = (v, i)
+                    indice[w] = baixo[w] = contador
+                    contador += 1
+                    pilha.append(w)
+                    na_pilha[w] = 1
+                    chamadas.append((w, offsets[w]))
+                    desceu = True
+                    break
+                if na_pilha[w] and indice[w] < baixo[v]:
+                    baixo[v] = indice[w]
+            if desceu:
+                continue
+            chamadas.pop()
+            if baixo[v] == indice[v]:
+                while True:
+                    w = pilha.pop()
+                    na_pilha[w] = 0
+                    comp[w] = k
+                    if w == v:
+                        break
+                k += 1
+            if chamadas:
+                u = chamadas[-1][0]
+                if baixo[v] < baixo[u]:
+                    baixo[u] = baixo[v]
+    return comp, k
+
+
+def alcancaveis(graph, fontes, comp, k):
+    """bytearray com 1 nos vértices alcançáveis a partir das fontes (pelo grafo condensado)."""
+    offsets = graph.offsets
+    targets = graph.targets
+    alcancada = bytearray(k)
+    for s in fontes:
+        alcancada[comp[s]] = 1
+    # componentes em ordem decrescente = ordem topológica do condensado
+    for v in sorted(range(graph.n), key=comp.__getitem__, reverse=True):
+        if alcancada[comp[v]]:
+            for i in range(offsets[v], offsets[v + 1]):
+                alcancada[comp[targets[i]]] = 1
+    return bytearray(alcancada[c] for c in comp)
+
+
+def _peso(graph, u, v):
+    """Menor peso de u -> v (INF se não existir)."""
+    w = INF
+    targets = graph.targets
+    weights = graph.weights
+    for i in range(graph.offsets[u], graph.offsets[u + 1]):
+        if targets[i] == v and weights[i] < w:
+            w = weights[i]
+    return w
+
+
+class Reducao:
+    """
+    Grafo reduzido e o necessário para voltar ao original: mantidos[i] é o
+    vértice original do vértice i do reduzido, novo[v] o inverso (-1 se v
+    saiu) e cada cadeia c guarda suas pontas e, para cada vértice interno,
+    os comprimentos F (desde a) e B (desde b).
+    """
+
+    def __init__(self, n, graph, mantidos, novo, pontas, inicio, internos, F, B, estatisticas):
+        self.n = n
+        self.graph = graph
+        self.mantidos = mantidos
+        self.novo = novo
+        self.pontas = pontas      # [a0, b0, a1, b1, ...] (vértices originais)
+        self.inicio = inicio      # cadeia c: internos[inicio[c]:inicio[c + 1]]
+        self.internos = internos
+        self.F = F
+        self.B = B
+        self.estatisticas = estatisticas
+
+    def reconstruir(self, dist_reduzida, fator=1):
+        """Distâncias no grafo original a partir das do reduzido (divididas por fator)."""
+        dist = array("d", [INF]) * self.n
+        for i, v in enumerate(self.mantidos):
+            dist[v] = dist_reduzida[i] / fator if fator != 1 else dist_reduzida[i]
+        pontas = self.pontas
+        inicio = self.inicio
+        internos = self.internos
+        F = self.F
+        B = self.B
+        for c in range(len(inicio) - 1):
+            da = dist[pontas[2 * c]]
+            db = dist[pontas[2 * c + 1]]
+            for j in range(inicio[c], inicio[c + 1]):
+                x = da + F[j]
+                y = db + B[j]
+                dist[internos[j]] = x if x < y else y
+        return dist
+
+
+def reduzir(graph, fontes, contrair=True):
+    """Reduz graph para consultas a partir das fontes (ver o cabeçalho). Retorna uma Reducao."""
+    n = graph.n
+    offsets = graph.offsets
+    targets = graph.targets
+    comp, k = componentes_fortes(graph)
+    vivo = alcancaveis(graph, fontes, comp, k)
+    tamanhos = [0] * k
+    for c in comp:
+        tamanhos[c] += 1
+
+    # vértices internos de cadeia: não fonte, exatamente dois vizinhos vivos distintos
+    viz_a = array("i", [-1]) * n
+    viz_b = array("i", [-1]) * n
+    contraivel = bytearray(n)
+    if contrair:
+        rev = graph.reverse()
+        eh_fonte = bytearray(n)
+        for s in fontes:
+            eh_fonte[s] = 1
+        for v in range(n):
+            if not vivo[v] or eh_fonte[v]:
+                continue
+            vizinhos = set()
+            for g in (graph, rev):
+                for i in range(g.offsets[v], g.offsets[v + 1]):
+                    w = g.targets[i]
+                    if w != v and vivo[w]:
+                        vizinhos.add(w)
+                if len(vizinhos) > 2:
+                    break
+            if len(vizinhos) == 2:
+                viz_a[v], viz_b[v] = vizinhos
+                contraivel[v] = 1
+
+    pontas = array("i")
+    inicio = array("q", [0])
+    internos = array("i")
+    F = array("d")
+    B = array("d")
+    atalhos = []
+    contraido = bytearray(n)
+    for v in range(n):
+        if not contraivel[v] or contraido[v]:
+            continue
+        lados = []
+        ciclo = False
+        for primeiro in (viz_a[v], viz_b[v]):
+            anterior, atual = v, primeiro
+            caminho = []
+            while contraivel[atual]:
+                if atual == v:
+                    ciclo = True
+                    break
+                caminho.append(atual)
+                proximo = viz_a[atual] if viz_a[atual] != anterior else viz_b[atual]
+                anterior, atual = atual, proximo
+            if ciclo:
+                break
+            lados.append((caminho, atual))
+        if ciclo:
+            # ciclo isolado: v fica como ponta; o resto vira cadeia de v a v adiante
+            contraivel[v] = 0
+            continue
+        (esquerda, a), (direita, b) = lados
+        cadeia = esquerda[::-1] + [v] + direita
+        nos = [a] + cadeia + [b]
+        ida = [0.0]
+        for x, y in zip(nos, nos[1:]):
+            ida.append(ida[-1] + _peso(graph, x, y))
+        volta = [0.0]
+        for x, y in zip(nos[::-1], nos[-2::-1]):
+            volta.append(volta[-1] + _peso(graph, x, y))
+        volta.reverse()
+        pontas.extend((a, b))
+        internos.extend(cadeia)
+        F.extend(ida[1:-1])
+        B.extend(volta[1:-1])
+        inicio.append(len(internos))
+        for x in cadeia:
+            contraido[x] = 1
+        if a != b:
+            if ida[-1] < INF:
+                atalhos.append((a, b, ida[-1]))
+            if volta[0] < INF:
+                atalhos.append((b, a, volta[0]))
+
+    novo = array("i", [-1]) * n
+    mantidos = array("i")
+    for v in range(n):
+        if vivo[v] and not contraido[v]:
+            novo[v] = len(mantidos)
+            mantidos.append(v)
+    us, vs, ws = array("i"), array("i"), array("d")
+    weights = graph.weights
+    for u in mantidos:
+        nu = novo[u]
+        for i in range(offsets[u], offsets[u + 1]):
+            nv = novo[targets[i]]
+            if nv >= 0:
+                us.append(nu)
+                vs.append(nv)
+                ws.append(weights[i])
+    for a, b, w in atalhos:
+        us.append(novo[a])
+        vs.append(novo[b])
+        ws.append(w)
+    reduzido = CSRGraph.from_edges(len(mantidos), us, vs, ws)
+
+    estatisticas = {"componentes": k, "maior_componente": max(tamanhos, default=0),
+                    "podados": n - sum(vivo), "contraidos": len(internos), "cadeias": len(inicio) - 1,
+                    "atalhos": len(atalhos)}
+    return Reducao(n, reduzido, mantidos, novo, pontas, inicio, internos, F, B, estatisticas)
+
+
+# ----------------------------
+# Medição
+# ----------------------------
+def _mediana_tempo(f, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        f()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def comparar(graph, reducao, alg, fontes, repeticoes, escala=None):
+    """
+    Tempo de todas as fontes no grafo completo e no reduzido (solução +
+    reconstrução) e quantos vértices divergem. Retorna (t_completo, t_reduzido, divergencias).
+    """
+    resolver = alg.funcao()
+    completo, reduzido, fator = graph, reducao.graph, 1
+    if alg.inteiro:
+        if escala is None:
+            escala = escala_ponto_fixo(graph.weights)
+        completo, fator = para_ponto_fixo(graph, escala)
+        reduzido, _ = para_ponto_fixo(reduzido, escala)
+    novas = [reducao.novo[s] for s in fontes]
+
+    t_completo = _mediana_tempo(lambda: [resolver(completo, s) for s in fontes], repeticoes)
+    t_reduzido = _mediana_tempo(lambda: [reducao.reconstruir(resolver(reduzido, s), fator) for s in novas],
+                                repeticoes)
+
+    divergencias = 0
+    for s, ns in zip(fontes, novas):
+        ref = resolver(completo, s)
+        dist = reducao.reconstruir(resolver(reduzido, ns), fator)
+        for a, b in zip(ref, dist):
+            a /= fator
+            if not (a == b or math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)):
+                divergencias += 1
+    return t_completo, t_reduzido, divergencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reduz os grafos (componentes fortes e cadeias de grau 2) "
+                                                 "e compara os engines no grafo completo e no reduzido.")
+    parser.add_argument("--grafos", nargs="*", default=None, help="arquivos de grafo (padrão: graphs/*.csv)")
+    parser.add_argument("--algoritmos", default="dijkstra",
+                        help="nomes do registro da bancada separados por vírgula (padrão: dijkstra)")
+    parser.add_argument("--fontes", type=int, default=1, help="fonte 0 mais fontes sorteadas")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--escala", type=int, default=None, help="escala dos engines de pesos inteiros")
+    parser.add_argument("--sem-contrair", action="store_true", help="só poda os inalcançáveis")
+    args = parser.parse_args()
+
+    nomes = args.algoritmos.split(",")
+    for nome in nomes:
+        if nome not in REGISTRO:
+            parser.error(f"algoritmo desconhecido: {nome} (opções: {', '.join(REGISTRO)})")
+    files = args.grafos or sorted(glob.glob(os.path.join("graphs", "*.csv")))
+    if not files:
+        print("Nenhum grafo encontrado.")
+        return
+
+    for path in files:
+        graph = load_graph(path)
+        if graph.n == 0:
+            continue
+        fontes = sortear_fontes(graph.n, args.fontes, args.seed)
+        inicio = time.perf_counter()
+        reducao = reduzir(graph, fontes, not args.sem_contrair)
+        t_pre = time.perf_counter() - inicio
+        est = reducao.estatisticas
+        r = reducao.graph
+        print(f"  - {os.path.basename(path)} (n={graph.n}, m={graph.m}): "
+              f"{est['componentes']} componentes fortes (maior {est['maior_componente']}), "
+              f"{est['podados']} podados, {est['contraidos']} contraídos em {est['cadeias']} cadeias "
+              f"-> n={r.n} ({100 * r.n / graph.n:.1f}%), m={r.m} ({100 * r.m / max(graph.m, 1):.1f}%); "
+              f"pré-processamento {1e3 * t_pre:.2f} ms")
+        for nome in nomes:
+            t_completo, t_reduzido, divergencias = comparar(graph, reducao, REGISTRO[nome], fontes,
+                                                            args.repeticoes, args.escala)
+            print(f"      {nome}: completo {1e3 * t_completo:.2f} ms, reduzido {1e3 * t_reduzido:.2f} ms "
+                  f"({t_completo / max(t_reduzido, 1e-12):.2f}x; com o pré-processamento "
+                  f"{t_completo / (t_reduzido + t_pre):.2f}x), "
+                  + ("OK" if divergencias == 0 else f"{divergencias} DIVERGÊNCIAS"))
+
+
+if __name__ == "__main__":
+    main()
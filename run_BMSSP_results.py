@@ -1,25 +1,14 @@
-import math
+import argparse
 import heapq
-from collections import defaultdict, deque
-import csv
-import glob
-import os
-import time
+
+from benchmark import REGISTRO, argumentos_medicao, rodar_runner
+from filas import FILAS
 
 # -----------------------------
 # Types and constants
 # -----------------------------
 INF = float("inf")
 
-# ----------------------------
-# Util: construir adjacency
-# ----------------------------
-def build_adj(n, edges):
-    adj = [[] for _ in range(n)]
-    for (u, v, w) in edges:
-        adj[u].append((v, w))
-    return adj
-
 # ----------------------------
 # Pivot: mediana de três
 # ----------------------------
@@ -43,12 +32,33 @@ def median_of_three_pivot(S, dhat):
 # ----------------------------
 # Dijkstra limitado por bound
 # ----------------------------
-def dijkstra_limited(S, B, adj, dhat):
+def dijkstra_limited(S, B, graph, dhat, fila=None):
     """
     Executa Dijkstra iniciando com os vértices de S (com distancias em dhat already set),
     mas **não relaxa** arestas que gerariam distância > B.
     Atualiza dhat in-place.
+    Se fila (uma fila de filas.py, reaproveitada entre chamadas) for dada,
+    ela substitui o heapq: usa decrease-key em vez de entradas duplicadas.
     """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    if fila is not None:
+        fila.limpar()
+        for v in S:
+            if dhat[v] < INF and dhat[v] <= B:
+                fila.push(v, dhat[v])
+        while fila:
+            d, u = fila.pop()
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                nd = d + weights[i]
+                if nd < dhat[v] and nd <= B:
+                    dhat[v] = nd
+                    fila.push(v, nd)
+        return
+
     # heap de (dist, vertex)
     heap = []
     pushed = set()
@@ -68,8 +78,9 @@ def dijkstra_limited(S, B, adj, dhat):
         if d > B:
             break
         # relaxa vizinhos, mas respeita bound
-        for (v, w) in adj[u]:
-            nd = d + w
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            nd = d + weights[i]
             if nd < dhat[v] and nd <= B:
                 dhat[v] = nd
                 heapq.heappush(heap, (nd, v))
@@ -78,15 +89,21 @@ def dijkstra_limited(S, B, adj, dhat):
 # ----------------------------
 # BMSSP iterativo (pilha)
 # ----------------------------
-def bmssp(n, edges, source=0, B_initial=INF):
+def bmssp(graph, source=0, B_initial=INF, fila="heapq"):
     """
     Implementação BMSSP usando Dijkstra limitado como subrotina.
+    Recebe o grafo em CSR (ver grafo.CSRGraph), já montado fora da medição.
+    fila escolhe a fila de prioridade do Dijkstra limitado: "heapq" (entradas
+    duplicadas) ou uma das filas com decrease-key de filas.FILAS ("binario",
+    "pairing", "radix"; esta última exige o grafo em ponto fixo).
     Retorna vetor de distâncias dhat[0..n-1].
     """
-    adj = build_adj(n, edges)
+    if fila == "dial":
+        raise ValueError("A fila de Dial não serve para o Dijkstra limitado com várias fontes")
+    fila_q = None if fila == "heapq" else FILAS[fila](graph.n, max(graph.weights, default=0))
 
     # inicializa dhat
-    dhat = [INF] * n
+    dhat = [INF] * graph.n
     dhat[source] = 0.0
 
     # pilha de frames (B, S)
@@ -99,7 +116,7 @@ def bmssp(n, edges, source=0, B_initial=INF):
 
         # caso base: se S pequeno ou B pequeno, rodar dijkstra limitado direto
         if len(S) == 1 or B <= 1.0:
-            dijkstra_limited(S, B, adj, dhat)
+            dijkstra_limited(S, B, graph, dhat, fila_q)
             continue
 
         # escolhe pivot
@@ -108,11 +125,11 @@ def bmssp(n, edges, source=0, B_initial=INF):
 
         # se bound não reduz nada, faz dijkstra limitado com B
         if abs(bound - B) < 1e-12:
-            dijkstra_limited(S, B, adj, dhat)
+            dijkstra_limited(S, B, graph, dhat, fila_q)
             continue
 
         # executa dijkstra limitado até 'bound'
-        dijkstra_limited(S, bound, adj, dhat)
+        dijkstra_limited(S, bound, graph, dhat, fila_q)
 
         # particiona S em left e right usando apenas os vértices de S
         left = set()
@@ -136,101 +153,26 @@ def bmssp(n, edges, source=0, B_initial=INF):
 
     return dhat
 
-def load_graph_from_csv(path):
-    """
-    Lê um grafo dirigido ponderado de um CSV no formato:
-    u,v,w
-    0,1,2.5
-    1,2,1.0
-    ...
-    Retorna (n, edges), onde:
-      n = número de vértices (0..n-1)
-      edges = lista de tuplas (u, v, w)
-    """
-    edges = []
-    vertices = set()
-    with open(path, newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        header = next(reader, None)  # pula cabeçalho
-        for row in reader:
-            if not row or len(row) < 3:
-                continue
-            u = int(row[0])
-            v = int(row[1])
-            w = float(row[2])
-            edges.append((u, v, w))
-            vertices.add(u)
-            vertices.add(v)
-
-    if not vertices:
-        return 0, []
-
-    n = max(vertices) + 1
-    return n, edges
-
-def save_distances_to_csv(path_out, dist):
-    """
-    Salva as distâncias em um CSV com colunas:
-    vertex,dist
-    Se a distância for infinita (vértice inalcançável), grava "INF".
-    """
-    os.makedirs(os.path.dirname(path_out), exist_ok=True)
-    with open(path_out, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["vertex", "dist"])
-        for v, d in enumerate(dist):
-            if d == math.inf:
-                writer.writerow([v, "INF"])
-            else:
-                writer.writerow([v, f"{d:.6f}"])
-
 def main():
-    folder_in = "graphs"
-    folder_out = "results_BMSSP"
-
-    pattern = os.path.join(folder_in, "*.csv")
-    files = sorted(glob.glob(pattern))
-
-    if not files:
-        print(f"Nenhum CSV encontrado em '{folder_in}'.")
-        return
-
-    # novo: arquivo de tempos
-    os.makedirs(folder_out, exist_ok=True)
-    tempos_path = os.path.join(folder_out, "tempos_BMSSP.csv")
-    with open(tempos_path, "w", newline="", encoding="utf-8") as f_tempos:
-        wtempo = csv.writer(f_tempos)
-        wtempo.writerow(["arquivo", "n_vertices", "n_arestas", "tempo_segundos"])
-
-        print("Processando grafos com BMSSP...")
-        for path in files:
-            n, edges = load_graph_from_csv(path)
-            if n == 0:
-                print(f"[AVISO] Grafo vazio em {os.path.basename(path)}, ignorando.")
-                continue
-
-            inicio = time.perf_counter()  # início da medição
-            #dist = BMSSP(n, edges, source=0)
-            
-            dist = bmssp(n, edges)
-            #dist = list(dist.values())
-            fim = time.perf_counter()     # fim da medição
-            elapsed = fim - inicio
-
-            # nome de saída: results_BMSSP/BMSSP_<nome_original>
-            base_name = os.path.basename(path)
-            out_name = f"BMSSP_{base_name}"
-            out_path = os.path.join(folder_out, out_name)
-
-            save_distances_to_csv(out_path, dist)
-
-            # grava tempo no CSV de tempos
-            wtempo.writerow([base_name, n, len(edges), f"{elapsed:.6f}"])
-
-            print(f"  - {base_name}: {n} vértices, {len(edges)} arestas, tempo={elapsed:.6f}s -> salvo em {out_name}")
-
-    print("Concluído. Resultados em:", folder_out)
-    print("Tempos em:", tempos_path)
+    parser = argparse.ArgumentParser(description="Roda BMSSP em todos os grafos de graphs/.")
+    parser.add_argument("--versao", choices=["duan", "heuristica"], default="duan",
+                        help="duan = BMSSP recursivo do artigo (bmssp_duan.py); "
+                             "heuristica = bmssp() com pivô mediana-de-três")
+    parser.add_argument("--fila", choices=["heapq"] + sorted(FILAS), default="heapq",
+                        help="fila do dijkstra_limited na versão heuristica "
+                             "(binario/pairing: decrease-key; radix: pesos em ponto fixo)")
+    argumentos_medicao(parser)
+    args = parser.parse_args()
+    if args.versao == "duan":
+        nome = "bmssp_duan"
+    elif args.fila == "heapq":
+        nome = "bmssp_heuristica"
+    else:
+        nome = f"bmssp_heuristica_{args.fila}"
+    if nome not in REGISTRO:
+        parser.error(f"fila {args.fila} não é suportada pelo bmssp() (ver dijkstra_limited)")
+
+    rodar_runner(nome, "results_BMSSP", "tempos_BMSSP.csv", args)
 
 if __name__ == "__main__":
     main()
@@ -1,123 +1,168 @@
-import csv
-import glob
-import os
+import argparse
 import math
-import time  # <- novo
+from collections import deque
 
-def load_graph_from_csv(path):
-    """
-    Lê um grafo dirigido ponderado de um CSV no formato:
-    u,v,w
-    0,1,2.5
-    1,2,1.0
-    ...
-    Retorna (n, edges), onde:
-      n = número de vértices (0..n-1)
-      edges = lista de tuplas (u, v, w)
-    """
-    edges = []
-    vertices = set()
-    with open(path, newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        header = next(reader, None)  # pula cabeçalho
-        for row in reader:
-            if not row or len(row) < 3:
-                continue
-            u = int(row[0])
-            v = int(row[1])
-            w = float(row[2])
-            edges.append((u, v, w))
-            vertices.add(u)
-            vertices.add(v)
+try:
+    import numpy as np
+except ImportError:  # sem numpy, o modo vetorizado fica indisponível
+    np = None
 
-    if not vertices:
-        return 0, []
+from benchmark import argumentos_medicao, rodar_runner
 
-    n = max(vertices) + 1
-    return n, edges
-
-def bellman_ford(n, edges, source=0):
+def bellman_ford(graph, source=0):
     """
     Implementação padrão do Bellman-Ford sem ciclos negativos
     (assumimos pesos não negativos para seu trabalho).
+    Varre as arestas direto do CSR (ver grafo.CSRGraph), origem por origem.
     Retorna lista dist[0..n-1] com as distâncias mínimas.
     """
+    n = graph.n
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
     dist = [math.inf] * n
     dist[source] = 0.0
 
     # relaxa todas as arestas n-1 vezes
     for _ in range(n - 1):
         updated = False
-        for u, v, w in edges:
-            if dist[u] != math.inf and dist[u] + w < dist[v]:
-                dist[v] = dist[u] + w
-                updated = True
+        for u in range(n):
+            du = dist[u]
+            if du == math.inf:
+                continue
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if du + weights[i] < dist[v]:
+                    dist[v] = du + weights[i]
+                    updated = True
         if not updated:
             break
 
     # se você quiser detectar ciclos negativos, faria mais uma passada aqui
     return dist
 
-def save_distances_to_csv(path_out, dist):
+def bellman_ford_vetorizado(graph, source=0):
     """
-    Salva as distâncias em um CSV com colunas:
-    vertex,dist
-    Se a distância for infinita (vértice inalcançável), grava "INF".
+    Bellman-Ford com cada rodada de relaxação feita em operações de array (numpy):
+      - gather:      cand = dist[u] + w   para as arestas u->v
+      - scatter-min: dist[v] = min(dist[v], cand)
+    Em cada rodada só entram as arestas que saem de vértices cuja distância
+    mudou na rodada anterior (as demais não podem melhorar nada), e o laço
+    para assim que uma rodada não altera nenhuma distância (early-exit).
+    Retorna lista dist[0..n-1] com as distâncias mínimas.
     """
-    os.makedirs(os.path.dirname(path_out), exist_ok=True)
-    with open(path_out, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["vertex", "dist"])
-        for v, d in enumerate(dist):
-            if d == math.inf:
-                writer.writerow([v, "INF"])
-            else:
-                writer.writerow([v, f"{d:.6f}"])
+    if np is None:
+        raise RuntimeError("bellman_ford_vetorizado requer numpy instalado")
 
-def main():
-    folder_in = "graphs"
-    folder_out = "results_bellman"
-
-    pattern = os.path.join(folder_in, "*.csv")
-    files = sorted(glob.glob(pattern))
-
-    if not files:
-        print(f"Nenhum CSV encontrado em '{folder_in}'.")
-        return
-
-    # novo: arquivo de tempos
-    os.makedirs(folder_out, exist_ok=True)
-    tempos_path = os.path.join(folder_out, "tempos_bellman.csv")
-    with open(tempos_path, "w", newline="", encoding="utf-8") as f_tempos:
-        wtempo = csv.writer(f_tempos)
-        wtempo.writerow(["arquivo", "n_vertices", "n_arestas", "tempo_segundos"])
-
-        print("Processando grafos com Bellman-Ford...")
-        for path in files:
-            n, edges = load_graph_from_csv(path)
-            if n == 0:
-                print(f"[AVISO] Grafo vazio em {os.path.basename(path)}, ignorando.")
-                continue
+    n = graph.n
+    offsets = np.frombuffer(graph.offsets, dtype=np.int64)
+    targets = np.frombuffer(graph.targets, dtype=np.int32)
+    weights = np.frombuffer(graph.weights, dtype=np.float64)
+    grau = np.diff(offsets)
+
+    dist = np.full(n, np.inf)
+    dist[source] = 0.0
+    ativos = np.array([source], dtype=np.int64)
+
+    for _ in range(n - 1):
+        # índices (no CSR) de todas as arestas que saem dos vértices ativos
+        cont = grau[ativos]
+        total = int(cont.sum())
+        if total == 0:
+            break
+        inicio = np.repeat(offsets[ativos] - np.cumsum(cont) + cont, cont)
+        idx = inicio + np.arange(total)
+
+        vs = targets[idx]
+        cand = np.repeat(dist[ativos], cont) + weights[idx]
+
+        antes = dist[vs]
+        np.minimum.at(dist, vs, cand)
+        melhorou = dist[vs] < antes
+        if not melhorou.any():
+            break
+        ativos = np.unique(vs[melhorou])
+
+    return dist.tolist()
 
-            inicio = time.perf_counter()  # início da medição
-            dist = bellman_ford(n, edges, source=0)
-            fim = time.perf_counter()     # fim da medição
-            elapsed = fim - inicio
+def spfa(graph, source=0, slf=True, lll=True):
+    """
+    Bellman-Ford baseado em fila (SPFA): só relaxa arestas que saem de
+    vértices cuja distância mudou. Heurísticas opcionais:
+      - SLF (Small Label First): um vértice que entra na fila com distância
+        menor que a do primeiro da fila vai para a frente;
+      - LLL (Large Label Last): enquanto o primeiro da fila tiver distância
+        maior que a média da fila, ele é movido para o fim.
+    Retorna lista dist[0..n-1] com as distâncias mínimas.
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
 
-            # nome de saída: results_bellman/bellman_<nome_do_arquivo_original>
-            base_name = os.path.basename(path)
-            out_name = f"bellman_{base_name}"
-            out_path = os.path.join(folder_out, out_name)
+    dist = [math.inf] * graph.n
+    dist[source] = 0.0
+    na_fila = bytearray(graph.n)
+
+    fila = deque([source])
+    na_fila[source] = 1
+    soma = 0.0  # soma das distâncias dos vértices na fila (para o LLL)
+
+    while fila:
+        if lll:
+            media = soma / len(fila)
+            # limita as rotações ao tamanho da fila (erro de arredondamento em soma)
+            for _ in range(len(fila)):
+                if dist[fila[0]] <= media:
+                    break
+                fila.rotate(-1)
+
+        u = fila.popleft()
+        na_fila[u] = 0
+        du = dist[u]
+        soma -= du
+
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            nd = du + weights[i]
+            if nd < dist[v]:
+                if na_fila[v]:
+                    soma -= dist[v] - nd
+                    dist[v] = nd
+                    continue
+                dist[v] = nd
+                na_fila[v] = 1
+                soma += nd
+                if slf and fila and nd < dist[fila[0]]:
+                    fila.appendleft(v)
+                else:
+                    fila.append(v)
 
-            save_distances_to_csv(out_path, dist)
+    return dist
 
-            # grava tempo no CSV de tempos
-            wtempo.writerow([base_name, n, len(edges), f"{elapsed:.6f}"])
+# modos selecionáveis pela linha de comando (--modo)
+MODOS = {
+    "classico": bellman_ford,
+    "vetorizado": bellman_ford_vetorizado,
+    "spfa": spfa,
+}
 
-            print(f"  - {base_name}: {n} vértices, {len(edges)} arestas, tempo={elapsed:.6f}s -> salvo em {out_name}")
+# nome de cada modo no registro da bancada (benchmark.REGISTRO)
+NOMES_BANCADA = {
+    "classico": "bellman_classico",
+    "vetorizado": "bellman_vetorizado",
+    "spfa": "spfa",
+}
 
-    print("Concluído. Resultados em:", folder_out)
-    print("Tempos em:", tempos_path)
+def main():
+    parser = argparse.ArgumentParser(description="Roda Bellman-Ford em todos os grafos de graphs/.")
+    parser.add_argument("--modo", choices=sorted(MODOS),
+                        default="vetorizado" if np is not None else "spfa",
+                        help="variante do Bellman-Ford (padrão: vetorizado se houver numpy, senão spfa)")
+    argumentos_medicao(parser)
+    args = parser.parse_args()
+
+    rodar_runner(NOMES_BANCADA[args.modo], "results_bellman", "tempos_bellman.csv", args)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,274 @@
+import argparse
+import atexit
+import csv
+import glob
+import os
+import time
+from multiprocessing import Pool, resource_tracker
+
+from benchmark import REGISTRO, argumentos_medicao, rodar_runner
+from grafo_binario import load_graph
+from memoria_compartilhada import GrafoCompartilhado, anexar
+
+INF = float("inf")
+
+# abaixo deste tamanho de fronteira, relaxar no próprio processo é mais
+# barato do que serializar a tarefa para o pool
+LIMIAR_PARALELO = 2048
+
+# ----------------------------
+# Delta automático
+# ----------------------------
+def delta_automatico(graph):
+    """
+    Escolhe delta a partir da distribuição de pesos (Meyer & Sanders):
+    delta ~ peso máximo / grau médio, de modo que cada bucket tenha poucas
+    arestas leves por vértice. Nunca fica abaixo do peso médio.
+    """
+    if graph.m == 0:
+        return 1.0
+    weights = graph.weights
+    w_max = max(weights)
+    w_medio = sum(weights) / graph.m
+    grau_medio = graph.m / max(1, graph.n)
+    delta = max(w_max / max(1.0, grau_medio), w_medio)
+    return delta if delta > 0 else 1.0
+
+# ----------------------------
+# Relaxação (no processo principal ou nos workers)
+# ----------------------------
+def _relaxar_em(graph, dist, vertices, delta, leves):
+    """
+    Relaxa as arestas leves (w <= delta) ou pesadas (w > delta) que saem de
+    'vertices', lendo dist sem alterá-lo. Retorna {v: nova_dist} só com as
+    melhorias, já reduzidas pelo mínimo por vértice.
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    melhor = {}
+    for u in vertices:
+        du = dist[u]
+        for i in range(offsets[u], offsets[u + 1]):
+            w = weights[i]
+            if (w <= delta) is not leves:
+                continue
+            v = targets[i]
+            nd = du + w
+            if nd < dist[v] and nd < melhor.get(v, INF):
+                melhor[v] = nd
+    return melhor
+
+# estado de cada worker: blocos compartilhados do grafo atual
+_worker = {}
+
+def _relaxar_worker(descritor, vertices, delta, leves):
+    nomes = descritor["nomes"]
+    if _worker.get("nomes") != nomes:
+        # grafo novo: solta as views do anterior antes de fechar os blocos
+        antigos = _worker.get("blocos", {})
+        _worker.clear()
+        for shm in antigos.values():
+            shm.close()
+        graph, vetores, blocos = anexar(descritor)
+        _worker.update(nomes=nomes, graph=graph, dist=vetores["dist"], blocos=blocos)
+    return _relaxar_em(_worker["graph"], _worker["dist"], vertices, delta, leves)
+
+# ----------------------------
+# Delta-stepping
+# ----------------------------
+def delta_stepping(graph, source=0, delta=None, pool=None, compartilhado=None):
+    """
+    SSSP por delta-stepping (Meyer & Sanders). Os vértices ficam em buckets
+    de largura delta; cada bucket é esvaziado relaxando as arestas leves até
+    estabilizar e depois as pesadas de todos os vértices que passaram por ele.
+    Com um multiprocessing.Pool, as relaxações de fronteiras grandes são
+    divididas entre os workers, que leem o CSR e dist direto da memória
+    compartilhada (compartilhado = GrafoCompartilhado com o vetor "dist").
+    Retorna lista dist[0..n-1] com as distâncias mínimas.
+    """
+    if delta is None:
+        delta = delta_automatico(graph)
+
+    proprio = pool is not None and compartilhado is None
+    if proprio:
+        compartilhado = GrafoCompartilhado(graph, vetores=("dist",))
+
+    if compartilhado is not None:
+        dist = compartilhado.vetor("dist")
+        for v in range(graph.n):
+            dist[v] = INF
+        descritor = compartilhado.descritor()
+        n_partes = 4 * (os.cpu_count() or 1)
+    else:
+        dist = [INF] * graph.n
+
+    def relaxar(vertices, leves):
+        if pool is None or len(vertices) < LIMIAR_PARALELO:
+            return _relaxar_em(graph, dist, vertices, delta, leves)
+        vertices = list(vertices)
+        passo = -(-len(vertices) // n_partes)
+        partes = [vertices[j:j + passo] for j in range(0, len(vertices), passo)]
+        melhor = {}
+        for parcial in pool.starmap(_relaxar_worker,
+                                    [(descritor, p, delta, leves) for p in partes]):
+            for v, nd in parcial.items():
+                if nd < melhor.get(v, INF):
+                    melhor[v] = nd
+        return melhor
+
+    buckets = {}
+    bucket_de = {}
+
+    def aplicar(melhor):
+        for v, nd in melhor.items():
+            if nd < dist[v]:
+                antigo = bucket_de.get(v)
+                if antigo is not None:
+                    b = buckets[antigo]
+                    b.discard(v)
+                    if not b:
+                        del buckets[antigo]
+                dist[v] = nd
+                i = int(nd // delta)
+                buckets.setdefault(i, set()).add(v)
+                bucket_de[v] = i
+
+    aplicar({source: 0.0})
+
+    try:
+        while buckets:
+            i = min(buckets)
+            removidos = set()
+            while i in buckets:
+                fronteira = buckets.pop(i)
+                for v in fronteira:
+                    del bucket_de[v]
+                removidos |= fronteira
+                aplicar(relaxar(fronteira, True))
+            aplicar(relaxar(removidos, False))
+        resultado = list(dist)
+    finally:
+        if compartilhado is not None:
+            del dist
+        if proprio:
+            compartilhado.liberar()
+    return resultado
+
+# pool e cópia do grafo em memória compartilhada de delta_em_processos,
+# reaproveitados entre chamadas (fontes e repetições da bancada)
+_paralelo = {}
+
+def _fechar_paralelo():
+    compartilhado = _paralelo.pop("compartilhado", None)
+    if compartilhado is not None:
+        compartilhado.liberar()
+    pool = _paralelo.pop("pool", None)
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+    _paralelo.clear()
+
+atexit.register(_fechar_paralelo)
+
+def delta_em_processos(graph, source=0, delta=None, processos=1):
+    """
+    delta_stepping com um pool de 'processos' workers (1 = sem pool), para a
+    bancada (ver benchmark.REGISTRO). O pool e a cópia do grafo na memória
+    compartilhada são criados na primeira chamada (o aquecimento) e
+    reaproveitados enquanto o grafo for o mesmo, então a medição cobre só a
+    busca, como em medir(). Saem no fim do processo.
+    """
+    if processos <= 1:
+        return delta_stepping(graph, source, delta)
+    if _paralelo.get("processos") != processos:
+        _fechar_paralelo()
+        # os workers têm de herdar o resource_tracker já rodando (ver
+        # memoria_compartilhada.anexar); senão cada um sobe o seu e acusa os
+        # blocos anexados como vazados ao sair
+        resource_tracker.ensure_running()
+        _paralelo.update(processos=processos, pool=Pool(processos))
+    if _paralelo.get("graph") is not graph:
+        compartilhado = _paralelo.pop("compartilhado", None)
+        if compartilhado is not None:
+            compartilhado.liberar()
+        # guarda o próprio grafo: a identidade só vale enquanto ele estiver vivo
+        _paralelo.update(graph=graph, compartilhado=GrafoCompartilhado(graph, vetores=("dist",)))
+    return delta_stepping(graph, source, delta, _paralelo["pool"], _paralelo["compartilhado"])
+
+def medir(graph, processos, delta=None):
+    """Roda o delta-stepping com 'processos' workers e retorna (dist, segundos).
+    Pool e cópia para a memória compartilhada ficam fora da medição."""
+    if processos <= 1:
+        inicio = time.perf_counter()
+        dist = delta_stepping(graph, source=0, delta=delta)
+        return dist, time.perf_counter() - inicio
+
+    compartilhado = GrafoCompartilhado(graph, vetores=("dist",))
+    try:
+        with Pool(processos) as pool:
+            inicio = time.perf_counter()
+            dist = delta_stepping(graph, source=0, delta=delta, pool=pool,
+                                  compartilhado=compartilhado)
+            elapsed = time.perf_counter() - inicio
+    finally:
+        compartilhado.liberar()
+    return dist, elapsed
+
+def escalonamento(files, lista_processos, folder_out, delta=None):
+    """Mede o tempo do delta-stepping para cada número de processos."""
+    path_out = os.path.join(folder_out, "escalonamento_delta.csv")
+    with open(path_out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["arquivo", "n_vertices", "n_arestas", "processos",
+                         "tempo_segundos", "speedup"])
+        for path in files:
+            graph = load_graph(path)
+            if graph.n == 0:
+                continue
+            base_name = os.path.basename(path)
+            t_base = None
+            for p in lista_processos:
+                _, elapsed = medir(graph, p, delta)
+                if t_base is None:
+                    t_base = elapsed
+                speedup = t_base / elapsed if elapsed > 0 else 0.0
+                writer.writerow([base_name, graph.n, graph.m, p, f"{elapsed:.6f}", f"{speedup:.2f}"])
+                print(f"  - {base_name}: {p} processo(s), tempo={elapsed:.6f}s, speedup={speedup:.2f}")
+    print("Escalonamento em:", path_out)
+
+def main():
+    parser = argparse.ArgumentParser(description="Roda delta-stepping em todos os grafos de graphs/.")
+    parser.add_argument("--paralelo", action="store_true",
+                        help="relaxa as fronteiras grandes num pool com um worker por CPU "
+                             "(delta_paralelo na bancada); padrão: sem pool")
+    parser.add_argument("--delta", type=float, default=None,
+                        help="largura dos buckets (padrão: automática pelos pesos)")
+    parser.add_argument("--escalonamento", default=None,
+                        help="lista de números de workers, ex.: 1,2,4,8; mede só os tempos "
+                             "de cada configuração nos grafos dados em --grafos")
+    parser.add_argument("--grafos", nargs="*", default=None,
+                        help="arquivos de grafo do --escalonamento (padrão: graphs/*.csv)")
+    argumentos_medicao(parser)
+    args = parser.parse_args()
+
+    folder_out = "results_delta"
+    if args.escalonamento:
+        files = args.grafos or sorted(glob.glob(os.path.join("graphs", "*.csv")))
+        if not files:
+            print("Nenhum CSV encontrado em 'graphs'.")
+            return
+        os.makedirs(folder_out, exist_ok=True)
+        lista = [int(p) for p in args.escalonamento.split(",")]
+        print(f"Escalonamento do delta-stepping com {lista} processos...")
+        escalonamento(files, lista, folder_out, args.delta)
+        return
+
+    nome = "delta_paralelo" if args.paralelo else "delta"
+    if args.delta is not None:
+        # largura fixa: entra nos kwargs da entrada (e, com eles, na chave do cache)
+        REGISTRO[nome].kwargs["delta"] = args.delta
+    rodar_runner(nome, folder_out, "tempos_delta.csv", args)
+
+if __name__ == "__main__":
+    main()
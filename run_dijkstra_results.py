@@ -1,54 +1,23 @@
-import csv
-import glob
-import os
+import argparse
 import math
 import heapq
-import time  # <- novo
+from array import array
 
-def load_graph_from_csv(path):
-    """
-    Lê um grafo dirigido ponderado de um CSV no formato:
-    u,v,w
-    0,1,2.5
-    1,2,1.0
-    ...
-    Retorna (n, edges), onde:
-      n = número de vértices (0..n-1)
-      edges = lista de tuplas (u, v, w)
-    """
-    edges = []
-    vertices = set()
-    with open(path, newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        header = next(reader, None)  # pula cabeçalho
-        for row in reader:
-            if not row or len(row) < 3:
-                continue
-            u = int(row[0])
-            v = int(row[1])
-            w = float(row[2])
-            edges.append((u, v, w))
-            vertices.add(u)
-            vertices.add(v)
-
-    if not vertices:
-        return 0, []
-
-    n = max(vertices) + 1
-    return n, edges
-
-def dijkstra(n, edges, source=0):
+from benchmark import argumentos_medicao, rodar_runner
+from filas import FILAS, fila_efetiva
+
+def dijkstra(graph, source=0):
     """
     Implementação clássica de Dijkstra com heap (priority queue).
     Supõe pesos não negativos.
+    Recebe o grafo em CSR (ver grafo.CSRGraph), já montado fora da medição.
     Retorna lista dist[0..n-1] com as distâncias mínimas.
     """
-    # monta lista de adjacência
-    adj = [[] for _ in range(n)]
-    for u, v, w in edges:
-        adj[u].append((v, w))
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
 
-    dist = [math.inf] * n
+    dist = [math.inf] * graph.n
     dist[source] = 0.0
 
     # heap de (distância_atual, vértice)
@@ -61,73 +30,91 @@ def dijkstra(n, edges, source=0):
         if d_atual > dist[u]:
             continue
 
-        for v, w in adj[u]:
-            if dist[u] + w < dist[v]:
-                dist[v] = dist[u] + w
-                heapq.heappush(heap, (dist[v], v))
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            nd = d_atual + weights[i]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
 
     return dist
 
-def save_distances_to_csv(path_out, dist):
+def dijkstra_arvore(graph, source=0):
     """
-    Salva as distâncias em um CSV com colunas:
-    vertex,dist
-    Se a distância for infinita (vértice inalcançável), grava "INF".
+    Dijkstra com heapq que guarda também a árvore de caminhos mínimos.
+    Retorna (dist, pred): dist em array float64 e pred em array int32,
+    com -1 na fonte e nos vértices inalcançáveis.
     """
-    os.makedirs(os.path.dirname(path_out), exist_ok=True)
-    with open(path_out, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["vertex", "dist"])
-        for v, d in enumerate(dist):
-            if d == math.inf:
-                writer.writerow([v, "INF"])
-            else:
-                writer.writerow([v, f"{d:.6f}"])
-
-def main():
-    folder_in = "graphs"
-    folder_out = "results_dijkstra"
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
 
-    pattern = os.path.join(folder_in, "*.csv")
-    files = sorted(glob.glob(pattern))
-
-    if not files:
-        print(f"Nenhum CSV encontrado em '{folder_in}'.")
-        return
-
-    # novo: arquivo de tempos
-    os.makedirs(folder_out, exist_ok=True)
-    tempos_path = os.path.join(folder_out, "tempos_dijkstra.csv")
-    with open(tempos_path, "w", newline="", encoding="utf-8") as f_tempos:
-        wtempo = csv.writer(f_tempos)
-        wtempo.writerow(["arquivo", "n_vertices", "n_arestas", "tempo_segundos"])
-
-        print("Processando grafos com Dijkstra...")
-        for path in files:
-            n, edges = load_graph_from_csv(path)
-            if n == 0:
-                print(f"[AVISO] Grafo vazio em {os.path.basename(path)}, ignorando.")
-                continue
-
-            inicio = time.perf_counter()  # início da medição
-            dist = dijkstra(n, edges, source=0)
-            fim = time.perf_counter()     # fim da medição
-            elapsed = fim - inicio
+    dist = array("d", [math.inf]) * graph.n
+    pred = array("i", [-1]) * graph.n
+    dist[source] = 0.0
+    heap = [(0.0, source)]
 
-            # nome de saída: results_dijkstra/dijkstra_<nome_original>
-            base_name = os.path.basename(path)
-            out_name = f"dijkstra_{base_name}"
-            out_path = os.path.join(folder_out, out_name)
+    while heap:
+        d_atual, u = heapq.heappop(heap)
+        if d_atual > dist[u]:
+            continue
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            nd = d_atual + weights[i]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
 
-            save_distances_to_csv(out_path, dist)
+    return dist, pred
 
-            # grava tempo no CSV de tempos
-            wtempo.writerow([base_name, n, len(edges), f"{elapsed:.6f}"])
+def dijkstra_fila(graph, source=0, fila="binario"):
+    """
+    Dijkstra com fila de prioridade com decrease-key (ver filas.py):
+    cada vértice está no máximo uma vez na fila, então não há entradas
+    desatualizadas nem uma tupla nova por relaxação, e a fila nunca passa
+    de n elementos.
+    As filas "radix" e "dial" exigem pesos inteiros: use o grafo em ponto
+    fixo (grafo.para_ponto_fixo) e divida as distâncias pela escala.
+    Com pesos muito maiores que n, "dial" usa a radix (ver filas.fila_efetiva).
+    Retorna lista dist[0..n-1] com as distâncias mínimas.
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    dist = [math.inf] * graph.n
+    dist[source] = 0
+    max_peso = max(weights, default=0)
+    fila_q = FILAS[fila_efetiva(fila, graph.n, max_peso)](graph.n, max_peso)
+    fila_q.push(source, 0)
+    push = fila_q.push
+    pop = fila_q.pop
+
+    while fila_q:
+        d_atual, u = pop()
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            nd = d_atual + weights[i]
+            if nd < dist[v]:
+                dist[v] = nd
+                push(v, nd)
 
-            print(f"  - {base_name}: {n} vértices, {len(edges)} arestas, tempo={elapsed:.6f}s -> salvo em {out_name}")
+    return dist
 
-    print("Concluído. Resultados em:", folder_out)
-    print("Tempos em:", tempos_path)
+def main():
+    parser = argparse.ArgumentParser(description="Roda Dijkstra em todos os grafos de graphs/.")
+    parser.add_argument("--fila", choices=["heapq"] + sorted(FILAS), default="heapq",
+                        help="fila de prioridade: heapq (entradas duplicadas), binario/pairing "
+                             "(decrease-key) ou radix/dial (pesos em ponto fixo)")
+    parser.add_argument("--escala", type=int, default=None,
+                        help="escala do ponto fixo (padrão: menor 10^c que torna os pesos inteiros)")
+    argumentos_medicao(parser)
+    args = parser.parse_args()
+
+    # conversão para ponto fixo (radix/dial) é medida como fase de construção
+    nome = "dijkstra" if args.fila == "heapq" else f"dijkstra_{args.fila}"
+    rodar_runner(nome, "results_dijkstra", "tempos_dijkstra.csv", args, args.escala)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import os
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # sem numpy, os formatos .npy/.npz ficam indisponíveis
+    np = None
+
+# ----------------------------
+# Gravação dos resultados
+# ----------------------------
+# Formato comum a todos os runners: results_<alg>/<prefixo>_<grafo>.csv
+# com colunas vertex,dist e "INF" para vértices inalcançáveis. Formatos
+# binários opcionais (mesmo nome, outra extensão):
+#   npy     float64 em .npy (numpy.load)
+#   npz     .npy comprimido (numpy.savez_compressed, chave "dist")
+#   f64     float64 little-endian cru, sem cabeçalho
+#   f64.gz  o mesmo, comprimido com gzip
+# Em todos os formatos o conteúdo é montado inteiro em memória e só vai
+# para o disco se for diferente do arquivo que já está lá (os resultados
+# costumam sair idênticos de uma execução para a outra).
+
+FORMATOS = ("csv", "npy", "npz", "f64", "f64.gz")
+
+
+def _csv_bytes(dist):
+    # uma única formatação "%d,%.6f\n" * n em C, em vez de um writerow por
+    # vértice; "%.6f" de inf sai "inf", trocado por INF no fim
+    n = len(dist)
+    intercalado = [None] * (2 * n)
+    intercalado[0::2] = range(n)
+    intercalado[1::2] = dist
+    corpo = ("%d,%.6f\n" * n) % tuple(intercalado)
+    return ("vertex,dist\n" + corpo.replace(",inf\n", ",INF\n")).encode("ascii")
+
+
+def _f64_bytes(dist):
+    dados = array("d", dist)
+    if sys.byteorder != "little":
+        dados.byteswap()
+    return dados.tobytes()
+
+
+def _npy_bytes(dist, comprimido):
+    import io
+
+    if np is None:
+        raise RuntimeError("os formatos npy/npz requerem numpy instalado")
+    buffer = io.BytesIO()
+    dados = np.asarray(dist, dtype=np.float64)
+    if comprimido:
+        np.savez_compressed(buffer, dist=dados)
+    else:
+        np.save(buffer, dados)
+    return buffer.getvalue()
+
+
+def conteudo(dist, formato="csv"):
+    """Bytes do arquivo de distâncias no formato dado."""
+    if formato == "csv":
+        return _csv_bytes(dist)
+    if formato == "f64":
+        return _f64_bytes(dist)
+    if formato == "f64.gz":
+        # mtime=0: o mesmo conteúdo gera sempre os mesmos bytes
+        return gzip.compress(_f64_bytes(dist), mtime=0)
+    if formato in ("npy", "npz"):
+        return _npy_bytes(dist, formato == "npz")
+    raise ValueError(f"formato desconhecido: {formato}")
+
+
+def _mesmo_conteudo(path, dados):
+    try:
+        if os.path.getsize(path) != len(dados):
+            return False
+    except OSError:
+        return False
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.digest() == hashlib.sha1(dados).digest()
+
+
+def gravar_se_mudou(path_out, dados):
+    """
+    Grava dados em path_out (arquivo temporário + os.replace) só se o
+    conteúdo atual for diferente. Retorna True se gravou.
+    """
+    if _mesmo_conteudo(path_out, dados):
+        return False
+    os.makedirs(os.path.dirname(path_out) or ".", exist_ok=True)
+    # nome temporário por processo: os filhos da bancada podem gravar o mesmo arquivo
+    tmp = f"{path_out}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(dados)
+    os.replace(tmp, path_out)
+    return True
+
+
+def caminho_resultado(path_csv, formato):
+    """results_x/alg_grafo.csv -> results_x/alg_grafo.<formato>."""
+    return os.path.splitext(path_csv)[0] + "." + formato
+
+
+def save_distances(path_out, dist, formato="csv"):
+    """Salva as distâncias em path_out no formato dado. Retorna True se o arquivo mudou."""
+    return gravar_se_mudou(path_out, conteudo(dist, formato))
+
+
+def save_distances_to_csv(path_out, dist):
+    """
+    Salva as distâncias em um CSV com colunas:
+    vertex,dist
+    Se a distância for infinita (vértice inalcançável), grava "INF".
+    Retorna True se o arquivo mudou.
+    """
+    return save_distances(path_out, dist, "csv")
+
+
+def load_distances(path):
+    """Lê um arquivo de distâncias em qualquer um dos FORMATOS (pela extensão)."""
+    if path.endswith(".csv"):
+        dist = array("d")
+        with open(path, encoding="utf-8") as f:
+            next(f, None)  # pula cabeçalho
+            for linha in f:
+                if linha.strip():
+                    d = linha.rstrip().split(",")[1]
+                    dist.append(float("inf") if d == "INF" else float(d))
+        return dist
+    if path.endswith((".f64", ".f64.gz")):
+        abrir = gzip.open if path.endswith(".gz") else open
+        with abrir(path, "rb") as f:
+            dist = array("d", f.read())
+        if sys.byteorder != "little":
+            dist.byteswap()
+        return dist
+    if path.endswith((".npy", ".npz")):
+        if np is None:
+            raise RuntimeError("os formatos npy/npz requerem numpy instalado")
+        if path.endswith(".npz"):
+            with np.load(path) as arquivo:
+                return arquivo["dist"]
+        return np.load(path)
+    raise ValueError(f"formato desconhecido: {path}")
@@ -0,0 +1,364 @@
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from benchmark import percentil
+from grafo_binario import load_graph
+from run_dijkstra_results import dijkstra_arvore
+
+INF = float("inf")
+
+# ----------------------------
+# Servidor local de consultas
+# ----------------------------
+# Um processo de longa duração carrega os grafos de graphs/ uma vez (pelo
+# cache binário, com mmap) e responde por HTTP, em TCP local ou Unix socket:
+#   GET /grafos
+#   GET /distancia?grafo=rio_centro&s=0&t=10
+#   GET /caminho?grafo=rio_centro&s=0&t=10
+#   GET /arvore?grafo=rio_centro&s=0
+#   GET /estatisticas
+# As árvores de caminhos mínimos (dist + pred) são calculadas num pool de
+# processos e guardadas num cache limitado em bytes; consultas com a mesma
+# origem reaproveitam a árvore. Pedidos simultâneos para a mesma árvore
+# esperam um único cálculo.
+
+
+# ----------------------------
+# Cache de árvores limitado em memória
+# ----------------------------
+class CacheArvores:
+    """
+    Cache (grafo, origem) -> (dist, pred) limitado por limite_bytes.
+    politica escolhe quem sai quando estoura:
+      "lru"  menos usada recentemente
+      "lfu"  menos usada no total (empate: a mais antiga)
+      "fifo" a inserida há mais tempo
+    """
+
+    POLITICAS = ("lru", "lfu", "fifo")
+
+    def __init__(self, limite_bytes, politica="lru"):
+        if politica not in self.POLITICAS:
+            raise ValueError(f"Política desconhecida: {politica}")
+        self.limite = limite_bytes
+        self.politica = politica
+        self.itens = OrderedDict()
+        self.usos = {}
+        self.bytes = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.remocoes = 0
+
+    @staticmethod
+    def tamanho(valor):
+        dist, pred = valor
+        return dist.itemsize * len(dist) + pred.itemsize * len(pred)
+
+    def get(self, chave):
+        valor = self.itens.get(chave)
+        if valor is None:
+            self.faltas += 1
+            return None
+        self.acertos += 1
+        self.usos[chave] += 1
+        if self.politica == "lru":
+            self.itens.move_to_end(chave)
+        return valor
+
+    def put(self, chave, valor):
+        tam = self.tamanho(valor)
+        if tam > self.limite or chave in self.itens:
+            return
+        while self.bytes + tam > self.limite:
+            self._remover()
+        self.itens[chave] = valor
+        self.usos[chave] = 1
+        self.bytes += tam
+
+    def _remover(self):
+        if self.politica == "lfu":
+            chave = min(self.itens, key=self.usos.__getitem__)
+        else:
+            chave = next(iter(self.itens))
+        self.bytes -= self.tamanho(self.itens.pop(chave))
+        del self.usos[chave]
+        self.remocoes += 1
+
+    def estatisticas(self):
+        total = self.acertos + self.faltas
+        return {
+            "politica": self.politica,
+            "itens": len(self.itens),
+            "bytes": self.bytes,
+            "limite_bytes": self.limite,
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "remocoes": self.remocoes,
+            "taxa_acerto": self.acertos / total if total else 0.0,
+        }
+
+
+# ----------------------------
+# Pool de processos
+# ----------------------------
+# cada worker abre os mesmos .csrg com mmap: as páginas do grafo são
+# compartilhadas pelo sistema, sem cópia por processo
+_worker = {}
+
+def _init_worker(caminhos):
+    _worker.update({nome: load_graph(path) for nome, path in caminhos.items()})
+
+def _calcular_arvore(nome, source):
+    dist, pred = dijkstra_arvore(_worker[nome], source)
+    return dist.tobytes(), pred.tobytes()
+
+
+class Servidor:
+    def __init__(self, caminhos, cache, workers=None):
+        self.caminhos = caminhos
+        self.grafos = {nome: load_graph(path) for nome, path in caminhos.items()}
+        self.cache = cache
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(caminhos,))
+        self.pendentes = {}
+        self.atendidas = 0
+
+    async def obter_arvore(self, nome, source):
+        chave = (nome, source)
+        valor = self.cache.get(chave)
+        if valor is not None:
+            return valor
+        futuro = self.pendentes.get(chave)
+        if futuro is not None:
+            return _de_bytes(*await futuro)
+        loop = asyncio.get_running_loop()
+        futuro = loop.run_in_executor(self.pool, _calcular_arvore, nome, source)
+        self.pendentes[chave] = futuro
+        try:
+            valor = _de_bytes(*await futuro)
+        finally:
+            del self.pendentes[chave]
+        self.cache.put(chave, valor)
+        return valor
+
+    def _vertice(self, graph, params, chave):
+        v = int(params[chave][0])
+        if not 0 <= v < graph.n:
+            raise ValueError(f"vértice fora do grafo: {chave}={v}")
+        return v
+
+    async def responder(self, caminho, params):
+        """Retorna (status, corpo JSON)."""
+        if caminho == "/grafos":
+            return 200, {nome: {"n": g.n, "m": g.m} for nome, g in self.grafos.items()}
+        if caminho == "/estatisticas":
+            return 200, {"atendidas": self.atendidas, "cache": self.cache.estatisticas()}
+        if caminho not in ("/distancia", "/caminho", "/arvore"):
+            return 404, {"erro": f"rota desconhecida: {caminho}"}
+
+        nome = params.get("grafo", [None])[0]
+        graph = self.grafos.get(nome)
+        if graph is None:
+            return 404, {"erro": f"grafo desconhecido: {nome}"}
+        s = self._vertice(graph, params, "s")
+        dist, pred = await self.obter_arvore(nome, s)
+        if caminho == "/arvore":
+            return 200, {"grafo": nome, "s": s, "dist": [_json_dist(d) for d in dist]}
+
+        t = self._vertice(graph, params, "t")
+        corpo = {"grafo": nome, "s": s, "t": t, "dist": _json_dist(dist[t])}
+        if caminho == "/caminho":
+            nos = []
+            if dist[t] != INF:
+                v = t
+                while v != -1:
+                    nos.append(v)
+                    v = pred[v]
+                nos.reverse()
+            corpo["caminho"] = nos
+        return 200, corpo
+
+    async def atender(self, reader, writer):
+        """Uma conexão HTTP/1.1 com keep-alive; só GET."""
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                while True:  # cabeçalhos (ignorados)
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                try:
+                    metodo, alvo, _ = linha.decode("latin-1").split(" ", 2)
+                    if metodo != "GET":
+                        status, corpo = 405, {"erro": "só GET"}
+                    else:
+                        url = urlsplit(alvo)
+                        status, corpo = await self.responder(url.path, parse_qs(url.query))
+                except (ValueError, KeyError) as e:
+                    status, corpo = 400, {"erro": str(e)}
+                self.atendidas += 1
+                dados = json.dumps(corpo).encode()
+                writer.write(b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n" % (status, _RAZAO.get(status, b"OK"), len(dados)))
+                writer.write(dados)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def fechar(self):
+        self.pool.shutdown()
+
+
+_RAZAO = {200: b"OK", 400: b"Bad Request", 404: b"Not Found", 405: b"Method Not Allowed"}
+
+
+def _de_bytes(dist_b, pred_b):
+    dist, pred = array("d"), array("i")
+    dist.frombytes(dist_b)
+    pred.frombytes(pred_b)
+    return dist, pred
+
+
+def _json_dist(d):
+    return None if d == INF else d
+
+
+async def servir(args):
+    files = sorted(glob.glob(os.path.join(args.pasta, "*.csv")))
+    caminhos = {os.path.splitext(os.path.basename(p))[0]: p for p in files}
+    cache = CacheArvores(int(args.cache_mb * (1 << 20)), args.politica)
+    servidor = Servidor(caminhos, cache, args.workers)
+    if args.unix:
+        srv = await asyncio.start_unix_server(servidor.atender, path=args.unix)
+        onde = args.unix
+    else:
+        srv = await asyncio.start_server(servidor.atender, args.host, args.porta)
+        onde = f"http://{args.host}:{args.porta}"
+    print(f"{len(caminhos)} grafos carregados; ouvindo em {onde} "
+          f"(cache {args.cache_mb} MiB, {args.politica}, {servidor.workers} workers)")
+    try:
+        async with srv:
+            await srv.serve_forever()
+    finally:
+        servidor.fechar()
+
+
+# ----------------------------
+# Teste de carga
+# ----------------------------
+async def _conectar(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.porta)
+
+
+async def _get(reader, writer, alvo):
+    """Um GET numa conexão keep-alive; retorna (status, corpo em bytes)."""
+    writer.write(f"GET {alvo} HTTP/1.1\r\nHost: local\r\n\r\n".encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    tamanho = 0
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b""):
+            break
+        if h.lower().startswith(b"content-length:"):
+            tamanho = int(h.split(b":")[1])
+    return status, await reader.readexactly(tamanho)
+
+
+async def _cliente(args, alvos, latencias, erros):
+    reader, writer = await _conectar(args)
+    try:
+        while alvos:
+            alvo = alvos.pop()
+            inicio = time.perf_counter()
+            status, _ = await _get(reader, writer, alvo)
+            latencias.append(time.perf_counter() - inicio)
+            if status != 200:
+                erros.append(status)
+    finally:
+        writer.close()
+
+
+async def carga(args):
+    reader, writer = await _conectar(args)
+    try:
+        _, corpo = await _get(reader, writer, "/grafos")
+    finally:
+        writer.close()
+    grafos = json.loads(corpo)
+    if args.grafo not in grafos:
+        print(f"Grafo '{args.grafo}' não está no servidor: {sorted(grafos)}")
+        return
+    n = grafos[args.grafo]["n"]
+
+    rng = random.Random(args.seed)
+    origens = [rng.randrange(n) for _ in range(args.origens)]
+    alvos = [f"/{args.rota}?grafo={args.grafo}&s={rng.choice(origens)}&t={rng.randrange(n)}"
+             for _ in range(args.requisicoes)]
+    latencias, erros = [], []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(args, alvos, latencias, erros)
+                           for _ in range(args.concorrencia)))
+    elapsed = time.perf_counter() - inicio
+    latencias.sort()
+    print(f"{len(latencias)} requisições em {elapsed:.3f}s ({len(latencias) / elapsed:.1f} QPS), "
+          f"concorrência {args.concorrencia}, {len(erros)} erros")
+    print(f"  - latência p50={1e3 * percentil(latencias, 50):.3f} ms, "
+          f"p99={1e3 * percentil(latencias, 99):.3f} ms, máx={1e3 * latencias[-1]:.3f} ms")
+
+    reader, writer = await _conectar(args)
+    try:
+        _, corpo = await _get(reader, writer, "/estatisticas")
+    finally:
+        writer.close()
+    cache = json.loads(corpo)["cache"]
+    print(f"  - cache: {cache['itens']} árvores, {cache['bytes'] / (1 << 20):.1f} MiB, "
+          f"taxa de acerto {100 * cache['taxa_acerto']:.1f}%, {cache['remocoes']} remoções")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local de consultas de caminhos mínimos.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="caminho de Unix socket (em vez de TCP)")
+    sub = parser.add_subparsers(dest="modo", required=True)
+
+    p_servir = sub.add_parser("servir", help="sobe o servidor")
+    p_servir.add_argument("--pasta", default="graphs")
+    p_servir.add_argument("--cache-mb", type=float, default=256.0)
+    p_servir.add_argument("--politica", choices=CacheArvores.POLITICAS, default="lru")
+    p_servir.add_argument("--workers", type=int, default=None)
+
+    p_carga = sub.add_parser("carga", help="teste de carga contra um servidor já no ar")
+    p_carga.add_argument("--grafo", default="rio_centro")
+    p_carga.add_argument("--rota", choices=["distancia", "caminho"], default="distancia")
+    p_carga.add_argument("--requisicoes", type=int, default=2000)
+    p_carga.add_argument("--concorrencia", type=int, default=32)
+    p_carga.add_argument("--origens", type=int, default=50,
+                         help="origens distintas sorteadas (controla a taxa de acerto do cache)")
+    p_carga.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(servir(args) if args.modo == "servir" else carga(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
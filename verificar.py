@@ -0,0 +1,238 @@
+import argparse
+import glob
+import math
+import os
+import sys
+from array import array
+from collections import deque
+from multiprocessing import Pool
+
+from benchmark import REGISTRO
+from grafo_binario import load_graph
+from saida import FORMATOS, caminho_resultado, load_distances
+
+INF = float("inf")
+
+# ----------------------------
+# Verificação cruzada dos resultados
+# ----------------------------
+# Para cada grafo, compara o arquivo de distâncias de cada engine com o da
+# referência (Dijkstra) vértice a vértice, com tolerância relativa/absoluta,
+# e confere o certificado de caminhos mínimos de cada arquivo:
+#   - dist[fonte] == 0
+#   - para toda aresta u -> v: dist[v] <= dist[u] + w
+#   - todo vértice alcançável é atingido a partir da fonte só por arestas
+#     justas (dist[u] + w == dist[v]), isto é, tem predecessor justo e a
+#     cadeia de predecessores chega na fonte (pega ciclos de peso zero)
+# Os resultados podem estar em qualquer um dos formatos de saida.py (o CSV
+# tem preferência, se houver mais de um); os CSVs são lidos em fluxo, linha
+# a linha, e os binários de uma vez com saida.load_distances. O grafo vem
+# do cache binário (mmap). Cada grafo é uma tarefa do pool.
+# Cada algoritmo do registro grava o seu próprio arquivo (<pasta>/<nome>_<grafo>),
+# então cada variante é conferida à parte; os arquivos antigos com um prefixo
+# por pasta (bellman_*, BMSSP_*) ainda podem ser conferidos com --engines.
+
+# tolerâncias padrão: os CSVs têm 6 casas, então dist[u] + w e dist[v]
+# podem diferir em até ~1e-6 só pelo arredondamento da escrita
+REL_TOL = 1e-9
+ABS_TOL = 2e-6
+
+
+def engines_padrao():
+    """(nome, pasta, prefixo) de cada algoritmo do registro da bancada: cada um grava <pasta>/<nome>_<grafo>."""
+    return [(alg.nome, alg.pasta, alg.nome) for alg in REGISTRO.values()]
+
+
+def localizar(pasta, prefixo, base_name):
+    """Arquivo de resultado <pasta>/<prefixo>_<grafo> no primeiro formato que existir; None se nenhum."""
+    path_csv = os.path.join(pasta, f"{prefixo}_{base_name}")
+    for formato in FORMATOS:
+        path = caminho_resultado(path_csv, formato)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def ler_distancias(path):
+    """
+    Itera sobre (vértice, distância) de um arquivo de resultado; o CSV
+    vertex,dist é lido em fluxo, sem carregá-lo inteiro.
+    """
+    if not path.endswith(".csv"):
+        yield from enumerate(load_distances(path))
+        return
+    with open(path, encoding="utf-8") as f:
+        next(f, None)  # pula cabeçalho
+        for linha in f:
+            linha = linha.strip()
+            if not linha:
+                continue
+            v, d = linha.split(",")
+            yield int(v), (INF if d == "INF" else float(d))
+
+
+def proximos(a, b, rel_tol, abs_tol):
+    return a == b or math.isclose(a, b, rel_tol=rel_tol, abs_tol=abs_tol)
+
+
+def comparar(path_ref, path, n, rel_tol, abs_tol):
+    """
+    Compara um arquivo com a referência, em fluxo. Retorna (dist, resumo),
+    com dist = distâncias do arquivo (array float64, para o certificado).
+    """
+    dist = array("d", [INF]) * n
+    resumo = {"divergencias": 0, "max_erro": 0.0, "primeira": None, "formato": 0}
+    ref_iter = ler_distancias(path_ref)
+    lidos = 0
+    for (v_ref, d_ref), (v, d) in zip(ref_iter, ler_distancias(path)):
+        lidos += 1
+        if v != v_ref or not 0 <= v < n:
+            resumo["formato"] += 1
+            continue
+        dist[v] = d
+        if not proximos(d, d_ref, rel_tol, abs_tol):
+            resumo["divergencias"] += 1
+            erro = abs(d - d_ref)
+            if erro > resumo["max_erro"] or erro != erro:
+                resumo["max_erro"] = erro
+            if resumo["primeira"] is None:
+                resumo["primeira"] = (v, d_ref, d)
+    if lidos != n:
+        # número de linhas diferente do número de vértices
+        resumo["formato"] += abs(n - lidos)
+    return dist, resumo
+
+
+def certificado(graph, dist, fonte, rel_tol, abs_tol):
+    """
+    Confere o certificado de caminhos mínimos de dist. Retorna
+    {"arestas": violações de dist[v] <= dist[u] + w,
+     "sem_pred": vértices alcançáveis sem cadeia de arestas justas até a fonte,
+     "fonte": 1 se dist[fonte] != 0}.
+    """
+    n = graph.n
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    violacoes = 0
+    for u in range(n):
+        du = dist[u]
+        if du == INF:
+            continue
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            limite = du + weights[i]
+            if dist[v] > limite and not proximos(dist[v], limite, rel_tol, abs_tol):
+                violacoes += 1
+
+    # BFS a partir da fonte só por arestas justas
+    atingido = bytearray(n)
+    fila = deque()
+    if dist[fonte] == 0.0:
+        atingido[fonte] = 1
+        fila.append(fonte)
+    while fila:
+        u = fila.popleft()
+        du = dist[u]
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            if not atingido[v] and proximos(du + weights[i], dist[v], rel_tol, abs_tol):
+                atingido[v] = 1
+                fila.append(v)
+    sem_pred = sum(1 for v in range(n) if dist[v] != INF and not atingido[v])
+    return {"arestas": violacoes, "sem_pred": sem_pred, "fonte": int(dist[fonte] != 0.0)}
+
+
+def verificar_grafo(tarefa):
+    """Tarefa do pool: verifica todos os arquivos de resultado de um grafo."""
+    path, referencia, engines, fonte, rel_tol, abs_tol = tarefa
+    base_name = os.path.basename(path)
+    graph = load_graph(path)
+    saida = {"arquivo": base_name, "n": graph.n, "m": graph.m, "engines": {}}
+    if graph.n == 0:
+        return saida
+
+    nome_ref, pasta_ref, prefixo_ref = referencia
+    path_ref = localizar(pasta_ref, prefixo_ref, base_name)
+    if path_ref is None:
+        saida["erro"] = f"referência ausente: {os.path.join(pasta_ref, f'{prefixo_ref}_{base_name}')}"
+        return saida
+
+    for nome, pasta, prefixo in [referencia] + engines:
+        path_res = localizar(pasta, prefixo, base_name)
+        if path_res is None:
+            continue
+        dist, resumo = comparar(path_ref, path_res, graph.n, rel_tol, abs_tol)
+        resumo["certificado"] = certificado(graph, dist, fonte, rel_tol, abs_tol)
+        saida["engines"][nome] = resumo
+    return saida
+
+
+def _falhou(resumo):
+    cert = resumo["certificado"]
+    return resumo["divergencias"] or resumo["formato"] or cert["arestas"] or cert["sem_pred"] or cert["fonte"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica e compara os resultados de todos os algoritmos.")
+    parser.add_argument("--grafos", nargs="*", default=None, help="arquivos de grafo (padrão: graphs/*.csv)")
+    parser.add_argument("--referencia", default="dijkstra",
+                        help="nome da engine de referência (padrão: dijkstra)")
+    parser.add_argument("--engines", default=None,
+                        help="lista nome:pasta:prefixo separada por vírgula "
+                             "(padrão: um por algoritmo do registro da bancada)")
+    parser.add_argument("--fonte", type=int, default=0)
+    parser.add_argument("--rel-tol", type=float, default=REL_TOL)
+    parser.add_argument("--abs-tol", type=float, default=ABS_TOL)
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.engines:
+        engines = [tuple(e.split(":")) for e in args.engines.split(",")]
+    else:
+        engines = engines_padrao()
+    referencia = next((e for e in engines if e[0] == args.referencia), None)
+    if referencia is None:
+        parser.error(f"referência desconhecida: {args.referencia}")
+    engines = [e for e in engines if e is not referencia]
+
+    files = args.grafos or sorted(glob.glob(os.path.join("graphs", "*.csv")))
+    if not files:
+        print("Nenhum grafo encontrado.")
+        return
+
+    tarefas = [(path, referencia, engines, args.fonte, args.rel_tol, args.abs_tol) for path in files]
+    falhas = 0
+    with Pool(args.processos) as pool:
+        for saida in pool.imap(verificar_grafo, tarefas):
+            if "erro" in saida:
+                print(f"{saida['arquivo']}: {saida['erro']}")
+                falhas += 1
+                continue
+            partes = []
+            for nome, resumo in saida["engines"].items():
+                cert = resumo["certificado"]
+                if not _falhou(resumo):
+                    partes.append(f"{nome} OK")
+                    continue
+                falhas += 1
+                detalhe = [f"{resumo['divergencias']} divergências (máx {resumo['max_erro']:.3g})"]
+                if resumo["primeira"] is not None:
+                    v, d_ref, d = resumo["primeira"]
+                    detalhe.append(f"1ª em v={v}: {d_ref} vs {d}")
+                if resumo["formato"]:
+                    detalhe.append(f"{resumo['formato']} linhas fora do formato")
+                if cert["arestas"] or cert["sem_pred"] or cert["fonte"]:
+                    detalhe.append(f"certificado: {cert['arestas']} arestas violadas, "
+                                   f"{cert['sem_pred']} sem predecessor justo"
+                                   + (", dist[fonte] != 0" if cert["fonte"] else ""))
+                partes.append(f"{nome} FALHOU ({'; '.join(detalhe)})")
+            print(f"  - {saida['arquivo']} (n={saida['n']}, m={saida['m']}): " + ", ".join(partes))
+
+    print("Tudo confere." if falhas == 0 else f"{falhas} verificação(ões) com falha.")
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()